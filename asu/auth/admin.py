@@ -23,6 +23,7 @@ from asu.auth.models import (
     TOTPDevice,
     User,
 )
+from asu.core.utils.pagination import ApproximateCountAdminMixin
 
 admin.site.unregister(django_auth_models.Group)
 
@@ -36,7 +37,7 @@ admin.site.unregister(totp_models.TOTPDevice)
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin[User]):
+class UserAdmin(ApproximateCountAdminMixin, BaseUserAdmin[User]):
     readonly_fields = (
         "is_frozen",
         "last_login",
@@ -103,7 +104,9 @@ class UserAdmin(BaseUserAdmin[User]):
         ),
     )
     list_display = ("username", "email", "display_name", "created_at")
-    search_fields = ("username", "email")
+    # Username and display name lookups are served by their trigram indexes,
+    # emails are matched exactly using their case-insensitive unique index.
+    search_fields = ("username", "display_name", "=email")
     ordering = ("-id",)
 
 
@@ -121,17 +124,21 @@ class PermissionAdmin(admin.ModelAdmin[Permission]):
 
 
 @admin.register(AccessToken)
-class AccessTokenAdmin(oauth2_provider.admin.AccessTokenAdmin):
+class AccessTokenAdmin(
+    ApproximateCountAdminMixin, oauth2_provider.admin.AccessTokenAdmin
+):
     pass
 
 
 @admin.register(RefreshToken)
-class RefreshTokenAdmin(oauth2_provider.admin.RefreshTokenAdmin):
+class RefreshTokenAdmin(
+    ApproximateCountAdminMixin, oauth2_provider.admin.RefreshTokenAdmin
+):
     pass
 
 
 @admin.register(Grant)
-class GrantAdmin(oauth2_provider.admin.GrantAdmin):
+class GrantAdmin(ApproximateCountAdminMixin, oauth2_provider.admin.GrantAdmin):
     pass
 
 
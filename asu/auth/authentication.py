@@ -0,0 +1,59 @@
+import hashlib
+
+from rest_framework.request import Request
+
+from oauth2_provider.contrib.rest_framework import OAuth2Authentication
+
+from asu.auth.models import AccessToken, User
+
+__all__ = [
+    "AsyncOAuth2Authentication",
+    "aget_access_token",
+    "get_bearer_token",
+]
+
+
+def get_bearer_token(authorization: str) -> str | None:
+    """
+    Get the token given in the value of an 'Authorization' header, if it
+    uses the 'Bearer' scheme.
+    """
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token
+
+
+async def aget_access_token(token: str) -> AccessToken | None:
+    """
+    Get the access token with given value, along with its user and
+    application. Tokens are looked up by their checksum, the same way
+    `OAuth2Authentication` does.
+    """
+    checksum = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return (
+        await AccessToken.objects.select_related("application", "user")
+        .filter(token_checksum=checksum)
+        .afirst()
+    )
+
+
+class AsyncOAuth2Authentication(OAuth2Authentication):
+    """
+    `OAuth2Authentication` that can also authenticate requests of async
+    views (see `asu.core.utils.views.AsyncAPIView`). Tokens are only read
+    from the 'Authorization' header in that case.
+    """
+
+    async def aauthenticate(
+        self, request: Request
+    ) -> tuple[User | None, AccessToken] | None:
+        token = get_bearer_token(request.headers.get("authorization", ""))
+        if token is None:
+            return None
+        access_token = await aget_access_token(token)
+        if access_token is None or not access_token.is_valid():
+            # Reported in 'WWW-Authenticate' header, see `authenticate_header`.
+            request.oauth2_error = {"error": "invalid_token"}
+            return None
+        return access_token.user, access_token
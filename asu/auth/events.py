@@ -0,0 +1,86 @@
+import functools
+import json
+import logging
+from collections.abc import Iterable
+from uuid import UUID
+
+from django.conf import settings
+from django.db import transaction
+
+import redis
+
+__all__ = [
+    "get_channel",
+    "publish_relation_event",
+    "publish_relation_events",
+]
+
+logger = logging.getLogger(__name__)
+
+
+def get_channel(user_id: UUID | str) -> str:
+    """
+    Get the name of the Redis pub/sub channel that carries the events
+    related to given user.
+    """
+    return "asu.events.user.%s" % user_id
+
+
+@functools.cache
+def get_client() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def send(channels: list[str], payload: str) -> None:
+    send_many([(channels, payload)])
+
+
+def send_many(events: list[tuple[list[str], str]]) -> None:
+    # Events are delivered on a best-effort basis; clients resync their
+    # state through the API when they (re)connect.
+    try:
+        with get_client().pipeline(transaction=False) as pipe:
+            for channels, payload in events:
+                for channel in channels:
+                    pipe.publish(channel, payload)
+            pipe.execute()
+    except redis.RedisError:
+        logger.exception("Could not publish %d event(s)", len(events))
+
+
+def get_relation_event(
+    type: str, *, from_user_id: UUID, to_user_id: UUID
+) -> tuple[list[str], str]:
+    payload = json.dumps(
+        {"type": type, "from_user": str(from_user_id), "to_user": str(to_user_id)},
+        separators=(",", ":"),
+    )
+    return [get_channel(from_user_id), get_channel(to_user_id)], payload
+
+
+def publish_relation_event(type: str, *, from_user_id: UUID, to_user_id: UUID) -> None:
+    """
+    Publish a relation event to both users of the relation, once the current
+    transaction commits. The payload is kept compact, clients are expected
+    to fetch the details they need.
+
+    :param type: Event type, e.g., `follow.created`.
+    """
+    channels, payload = get_relation_event(
+        type, from_user_id=from_user_id, to_user_id=to_user_id
+    )
+    transaction.on_commit(functools.partial(send, channels, payload))
+
+
+def publish_relation_events(type: str, relations: Iterable[tuple[UUID, UUID]]) -> None:
+    """
+    Publish relation events in bulk, using a single pipeline, once the
+    current transaction commits. Relations are given as
+    `(from_user_id, to_user_id)` pairs.
+    """
+    events = [
+        get_relation_event(type, from_user_id=from_user_id, to_user_id=to_user_id)
+        for from_user_id, to_user_id in relations
+    ]
+    if events:
+        transaction.on_commit(functools.partial(send_many, events))
@@ -0,0 +1,161 @@
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions, status
+
+import sentry_sdk
+
+__all__ = [
+    "HashingExecutor",
+    "HashingUnavailable",
+    "executor",
+]
+
+
+class HashingUnavailable(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _(
+        "The server is busy processing other requests, please try again later."
+    )
+    default_code = "hashing_unavailable"
+    wait = 1
+    """
+    Seconds to advertise in 'Retry-After' header.
+    """
+
+
+class HashingExecutor:
+    """
+    A process-wide thread pool for password hashing. Hashers such as Argon2
+    are memory-hard and CPU-heavy, so the number of hashes computed at the
+    same time is bounded. Callers wait for a free slot up to `timeout`
+    seconds, after which `HashingUnavailable` is raised.
+
+    The underlying thread pool is created lazily, and created again in
+    forked processes, since threads do not survive a fork. Database
+    connections opened by jobs belong to the pool threads, they are closed
+    after each job unless they are reusable.
+
+    The bound applies to each process separately; the number of hashes
+    computed at the same time on a host is the concurrency times the number
+    of processes. Sync workers serve one request at a time, so a single
+    process never waits for a slot and `HashingUnavailable` is raised only
+    by threaded or async workers. The concurrency should be sized with the
+    worker count in mind.
+    """
+
+    def __init__(self, *, concurrency: int, timeout: float) -> None:
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._pid: int | None = None
+        self._pool: ThreadPoolExecutor | None = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._slots = threading.BoundedSemaphore(self.concurrency)
+                self._waiting = 0
+                self._pid = os.getpid()
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.concurrency,
+                    thread_name_prefix="hashing",
+                )
+            return self._pool
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of callers currently waiting for a free slot.
+        """
+        return self._waiting
+
+    def _acquire(self, *, blocking: bool) -> bool:
+        slots = self._slots
+        if not blocking:
+            return slots.acquire(blocking=False)
+
+        with self._lock:
+            self._waiting += 1
+        try:
+            return slots.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def _submit[T, **P](
+        self,
+        pool: ThreadPoolExecutor,
+        fn: Callable[P, T],
+        /,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> Future[T]:
+        slots = self._slots
+
+        def call() -> T:
+            # The slot is released before the result is set, so that it is
+            # available by the time waiting callers resume.
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                close_old_connections()
+                slots.release()
+
+        try:
+            return pool.submit(call)
+        except BaseException:
+            slots.release()
+            raise
+
+    def run[T, **P](
+        self,
+        fn: Callable[P, T],
+        /,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """
+        Run the hashing function in the pool and wait for its result.
+        """
+        pool = self._get_pool()
+        with sentry_sdk.start_span(op="password.hash", name=fn.__name__) as span:
+            span.set_data("hashing.queue_depth", self.queue_depth)
+            span.set_data("hashing.concurrency", self.concurrency)
+            if not self._acquire(blocking=True):
+                span.set_status("resource_exhausted")
+                raise HashingUnavailable
+            return self._submit(pool, fn, *args, **kwargs).result()
+
+    def submit[**P](
+        self,
+        fn: Callable[P, object],
+        /,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> bool:
+        """
+        Run the function in the pool without waiting for it. The function
+        is discarded if there are no free slots, returns whether the
+        function is scheduled.
+        """
+        pool = self._get_pool()
+        if not self._acquire(blocking=False):
+            return False
+        self._submit(pool, fn, *args, **kwargs)
+        return True
+
+
+executor = HashingExecutor(
+    concurrency=settings.PASSWORD_HASHING_CONCURRENCY,
+    timeout=settings.PASSWORD_HASHING_TIMEOUT,
+)
@@ -0,0 +1,90 @@
+import json
+import time
+from typing import Any
+from uuid import UUID
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db.models import Exists, OuterRef, QuerySet
+from django.db.models.functions import JSONObject
+
+from asu.auth.models import User, UserBlock, UserFollow, UserFollowRequest
+
+
+def get_annotated_queryset(viewer: User, pks: list[UUID]) -> QuerySet[User]:
+    # The previous implementation of the relations endpoint, which
+    # evaluates six correlated subqueries for each candidate.
+    pending = UserFollowRequest.Status.PENDING
+    return (
+        User.objects.filter(pk__in=pks)
+        .only("id", "username")
+        .annotate(
+            rels=JSONObject(
+                following=Exists(
+                    UserFollow.objects.filter(to_user=OuterRef("pk"), from_user=viewer)
+                ),
+                followed_by=Exists(
+                    UserFollow.objects.filter(to_user=viewer, from_user=OuterRef("pk"))
+                ),
+                blocking=Exists(
+                    UserBlock.objects.filter(to_user=OuterRef("pk"), from_user=viewer)
+                ),
+                blocked_by=Exists(
+                    UserBlock.objects.filter(to_user=viewer, from_user=OuterRef("pk"))
+                ),
+                follow_request_sent=Exists(
+                    UserFollowRequest.objects.filter(
+                        to_user=OuterRef("pk"), from_user=viewer, status=pending
+                    )
+                ),
+                follow_request_received=Exists(
+                    UserFollowRequest.objects.filter(
+                        to_user=viewer, from_user=OuterRef("pk"), status=pending
+                    )
+                ),
+            )
+        )
+    )
+
+
+def get_total_cost(queryset: QuerySet[Any]) -> float:
+    plan = json.loads(queryset.explain(format="json"))
+    return float(plan[0]["Plan"]["Total Cost"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the plan costs and timings of the relations query against"
+        " the previous, annotation based query, for given user."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("username")
+        parser.add_argument("--count", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        viewer = User.objects.filter(username__iexact=options["username"]).first()
+        if viewer is None:
+            raise CommandError("User not found.")
+        pks = list(
+            User.objects.active()
+            .exclude(pk=viewer.pk)
+            .order_by("-id")
+            .values_list("pk", flat=True)[: options["count"]]
+        )
+        annotated = get_annotated_queryset(viewer, pks)
+        first, *rest = viewer.get_relation_queries(pks)
+        union = first.union(*rest, all=True)
+
+        self.stdout.write("candidates: %d" % len(pks))
+        for name, queryset, run in (
+            ("annotation", annotated, lambda: list(annotated)),
+            ("union", union, lambda: viewer.get_relations(pks)),
+        ):
+            start = time.perf_counter()
+            for _ in range(options["repeat"]):
+                run()
+            elapsed = (time.perf_counter() - start) / options["repeat"] * 1000
+            self.stdout.write(
+                "%s: cost=%.2f, mean=%.2fms" % (name, get_total_cost(queryset), elapsed)
+            )
@@ -0,0 +1,100 @@
+import random
+import statistics
+import time
+from typing import Any
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from asu.auth.models import User, UserBlock
+
+SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ya", "ze")
+
+
+def get_name(rng: random.Random, *, syllables: int) -> str:
+    return "".join(rng.choices(SYLLABLES, k=syllables))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure user search latency using synthetic users, with the blocks of"
+        " the searching user excluded. Changes are rolled back once the"
+        " benchmark is complete, so it is safe to run against a populated"
+        " database."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--users", type=int, default=20000)
+        parser.add_argument("--blocks", type=int, default=100)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--target-ms",
+            type=float,
+            help="Fail if the 95th percentile latency exceeds this value.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            p95 = self.run(
+                users=options["users"],
+                blocks=options["blocks"],
+                queries=options["queries"],
+                rng=random.Random(options["seed"]),
+            )
+            transaction.set_rollback(True)
+        target = options["target_ms"]
+        if target is not None and p95 > target:
+            raise CommandError(
+                "p95 latency of %.2fms exceeds the target of %.2fms" % (p95, target)
+            )
+
+    def run(
+        self, *, users: int, blocks: int, queries: int, rng: random.Random
+    ) -> float:
+        password = make_password(None)
+        population = User.objects.bulk_create(
+            User(
+                username="%s%d" % (get_name(rng, syllables=3), index),
+                display_name="%s %s"
+                % (get_name(rng, syllables=3), get_name(rng, syllables=4)),
+                email="bench%s@example.com" % index,
+                password=password,
+            )
+            for index in range(users)
+        )
+        viewer, *others = population
+        UserBlock.objects.bulk_create(
+            UserBlock(from_user=viewer, to_user=to_user)
+            for to_user in rng.sample(others, min(blocks, len(others)))
+        )
+        with connection.cursor() as cursor:
+            # Make sure the planner knows about the synthetic rows.
+            cursor.execute(
+                "ANALYZE %s" % connection.ops.quote_name(User._meta.db_table)
+            )
+
+        latencies = []
+        for _ in range(queries):
+            user = rng.choice(others)
+            name = rng.choice([user.username, user.display_name])
+            start = rng.randrange(0, max(len(name) - 3, 0) + 1)
+            query = name[start : start + rng.randint(3, 6)]
+            started = time.perf_counter()
+            list(
+                User.objects.search(query)
+                .exclude(Exists(viewer.get_block_rels(OuterRef("pk"))))
+                .only("id", "username", "display_name")[:20]
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        p50, p95, p99 = (
+            statistics.quantiles(latencies, n=100)[q - 1] for q in (50, 95, 99)
+        )
+        self.stdout.write(
+            "search: %d queries over %d users, p50=%.2fms p95=%.2fms p99=%.2fms"
+            % (queries, users, p50, p95, p99)
+        )
+        return p95
@@ -0,0 +1,30 @@
+import itertools
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from asu.auth.models import User
+from asu.auth.models.user import AUTOCOMPLETE_FIELDS
+from asu.auth.search import clear_index, index_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the user autocomplete index from the database. Autocomplete"
+        " returns partial results while the index is being rebuilt."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        clear_index()
+        queryset = User.objects.active().only(*AUTOCOMPLETE_FIELDS)
+        batch_size = options["batch_size"]
+        count = 0
+        for batch in itertools.batched(
+            queryset.iterator(chunk_size=batch_size), batch_size, strict=False
+        ):
+            index_users(batch)
+            count += len(batch)
+        self.stdout.write("Indexed %d user(s)." % count)
@@ -1,16 +1,64 @@
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.deprecation import MiddlewareMixin
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 
+from asu.auth.hashing import HashingUnavailable
+
+
+@sync_and_async_middleware
 class UserActivityMiddleware:
-    def __init__(self, get_response: Callable[..., HttpResponse]) -> None:
+    """
+    Reactivate frozen accounts of authenticated users. Supports both sync
+    and async requests, so that async views are served without switching
+    threads.
+    """
+
+    def __init__(
+        self,
+        get_response: Callable[[HttpRequest], HttpResponse]
+        | Callable[[HttpRequest], Awaitable[HttpResponse]],
+    ) -> None:
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request: HttpRequest) -> HttpResponse:
-        user = request.user
+        if iscoroutinefunction(self):
+            return self.__acall__(request)  # type: ignore[return-value]
 
+        user = request.user
         if user.is_authenticated and user.is_frozen:
             user.reactivate()
+        return self.get_response(request)  # type: ignore[return-value]
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        user = await request.auser()
+        if user.is_authenticated and user.is_frozen:
+            await sync_to_async(user.reactivate)()
+        return await self.get_response(request)  # type: ignore[misc]
+
+
+class HashingUnavailableMiddleware(MiddlewareMixin):
+    """
+    Handle `HashingUnavailable` for views outside REST framework (e.g., OAuth
+    token endpoint), using the same response structure as API errors.
+    """
 
-        return self.get_response(request)
+    def process_exception(
+        self, request: HttpRequest, exception: Exception
+    ) -> HttpResponse | None:
+        if not isinstance(exception, HashingUnavailable):
+            return None
+        return JsonResponse(
+            {
+                "status": exception.status_code,
+                "code": exception.default_code,
+                "message": str(exception.detail),
+            },
+            status=exception.status_code,
+            headers={"Retry-After": str(exception.wait)},
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 6.1a1 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("account", "0003_proxies"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="userfollowrequest",
+            name="follow_request_frequents",
+        ),
+        migrations.AddIndex(
+            model_name="userfollowrequest",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["to_user", "-id"],
+                name="pending_follow_requests",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userfollowrequest",
+            index=models.Index(
+                condition=models.Q(("status", "pending"), _negated=True),
+                fields=["updated_at"],
+                name="resolved_follow_requests",
+            ),
+        ),
+    ]
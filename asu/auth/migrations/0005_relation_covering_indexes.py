@@ -0,0 +1,36 @@
+# Generated by Django 6.1a1 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("account", "0004_follow_request_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userblock",
+            index=models.Index(
+                fields=["from_user", "-id"],
+                include=("to_user",),
+                name="user_blocked",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userfollow",
+            index=models.Index(
+                fields=["to_user", "-id"],
+                include=("from_user",),
+                name="user_followers",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userfollow",
+            index=models.Index(
+                fields=["from_user", "-id"],
+                include=("to_user",),
+                name="user_following",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.1a1 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("account", "0005_relation_covering_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="profile_picture_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Sizes and formats of the variants that were created"
+                " for the profile picture.",
+                verbose_name="profile picture variants",
+            ),
+        ),
+    ]
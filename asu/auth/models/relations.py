@@ -1,9 +1,24 @@
+import functools
+from collections.abc import Collection
+from datetime import datetime
+from uuid import UUID
+
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models, transaction
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.db.models.functions import Now
 from django.utils.translation import gettext_lazy as _
 
-from asu.core.models.base import Base
+from asu.auth.events import publish_relation_event, publish_relation_events
+from asu.core.models.base import Base, BaseManager
+from asu.core.utils.cache import build_vary_key
+
+PENDING_COUNT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_pending_count_cache_key(user_id: UUID) -> str:
+    return build_vary_key("follow_requests.pending", "user", str(user_id))
 
 
 class UserRelation(Base):
@@ -34,10 +49,172 @@ class UserRelation(Base):
 class UserFollow(UserRelation):
     updated = None
 
+    class Meta(UserRelation.Meta):
+        # Followers and follows are listed in the order they were created,
+        # these cover both lists so that pages are read by index range scans.
+        indexes = [
+            models.Index(
+                fields=["to_user", "-id"],
+                include=["from_user"],
+                name="user_followers",
+            ),
+            models.Index(
+                fields=["from_user", "-id"],
+                include=["to_user"],
+                name="user_following",
+            ),
+        ]
+
 
 class UserBlock(UserRelation):
     updated = None
 
+    class Meta(UserRelation.Meta):
+        indexes = [
+            models.Index(
+                fields=["from_user", "-id"],
+                include=["to_user"],
+                name="user_blocked",
+            ),
+        ]
+
+
+class UserFollowRequestManager(BaseManager["UserFollowRequest"]):
+    def get_pending_count(self, user_id: UUID) -> int:
+        """
+        Get the number of pending follow requests sent to given user. The
+        count is kept in cache, and maintained as the requests are sent,
+        accepted or rejected; see `adjust_pending_count`.
+        """
+        key = get_pending_count_cache_key(user_id)
+        count: int | None = cache.get(key)
+        if count is None:
+            count = self.filter(
+                to_user=user_id,
+                status=UserFollowRequest.Status.PENDING,
+            ).count()
+            cache.add(key, count, timeout=PENDING_COUNT_CACHE_TIMEOUT)
+        # Concurrent updates might cause the counter to drift, until it is
+        # reconciled.
+        return max(count, 0)
+
+    def adjust_pending_count(self, user_id: UUID, delta: int) -> None:
+        """
+        Adjust the cached number of pending follow requests of given user,
+        once the current transaction commits. Counters that are not cached
+        are left alone, they will be counted on the next read.
+        """
+        transaction.on_commit(functools.partial(_adjust_count, user_id, delta))
+
+    def forget_pending_counts(self, *user_ids: UUID) -> None:
+        keys = [get_pending_count_cache_key(user_id) for user_id in user_ids]
+        transaction.on_commit(functools.partial(cache.delete_many, keys))
+
+    def reconcile_pending_counts(self, user_ids: Collection[UUID]) -> None:
+        """
+        Count pending follow requests of given users using a single grouped
+        query, and replace their cached counters.
+        """
+        counts = dict(
+            self.filter(
+                to_user__in=user_ids,
+                status=UserFollowRequest.Status.PENDING,
+            )
+            .values("to_user")
+            .annotate(count=Count("id"))
+            .values_list("to_user", "count")
+        )
+        cache.set_many(
+            {
+                get_pending_count_cache_key(user_id): counts.get(user_id, 0)
+                for user_id in user_ids
+            },
+            timeout=PENDING_COUNT_CACHE_TIMEOUT,
+        )
+
+    def answer_pending(
+        self,
+        to_user_id: UUID,
+        *,
+        accept: bool,
+        ids: Collection[UUID] | None = None,
+        batch_size: int = 500,
+    ) -> int:
+        """
+        Accept or reject pending follow requests sent to given user, all of
+        them unless `ids` are given. Requests are processed in batches, each
+        in its own transaction. Rows locked by concurrent transactions (e.g.,
+        a request being accepted individually) are skipped. Returns the
+        number of requests processed.
+        """
+        pending = self.filter(
+            to_user=to_user_id,
+            status=UserFollowRequest.Status.PENDING,
+        )
+        if ids is not None:
+            pending = pending.filter(pk__in=ids)
+        status = (
+            UserFollowRequest.Status.APPROVED
+            if accept
+            else UserFollowRequest.Status.REJECTED
+        )
+
+        processed = 0
+        while True:
+            with transaction.atomic(durable=True):
+                batch = list(
+                    pending.select_for_update(skip_locked=True)
+                    .order_by("pk")
+                    .values_list("pk", "from_user_id")[:batch_size]
+                )
+                if not batch:
+                    return processed
+                self.filter(pk__in=[pk for pk, _ in batch]).update(
+                    status=status,
+                    updated_at=Now(),
+                )
+                relations = [(from_user_id, to_user_id) for _, from_user_id in batch]
+                if accept:
+                    UserFollow.objects.bulk_create(
+                        [
+                            UserFollow(from_user_id=from_user_id, to_user_id=to_user_id)
+                            for from_user_id, _ in relations
+                        ],
+                        ignore_conflicts=True,
+                    )
+                self.adjust_pending_count(to_user_id, -len(batch))
+                publish_relation_events(
+                    "follow_request.accepted" if accept else "follow_request.rejected",
+                    relations,
+                )
+            processed += len(batch)
+
+    def delete_resolved(self, *, before: datetime, batch_size: int = 1000) -> int:
+        """
+        Delete approved and rejected requests that were resolved before
+        given date, in batches, so that each statement only locks a bounded
+        number of rows. Returns the number of requests deleted.
+        """
+        resolved = (
+            self.exclude(status=UserFollowRequest.Status.PENDING)
+            .filter(updated_at__lt=before)
+            .order_by("updated_at")
+            .values_list("pk", flat=True)
+        )
+        deleted = 0
+        while True:
+            count, _ = self.filter(pk__in=list(resolved[:batch_size])).delete()
+            deleted += count
+            if count < batch_size:
+                return deleted
+
+
+def _adjust_count(user_id: UUID, delta: int) -> None:
+    try:
+        cache.incr(get_pending_count_cache_key(user_id), delta)
+    except ValueError:
+        pass
+
 
 class UserFollowRequest(UserRelation):
     class Status(models.TextChoices):
@@ -52,6 +229,8 @@ class UserFollowRequest(UserRelation):
         default=Status.PENDING,
     )
 
+    objects = UserFollowRequestManager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -61,9 +240,18 @@ class UserFollowRequest(UserRelation):
             )
         ]
         indexes = [
+            # Resolved requests are only kept for a while, see
+            # `delete_resolved`. The partial indexes keep the live rows
+            # apart from the history.
             models.Index(
-                fields=["status", "from_user", "to_user"],
-                name="follow_request_frequents",
+                fields=["to_user", "-id"],
+                condition=Q(status="pending"),
+                name="pending_follow_requests",
+            ),
+            models.Index(
+                fields=["updated_at"],
+                condition=~Q(status="pending"),
+                name="resolved_follow_requests",
             ),
         ]
 
@@ -76,14 +264,26 @@ class UserFollowRequest(UserRelation):
         assert self.is_pending
         self.status = self.Status.APPROVED
         self.save(update_fields=["status", "updated_at"])
+        UserFollowRequest.objects.adjust_pending_count(self.to_user_id, -1)
 
         rel = UserFollow(from_user_id=self.from_user_id, to_user_id=self.to_user_id)
         UserFollow.objects.bulk_create(
             [rel],
             ignore_conflicts=True,
         )
+        publish_relation_event(
+            "follow_request.accepted",
+            from_user_id=self.from_user_id,
+            to_user_id=self.to_user_id,
+        )
 
     def reject(self) -> None:
         assert self.is_pending
         self.status = self.Status.REJECTED
         self.save(update_fields=["status", "updated_at"])
+        UserFollowRequest.objects.adjust_pending_count(self.to_user_id, -1)
+        publish_relation_event(
+            "follow_request.rejected",
+            from_user_id=self.from_user_id,
+            to_user_id=self.to_user_id,
+        )
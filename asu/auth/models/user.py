@@ -1,26 +1,33 @@
 import functools
 import io
+import posixpath
+from collections.abc import Collection, Iterable
 from datetime import timedelta
-from typing import Any, AnyStr, ClassVar
+from typing import TYPE_CHECKING, Any, AnyStr, ClassVar
+from uuid import UUID
 
 import django.core.exceptions
 from django.conf import settings
 from django.contrib.auth.base_user import AbstractBaseUser
+from django.contrib.auth.hashers import check_password, make_password
 from django.contrib.auth.models import (
     PermissionsMixin,
     UserManager as DjangoUserManager,
 )
 from django.contrib.auth.password_validation import validate_password
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import TrigramSimilarity
 from django.core.cache import cache
-from django.core.files.base import ContentFile, File
+from django.core.files.base import File
 from django.core.validators import (
     MaxLengthValidator,
     MinLengthValidator,
     RegexValidator,
 )
 from django.db import models, transaction
-from django.db.models import F, Q, QuerySet, Value
-from django.db.models.functions import Concat, Upper
+from django.db.models import Count, F, OuterRef, Q, QuerySet, Value
+from django.db.models.base import ModelBase
+from django.db.models.functions import Concat, Greatest, Upper
 from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.module_loading import import_string
@@ -31,9 +38,9 @@ from rest_framework import serializers
 import oauthlib.common
 import sorl.thumbnail
 from oauth2_provider.settings import oauth2_settings
-from PIL import Image
 from sorl.thumbnail import get_thumbnail
 
+from asu.auth import hashing, search
 from asu.auth.models import (
     AccessToken,
     Application,
@@ -46,11 +53,24 @@ from asu.auth.models import (
     UserFollow,
     UserFollowRequest,
 )
+from asu.core.models import MediaBlob
 from asu.core.models.base import Base, BaseManager
 from asu.core.utils import mailing, messages
-from asu.core.utils.file import FileSizeValidator, MimeTypeValidator, UserContentPath
+from asu.core.utils.cache import build_vary_key
+from asu.core.utils.file import (
+    FileSizeValidator,
+    ImageDimensionsValidator,
+    MimeTypeValidator,
+    UserContentPath,
+    get_blob_name,
+    get_file_digest,
+    get_urls,
+)
 from asu.core.utils.messages import EmailMessage
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 
 class UsernameValidator(RegexValidator):
     regex = r"^[a-zA-Z0-9]+(_[a-zA-Z0-9]+)*$"
@@ -81,6 +101,61 @@ EMAIL_CONSTRAINTS = [
     ),
 ]
 
+PROFILE_PICTURE_MAX_SIZE = 2**21  # 2 MB
+PROFILE_PICTURE_TYPES = ["image/png", "image/jpeg"]
+PROFILE_PICTURE_MAX_PIXELS = 4096 * 4096
+PROFILE_PICTURE_UPLOAD_PATH = UserContentPath("uploads/{instance.pk}/{uuid}{ext}")
+"""
+Names of profile pictures uploaded directly to the storage, until they are
+processed. Uploads are kept under their own prefix, so that the ones never
+confirmed can be found and deleted; see `delete_stale_profile_picture_uploads`.
+"""
+PROFILE_PICTURE_SIZES = (64, 150, 400)
+PROFILE_PICTURE_FORMATS = {
+    "avif": ("image/avif", {"quality": 60}),
+    "webp": ("image/webp", {"quality": 80}),
+    "jpeg": ("image/jpeg", {"quality": 85}),
+}
+"""
+Formats of profile picture variants, in order of preference, along with
+their mime types and encoder options.
+"""
+
+
+def get_profile_picture_variant(name: str, size: int, ext: str) -> str:
+    # Variants are stored next to the picture, under a directory named
+    # after it, e.g., '<picture>/150.webp'.
+    base = posixpath.splitext(name)[0]
+    return "%s/%d.%s" % (base, size, ext)
+
+
+RELATION_KINDS = (
+    "following",
+    "followed_by",
+    "blocking",
+    "blocked_by",
+    "follow_request_sent",
+    "follow_request_received",
+)
+"""
+Relations a user might have with another user, from their point of view.
+"""
+
+USERNAME_CACHE_TIMEOUT = 60 * 60
+USERNAME_MISS_CACHE_TIMEOUT = 30
+USERNAME_CACHE_FIELDS = frozenset({"username", "is_active", "is_frozen"})
+"""
+Changes to these fields invalidate cached username resolutions.
+"""
+AUTOCOMPLETE_FIELDS = frozenset({"username", "display_name", "is_active", "is_frozen"})
+"""
+Changes to these fields update the autocomplete entries of the user.
+"""
+
+
+def get_username_cache_key(username: str) -> str:
+    return build_vary_key("username", "username", username.upper())
+
 
 class UserManager(BaseManager["User"], DjangoUserManager["User"]):
     def active(self) -> QuerySet[User]:
@@ -90,6 +165,105 @@ class UserManager(BaseManager["User"], DjangoUserManager["User"]):
         """
         return self.filter(is_active=True, is_frozen=False)
 
+    def search(self, query: str) -> QuerySet[User]:
+        """
+        Active users whose username or display name contains given query,
+        ordered by their trigram similarity to the query. Both lookups are
+        served by the trigram indexes of these fields.
+        """
+        return (
+            self.active()
+            .filter(Q(username__icontains=query) | Q(display_name__icontains=query))
+            .alias(
+                similarity=Greatest(
+                    TrigramSimilarity("username", query),
+                    TrigramSimilarity("display_name", query),
+                )
+            )
+            .order_by("-similarity", "-id")
+        )
+
+    def update_autocomplete(self, pks: Collection[UUID]) -> None:
+        """
+        Update the autocomplete entries of given users, using their current
+        state in the database.
+        """
+        search.index_users(self.filter(pk__in=pks).only(*AUTOCOMPLETE_FIELDS))
+
+    def get_follow_counts(
+        self, pks: Collection[UUID]
+    ) -> tuple[dict[UUID, int], dict[UUID, int]]:
+        """
+        Get the number of follows and followers of given users, using one
+        grouped query for each. Users without any relations are omitted.
+        """
+        following = (
+            UserFollow.objects.filter(from_user__in=pks)
+            .values("from_user")
+            .annotate(count=Count("id"))
+            .values_list("from_user", "count")
+        )
+        followers = (
+            UserFollow.objects.filter(to_user__in=pks)
+            .values("to_user")
+            .annotate(count=Count("id"))
+            .values_list("to_user", "count")
+        )
+        return dict(following), dict(followers)
+
+    def resolve_username(self, username: str) -> UUID | None:
+        """
+        Get the id of the active user with given username (case-insensitive)
+        using cache. Unknown usernames and inaccessible users are also
+        cached, for a short while.
+
+        Cached entries might be stale, so the callers should make sure the
+        user with resolved id still has given username and is active.
+        """
+        key = get_username_cache_key(username)
+        entry: tuple[UUID | None, bool] | None = cache.get(key)
+        if entry is None:
+            user = (
+                self.filter(username__iexact=username)
+                .values_list("pk", "is_active", "is_frozen")
+                .first()
+            )
+            if user is None:
+                entry = (None, False)
+            else:
+                pk, is_active, is_frozen = user
+                entry = (pk, is_active and not is_frozen)
+            # Callers trust negative entries, so they are kept for a short
+            # while in case they were cached right before a reactivation.
+            timeout = (
+                USERNAME_CACHE_TIMEOUT if entry[1] else USERNAME_MISS_CACHE_TIMEOUT
+            )
+            cache.set(key, entry, timeout=timeout)
+        pk, is_accessible = entry
+        return pk if is_accessible else None
+
+    def forget_usernames(self, *usernames: str) -> None:
+        """
+        Invalidate cached resolutions of given usernames. This is repeated
+        once the current transaction commits, so that resolutions cached
+        in between do not outlive the changes.
+        """
+        keys = [get_username_cache_key(username) for username in usernames]
+        cache.delete_many(keys)
+        transaction.on_commit(functools.partial(cache.delete_many, keys))
+
+    def upgrade_password_hash(
+        self, pk: UUID, encoded: str, raw_password: str, /
+    ) -> None:
+        """
+        Hash the password again using the preferred hasher. The password is
+        kept as is if it was changed in the meantime. This is called from
+        the hashing executor, outside the request/response cycle.
+        """
+        self.filter(pk=pk, password=encoded).update(
+            password=make_password(raw_password)
+        )
+
 
 class User(Base, PermissionsMixin, AbstractBaseUser):  # type: ignore[django-manager-missing]
     # Personal information
@@ -112,10 +286,20 @@ class User(Base, PermissionsMixin, AbstractBaseUser):  # type: ignore[django-man
         blank=True,
         upload_to=UserContentPath("{instance.pk}/profile_picture/{uuid}{ext}"),
         validators=[
-            FileSizeValidator(max_size=2**21),  # 2 MB
-            MimeTypeValidator(allowed_types=["image/png", "image/jpeg"]),
+            FileSizeValidator(max_size=PROFILE_PICTURE_MAX_SIZE),
+            MimeTypeValidator(allowed_types=PROFILE_PICTURE_TYPES),
         ],
     )
+    profile_picture_variants = models.JSONField(
+        _("profile picture variants"),
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text=_(
+            "Sizes and formats of the variants that were created for the"
+            " profile picture."
+        ),
+    )
     language = models.CharField(
         _("language"),
         max_length=8,
@@ -181,6 +365,18 @@ class User(Base, PermissionsMixin, AbstractBaseUser):  # type: ignore[django-man
             *USERNAME_CONSTRAINTS,
             *EMAIL_CONSTRAINTS,
         ]
+        indexes = [
+            # Serve case-insensitive pattern matching of `search` and the
+            # autocomplete fallback, which compare upper-cased values.
+            GinIndex(
+                OpClass(Upper("username"), name="gin_trgm_ops"),
+                name="user_username_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("display_name"), name="gin_trgm_ops"),
+                name="user_display_name_trgm",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.username
@@ -189,6 +385,28 @@ class User(Base, PermissionsMixin, AbstractBaseUser):  # type: ignore[django-man
         super().clean()
         self.email = User.objects.normalize_email(self.email)
 
+    def save(
+        self,
+        *,
+        force_insert: bool | tuple[ModelBase, ...] = False,
+        force_update: bool = False,
+        using: str | None = None,
+        update_fields: Iterable[str] | None = None,
+    ) -> None:
+        super().save(
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
+        if update_fields is None or not USERNAME_CACHE_FIELDS.isdisjoint(update_fields):
+            User.objects.forget_usernames(self.username)
+        if update_fields is None or not AUTOCOMPLETE_FIELDS.isdisjoint(update_fields):
+            transaction.on_commit(
+                functools.partial(User.objects.update_autocomplete, [self.pk]),
+                using=using,
+            )
+
     def following_count(self) -> int:
         return self.following.count()
 
@@ -214,11 +432,14 @@ class User(Base, PermissionsMixin, AbstractBaseUser):  # type: ignore[django-man
         return UserFollow.objects.get_or_create(from_user=self, to_user=to_user)
 
     def send_follow_request(self, *, to_user: User) -> tuple[UserFollowRequest, bool]:
-        return UserFollowRequest.objects.get_or_create(
+        request, created = UserFollowRequest.objects.get_or_create(
             from_user=self,
             to_user=to_user,
             status=UserFollowRequest.Status.PENDING,
         )
+        if created:
+            UserFollowRequest.objects.adjust_pending_count(to_user.pk, 1)
+        return request, created
 
     def get_pending_follow_requests(self) -> QuerySet[UserFollowRequest]:
         return UserFollowRequest.objects.filter(
@@ -228,54 +449,284 @@ class User(Base, PermissionsMixin, AbstractBaseUser):  # type: ignore[django-man
     def is_following(self, to_user: User) -> bool:
         return UserFollow.objects.filter(from_user=self, to_user=to_user).exists()
 
-    def has_block_rel(self, to_user: User) -> bool:
-        # Check symmetric blocking status
+    async def ais_following(self, to_user: User) -> bool:
+        return await UserFollow.objects.filter(
+            from_user=self, to_user=to_user
+        ).aexists()
+
+    def get_block_rels(self, to_user: User | OuterRef) -> QuerySet[UserBlock]:
+        # Blocking relations in both directions. Pass `OuterRef` to use
+        # this in subqueries, e.g., to exclude users in bulk.
         return UserBlock.objects.filter(
             Q(from_user=self, to_user=to_user) | Q(from_user=to_user, to_user=self)
-        ).exists()
+        )
+
+    def get_relation_queries(self, pks: Collection[UUID]) -> list[QuerySet[Any]]:
+        """
+        Queries that yield `(user_id, kind)` rows for each relation kind in
+        `RELATION_KINDS`, between this user and given users.
+        """
+        pending = UserFollowRequest.Status.PENDING
+        relations: list[tuple[str, QuerySet[Any], str, str]] = [
+            ("following", UserFollow.objects.all(), "from_user", "to_user"),
+            ("followed_by", UserFollow.objects.all(), "to_user", "from_user"),
+            ("blocking", UserBlock.objects.all(), "from_user", "to_user"),
+            ("blocked_by", UserBlock.objects.all(), "to_user", "from_user"),
+            (
+                "follow_request_sent",
+                UserFollowRequest.objects.filter(status=pending),
+                "from_user",
+                "to_user",
+            ),
+            (
+                "follow_request_received",
+                UserFollowRequest.objects.filter(status=pending),
+                "to_user",
+                "from_user",
+            ),
+        ]
+        return [
+            queryset.filter(**{viewer: self, "%s__in" % other: pks})
+            .order_by()
+            .annotate(
+                user_id=F("%s_id" % other),
+                kind=Value(kind, output_field=models.CharField()),
+            )
+            .values_list("user_id", "kind")
+            for kind, queryset, viewer, other in relations
+        ]
+
+    def get_relations(self, pks: Collection[UUID]) -> dict[UUID, dict[str, bool]]:
+        """
+        Get the relations of this user with given users, using a single
+        `UNION ALL` query. Each user is mapped to the flags of relation kinds
+        listed in `RELATION_KINDS`.
+        """
+        relations = {pk: dict.fromkeys(RELATION_KINDS, False) for pk in pks}
+        if not relations:
+            return relations
+        first, *rest = self.get_relation_queries(relations.keys())
+        for pk, kind in first.union(*rest, all=True):
+            relations[pk][kind] = True
+        return relations
+
+    async def aget_relations(
+        self, pks: Collection[UUID]
+    ) -> dict[UUID, dict[str, bool]]:
+        # Same as `get_relations`, using the async ORM.
+        relations = {pk: dict.fromkeys(RELATION_KINDS, False) for pk in pks}
+        if not relations:
+            return relations
+        first, *rest = self.get_relation_queries(relations.keys())
+        async for pk, kind in first.union(*rest, all=True):
+            relations[pk][kind] = True
+        return relations
+
+    def has_block_rel(self, to_user: User) -> bool:
+        # Check symmetric blocking status
+        return self.get_block_rels(to_user).exists()
+
+    async def ahas_block_rel(self, to_user: User) -> bool:
+        return await self.get_block_rels(to_user).aexists()
 
     def set_profile_picture(self, file: File[AnyStr]) -> None:
-        if self.profile_picture:
-            sorl.thumbnail.delete(self.profile_picture, delete_file=False)
-            self.profile_picture.delete(save=False)
+        # Pictures are stored once per distinct upload, and shared by all
+        # the users that have uploaded the same content.
+        digest = get_file_digest(file)
+        blob = MediaBlob.objects.acquire(
+            digest,
+            name=get_blob_name(digest, ".jpeg"),
+            storage=self.profile_picture.storage,
+            create=functools.partial(self.create_profile_picture, file),
+        )
+        self.release_profile_picture()
+        self.profile_picture = blob.name
+        self.profile_picture_variants = blob.variants
+        self.save(
+            update_fields=["profile_picture", "profile_picture_variants", "updated_at"]
+        )
+
+    def create_profile_picture(
+        self, file: File[AnyStr], name: str
+    ) -> tuple[dict[str, bytes], dict[str, Any]]:
+        """
+        Create a resized copy of given image to store under `name`, along
+        with its variants. Returns the contents of the files by their names,
+        and the manifest of variants.
+        """
+        # Pillow is only needed while processing uploads, importing it at
+        # module level would slow down the start of every process.
+        from PIL import Image  # noqa: PLC0415
+
+        # Direct uploads are confirmed by their head, and could be replaced
+        # until their presigned form expires, so the limit is checked again.
+        ImageDimensionsValidator(PROFILE_PICTURE_MAX_PIXELS)(file)
 
-        name = file.name
         thumb_io = io.BytesIO()
         image = Image.open(file)
 
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-
         maxsize = 400
         width, height = image.size
         ratio = min(maxsize / width, maxsize / height)
         size = (int(width * ratio), int(height * ratio))
 
-        image = image.resize(size, Image.LANCZOS)
+        # JPEG images are decoded at the smallest scale that is still larger
+        # than the target size, the rest are reduced before resampling.
+        image.draft("RGB", size)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
         image.save(thumb_io, format="JPEG")
 
-        self.profile_picture = ContentFile(thumb_io.getvalue(), name=name)
-        self.save(update_fields=["profile_picture", "updated_at"])
+        files, manifest = self.create_profile_picture_variants(name, image)
+        files[name] = thumb_io.getvalue()
+        return files, manifest
+
+    def get_profile_picture_variant(self, size: int, ext: str) -> str:
+        return get_profile_picture_variant(self.profile_picture.name, size, ext)
+
+    def get_profile_picture_variants(self) -> list[tuple[str, int, str]]:
+        """
+        Get the format, size and name of each variant listed in the manifest.
+        """
+        manifest = self.profile_picture_variants
+        return [
+            (ext, size, self.get_profile_picture_variant(size, ext))
+            for ext in manifest.get("formats", ())
+            for size in manifest["sizes"]
+        ]
 
-    def get_profile_picture(self, size: tuple[int, int] = (150, 150)) -> str | None:
+    def create_profile_picture_variants(
+        self, name: str, image: Image.Image
+    ) -> tuple[dict[str, bytes], dict[str, Any]]:
+        """
+        Create square crops of given image in each size and format, to store
+        next to the picture under `name`. Returns the contents of the crops
+        by their names, and the manifest to describe them with.
+        """
+        from PIL import Image, ImageOps, features  # noqa: PLC0415
+
+        files: dict[str, bytes] = {}
+        formats = [
+            ext
+            for ext in PROFILE_PICTURE_FORMATS
+            if ext != "avif" or features.check("avif")
+        ]
+        for size in PROFILE_PICTURE_SIZES:
+            variant = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            for ext in formats:
+                options = PROFILE_PICTURE_FORMATS[ext][1]
+                buffer = io.BytesIO()
+                variant.save(buffer, format=ext.upper(), **options)
+                files[get_profile_picture_variant(name, size, ext)] = buffer.getvalue()
+        return files, {"sizes": list(PROFILE_PICTURE_SIZES), "formats": formats}
+
+    def release_profile_picture(self) -> None:
+        """
+        Detach the current profile picture, deleting its files unless they
+        are shared with other users.
+        """
+        if not self.profile_picture:
+            return
+        MediaBlob.objects.release(
+            self.profile_picture.name, delete=self.delete_profile_picture_files
+        )
+        self.profile_picture = None
+        self.profile_picture_variants = {}
+
+    def delete_profile_picture_files(self) -> None:
+        sorl.thumbnail.delete(self.profile_picture, delete_file=False)
+        self.delete_profile_picture_variants()
+        self.profile_picture.storage.delete(self.profile_picture.name)
+
+    def delete_profile_picture_variants(self) -> None:
+        storage = self.profile_picture.storage
+        for _ext, _size, name in self.get_profile_picture_variants():
+            storage.delete(name)
+        self.profile_picture_variants = {}
+
+    def get_profile_picture_size(self, size: tuple[int, int]) -> int:
+        # Smallest variant that is at least as large as requested size.
+        sizes = self.profile_picture_variants["sizes"]
+        return min((s for s in sizes if s >= max(size)), default=max(sizes))
+
+    def get_profile_picture(self, size: tuple[int, int] = (150, 150)) -> Any:
         if not self.profile_picture:
             return None
 
+        if self.profile_picture_variants:
+            name = self.get_profile_picture_variant(
+                self.get_profile_picture_size(size), "jpeg"
+            )
+            return self.profile_picture.storage.url(name)
+
+        # Pictures that were set before variants were introduced are
+        # served using thumbnails, which are created on demand.
         geometry = "%sx%s" % size
-        thumbnail: str | None = get_thumbnail(
+        return get_thumbnail(
             self.profile_picture,
             geometry,
             crop="center",
             quality=85,
         )
-        return thumbnail
+
+    @staticmethod
+    def get_profile_picture_urls(
+        users: Iterable[User], size: tuple[int, int] = (150, 150)
+    ) -> dict[UUID, str]:
+        """
+        Get the profile picture URLs of given users, signing the ones that
+        are not cached in bulk. Users without a profile picture are omitted.
+        """
+        names = {}
+        for user in users:
+            if not user.profile_picture:
+                continue
+            if user.profile_picture_variants:
+                names[user.pk] = user.get_profile_picture_variant(
+                    user.get_profile_picture_size(size), "jpeg"
+                )
+            elif thumbnail := user.get_profile_picture(size):
+                names[user.pk] = thumbnail.name
+        if not names:
+            return {}
+        storage = User._meta.get_field("profile_picture").storage  # type: ignore[attr-defined]
+        urls = get_urls(storage, names.values())
+        return {pk: urls[name] for pk, name in names.items()}
+
+    @staticmethod
+    def get_profile_picture_sources(
+        users: Iterable[User],
+    ) -> dict[UUID, list[tuple[str, int, str]]]:
+        """
+        Get the format, size and URL of each profile picture variant of given
+        users, signing the ones that are not cached in bulk.
+        """
+        variants = {
+            user.pk: user.get_profile_picture_variants()
+            for user in users
+            if user.profile_picture and user.profile_picture_variants
+        }
+        storage = User._meta.get_field("profile_picture").storage  # type: ignore[attr-defined]
+        urls = get_urls(
+            storage, [name for items in variants.values() for *_, name in items]
+        )
+        return {
+            pk: [(ext, size, urls[name]) for ext, size, name in items]
+            for pk, items in variants.items()
+        }
 
     def delete_profile_picture(self) -> None:
-        image = self.profile_picture
-        if image:
-            sorl.thumbnail.delete(image, delete_file=False)
-            image.delete(save=False)
-            self.save(update_fields=["profile_picture", "updated_at"])
+        if self.profile_picture:
+            self.release_profile_picture()
+            self.save(
+                update_fields=[
+                    "profile_picture",
+                    "profile_picture_variants",
+                    "updated_at",
+                ]
+            )
 
     def issue_token(self) -> dict[str, Any]:
         # Programmatically issue tokens for this user. Used just after
@@ -355,6 +806,27 @@ class User(Base, PermissionsMixin, AbstractBaseUser):  # type: ignore[django-man
             revoked_at__isnull=True,
         ).update(revoked_at=timezone.now())
 
+    def set_password(self, raw_password: str | None) -> None:
+        self.password = hashing.executor.run(make_password, raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password: str) -> bool:
+        # Passwords hashed with outdated hashers or parameters are upgraded
+        # in the background, instead of making the caller wait for another
+        # hash to be computed.
+        encoded, outdated = self.password, False
+
+        def setter(raw_password: str) -> None:
+            nonlocal outdated
+            outdated = True
+
+        is_correct = hashing.executor.run(check_password, raw_password, encoded, setter)
+        if outdated:
+            hashing.executor.submit(
+                User.objects.upgrade_password_hash, self.pk, encoded, raw_password
+            )
+        return is_correct
+
     def set_validated_password(
         self,
         raw_password: str,
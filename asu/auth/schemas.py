@@ -2,17 +2,28 @@ import functools
 from typing import TYPE_CHECKING, Any
 
 from drf_spectacular.contrib.django_oauth_toolkit import DjangoOAuthToolkitScheme
-from drf_spectacular.utils import OpenApiExample, extend_schema
+from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schema
 
 from asu.auth.permissions import OAuthPermission, RequireScope
 from asu.auth.serializers.actions import (
+    FollowRequestBulkSerializer,
+    FollowRequestCountSerializer,
     FollowSerializer,
     PasswordChangeSerializer,
+    ProfilePictureConfirmSerializer,
+    ProfilePictureEditSerializer,
+    ProfilePictureUploadSerializer,
     RelationSerializer,
     UserConnectionSerializer,
+    UserConnectionWithRelationsSerializer,
+    UserSearchSerializer,
 )
 from asu.auth.serializers.user import (
+    UserAutocompleteQuerySerializer,
+    UserBatchQuerySerializer,
+    UserBatchSerializer,
     UserPublicReadSerializer,
+    UserSearchQuerySerializer,
     UserSerializer,
 )
 from asu.core.utils.openapi import Tag, examples, get_error_repr
@@ -27,6 +38,7 @@ __all__ = ["follow_request", "user"]
 
 class OAuthScheme(DjangoOAuthToolkitScheme):  # type: ignore[no-untyped-call]
     priority = 1
+    match_subclasses = True  # e.g., `AsyncOAuth2Authentication`
 
     def get_security_requirement(
         self, auto_schema: AutoSchema
@@ -73,21 +85,46 @@ retrieve = extend_schema(
     responses={200: UserPublicReadSerializer, 404: APIError},
 )
 
+connection_fields = OpenApiParameter(
+    "fields",
+    type=str,
+    description="Comma-separated list of fields to include in each item."
+    " Omit to include all fields. Available fields: %s."
+    % ", ".join(UserConnectionSerializer.Meta.fields),
+)
+connection_include = OpenApiParameter(
+    "include",
+    type=str,
+    enum=["relations"],
+    description="Set to 'relations' to include the relations of the"
+    " authenticated user with each item, as listed in the 'relations'"
+    " endpoint. Requires a user token with 'user.profile:read' scope.",
+)
+
 followers = extend_schema(
     summary="List followers of a user",
     tags=[Tag.USER_FOLLOW_OPERATIONS],
-    responses={200: UserConnectionSerializer(many=True), 404: APIError},
+    parameters=[connection_fields, connection_include],
+    responses={
+        200: UserConnectionWithRelationsSerializer(many=True),
+        404: APIError,
+    },
     examples=[examples.not_found],
 )
 following = extend_schema(
     summary="List follows of a user",
     tags=[Tag.USER_FOLLOW_OPERATIONS],
-    responses={200: UserConnectionSerializer(many=True), 404: APIError},
+    parameters=[connection_fields, connection_include],
+    responses={
+        200: UserConnectionWithRelationsSerializer(many=True),
+        404: APIError,
+    },
     examples=[examples.not_found],
 )
 blocked = extend_schema(
     summary="List blocked users",
     tags=[Tag.USER_BLOCK_OPERATIONS],
+    parameters=[connection_fields],
     responses={200: UserConnectionSerializer(many=True)},
 )
 
@@ -130,6 +167,36 @@ by = extend_schema(
     filters=True,
 )
 
+batch = extend_schema(
+    summary="Retrieve multiple users",
+    description="Retrieve up to 100 users by their ids or usernames, in the"
+    " order they were given. Users that do not exist, or have blocking"
+    " relations with the authenticated user are omitted.",
+    tags=[Tag.USER_RETRIEVAL],
+    parameters=[UserBatchQuerySerializer],
+    responses={200: UserBatchSerializer, 400: APIError},
+)
+
+search = extend_schema(
+    summary="Search users",
+    description="Search active users by their username or display name, most"
+    " similar users first. Up to 20 users are returned, users that have"
+    " blocking relations with the authenticated user are omitted.",
+    tags=[Tag.USER_RETRIEVAL],
+    parameters=[UserSearchQuerySerializer],
+    responses={200: UserSearchSerializer, 400: APIError},
+)
+
+autocomplete = extend_schema(
+    summary="Autocomplete users",
+    description="List up to 20 active users whose username, display name or"
+    " a word in their display name starts with given prefix. Users that have"
+    " blocking relations with the authenticated user are omitted.",
+    tags=[Tag.USER_RETRIEVAL],
+    parameters=[UserAutocompleteQuerySerializer],
+    responses={200: UserSearchSerializer, 400: APIError},
+)
+
 change_password = extend_schema(
     summary="Change password",
     tags=[Tag.USER_SETTINGS],
@@ -139,8 +206,12 @@ change_password = extend_schema(
 
 put_profile_picture = extend_schema(
     summary="Upload new profile picture",
+    description="Upload a profile picture and set it as the profile picture."
+    " The picture is processed in the background, the response represents the"
+    " current profile picture until then, with `pending` set.",
     tags=[Tag.USER_SETTINGS],
     methods=["put"],
+    responses={200: ProfilePictureEditSerializer, 400: APIError},
 )
 delete_profile_picture = extend_schema(
     summary="Remove profile picture",
@@ -149,6 +220,24 @@ delete_profile_picture = extend_schema(
 )
 profile_picture = lambda f: put_profile_picture(delete_profile_picture(f))  # noqa: E731
 
+profile_picture_upload = extend_schema(
+    summary="Create profile picture upload",
+    description="Create a presigned form to upload a profile picture directly"
+    " to object storage. Once the upload is complete, it must be confirmed"
+    " using its key. Not available if media is not served from object storage.",
+    tags=[Tag.USER_SETTINGS],
+    responses={201: ProfilePictureUploadSerializer, 400: APIError, 501: APIError},
+)
+
+profile_picture_confirm = extend_schema(
+    summary="Confirm profile picture upload",
+    description="Validate a direct upload and set it as the profile picture."
+    " The picture is processed in the background.",
+    tags=[Tag.USER_SETTINGS],
+    request=ProfilePictureConfirmSerializer,
+    responses={202: None, 400: APIError},
+)
+
 relations = extend_schema(
     summary="List relations with given users",
     tags=[Tag.USER_FOLLOW_OPERATIONS, Tag.USER_BLOCK_OPERATIONS],
@@ -158,15 +247,19 @@ relations = extend_schema(
     },
     examples=[
         OpenApiExample(
-            "ids not provided",
-            value=get_error_repr({"ids": ["This field is required."]}),
+            "usernames not provided",
+            value=get_error_repr({"usernames": ["This field is required."]}),
             response_only=True,
             status_codes=["400"],
         ),
         OpenApiExample(
-            "too many ids",
+            "too many usernames",
             value=get_error_repr(
-                {"ids": ["List contains 51 items, it should contain no more than 50."]}
+                {
+                    "usernames": [
+                        "List contains 501 items, it should contain no more than 500."
+                    ]
+                }
             ),
             response_only=True,
             status_codes=["400"],
@@ -198,18 +291,27 @@ user = {
     "unfollow": unfollow,
     "me": me,
     "by": by,
+    "batch": batch,
+    "search": search,
+    "autocomplete": autocomplete,
     "change_password": change_password,
-    "followers": followers,
-    "following": following,
-    "blocked": blocked,
     "profile_picture": profile_picture,
-    "relations": relations,
+    "profile_picture_upload": profile_picture_upload,
+    "profile_picture_confirm": profile_picture_confirm,
     "deactivate": deactivate,
 }
 
 list_follow_requests = extend_schema(
     summary="List follow requests", tags=[Tag.USER_FOLLOW_OPERATIONS]
 )
+count_follow_requests = extend_schema(
+    summary="Count pending follow requests",
+    description="Number of pending follow requests, e.g., to display a badge."
+    " The count is cached and might lag behind the list of follow requests"
+    " for a short while.",
+    tags=[Tag.USER_FOLLOW_OPERATIONS],
+    responses={200: FollowRequestCountSerializer},
+)
 accept_follow_request = action(
     summary="Accept a follow request", tags=[Tag.USER_FOLLOW_OPERATIONS]
 )
@@ -217,8 +319,29 @@ reject_follow_request = action(
     summary="Reject a follow request", tags=[Tag.USER_FOLLOW_OPERATIONS]
 )
 
+bulk_description = (
+    "Answer multiple pending follow requests, either by their ids, or all of"
+    " them. Requests that are being answered concurrently are skipped, the"
+    " number of requests answered is returned."
+)
+bulk_accept_follow_requests = extend_schema(
+    summary="Accept follow requests in bulk",
+    description=bulk_description,
+    tags=[Tag.USER_FOLLOW_OPERATIONS],
+    responses={200: FollowRequestBulkSerializer, 400: APIError},
+)
+bulk_reject_follow_requests = extend_schema(
+    summary="Reject follow requests in bulk",
+    description=bulk_description,
+    tags=[Tag.USER_FOLLOW_OPERATIONS],
+    responses={200: FollowRequestBulkSerializer, 400: APIError},
+)
+
 follow_request = {
     "list": list_follow_requests,
+    "count": count_follow_requests,
     "accept": accept_follow_request,
     "reject": reject_follow_request,
+    "bulk_accept": bulk_accept_follow_requests,
+    "bulk_reject": bulk_reject_follow_requests,
 }
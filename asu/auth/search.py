@@ -0,0 +1,91 @@
+import json
+import logging
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+import redis
+
+from asu.auth.events import get_client
+
+if TYPE_CHECKING:
+    from asu.auth.models import User
+
+__all__ = [
+    "clear_index",
+    "get_autocomplete_ids",
+    "index_users",
+]
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_KEY = "asu.autocomplete.user"
+"""
+Sorted set of '<term>\\x00<user id>' members, all with the score of zero,
+so that they are ordered lexicographically and can be matched by prefix.
+"""
+AUTOCOMPLETE_ENTRIES_KEY = "asu.autocomplete.user.entries"
+"""
+Hash of user ids to the members they currently have in the sorted set, so
+that stale members can be removed once users change their profiles.
+"""
+
+
+def get_terms(user: User) -> set[str]:
+    # Users can be found by the prefixes of their username, display name
+    # and each word in their display name.
+    display_name = user.display_name.casefold()
+    terms = {user.username.casefold(), display_name, *display_name.split()}
+    return {term for term in terms if term}
+
+
+def get_entries(user: User) -> list[str]:
+    return sorted("%s\x00%s" % (term, user.pk.hex) for term in get_terms(user))
+
+
+def index_users(users: Iterable[User]) -> None:
+    """
+    Update the autocomplete entries of given users. Users that are not
+    accessible are removed from autocomplete.
+    """
+    users = list(users)
+    if not users:
+        return
+    client = get_client()
+    try:
+        previous = client.hmget(AUTOCOMPLETE_ENTRIES_KEY, [u.pk.hex for u in users])
+        with client.pipeline(transaction=True) as pipe:
+            for user, entries in zip(users, previous, strict=True):
+                if entries is not None:
+                    pipe.zrem(AUTOCOMPLETE_KEY, *json.loads(entries))
+                if not user.is_accessible:
+                    pipe.hdel(AUTOCOMPLETE_ENTRIES_KEY, user.pk.hex)
+                    continue
+                current = get_entries(user)
+                pipe.zadd(AUTOCOMPLETE_KEY, dict.fromkeys(current, 0))
+                pipe.hset(AUTOCOMPLETE_ENTRIES_KEY, user.pk.hex, json.dumps(current))
+            pipe.execute()
+    except redis.RedisError:
+        logger.exception("Could not index %d user(s) for autocomplete", len(users))
+
+
+def clear_index() -> None:
+    get_client().delete(AUTOCOMPLETE_KEY, AUTOCOMPLETE_ENTRIES_KEY)
+
+
+def get_autocomplete_ids(prefix: str, *, limit: int) -> list[UUID] | None:
+    """
+    Get the ids of users with a term starting with given prefix, ordered by
+    the matching term. Returns `None` if autocomplete is not available.
+    """
+    start = prefix.casefold().encode()
+    try:
+        # UTF-8 encoded strings never contain the byte 0xff.
+        members = get_client().zrangebylex(
+            AUTOCOMPLETE_KEY, b"[" + start, b"[" + start + b"\xff", start=0, num=limit
+        )
+    except redis.RedisError:
+        logger.exception("Could not autocomplete users")
+        return None
+    pks = (UUID(hex=member.rpartition(b"\x00")[2].decode()) for member in members)
+    return list(dict.fromkeys(pks))
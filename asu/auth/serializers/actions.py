@@ -1,8 +1,12 @@
 import functools
+import mimetypes
+import posixpath
 from typing import Any, cast
 
+import django.core.exceptions
 from django.db import models, transaction
 from django.db.models import Q, QuerySet
+from django.db.models.functions import Now
 from django.utils.translation import gettext
 
 from rest_framework import serializers
@@ -10,6 +14,7 @@ from rest_framework.exceptions import PermissionDenied
 
 from drf_spectacular.utils import extend_schema_field
 
+from asu.auth.events import publish_relation_event
 from asu.auth.models import (
     User,
     UserBlock,
@@ -17,8 +22,21 @@ from asu.auth.models import (
     UserFollow,
     UserFollowRequest,
 )
+from asu.auth.models.user import (
+    PROFILE_PICTURE_MAX_PIXELS,
+    PROFILE_PICTURE_MAX_SIZE,
+    PROFILE_PICTURE_TYPES,
+    PROFILE_PICTURE_UPLOAD_PATH,
+    RELATION_KINDS,
+)
 from asu.auth.serializers.user import UserPublicReadSerializer
+from asu.auth.tasks import process_profile_picture_upload
 from asu.core.utils import messages
+from asu.core.utils.file import (
+    IMAGE_HEADER_MAX_SIZE,
+    ImageDimensionsValidator,
+    read_file_head,
+)
 from asu.core.utils.rest import ContextDefault
 from asu.core.utils.typing import UserRequest
 
@@ -57,6 +75,12 @@ class UserRelationSerializer(serializers.Serializer[dict[str, Any]]):
             raise PermissionDenied
         return attrs
 
+    def get_event_users(self) -> dict[str, Any]:
+        return {
+            "from_user_id": self.validated_data["from_user"].pk,
+            "to_user_id": self.validated_data["to_user"].pk,
+        }
+
 
 class BlockSerializer(UserRelationSerializer):
     def get_rels[T: (UserFollow, UserFollowRequest)](
@@ -76,15 +100,27 @@ class BlockSerializer(UserRelationSerializer):
             # If there is a follow relationship between
             # users, delete them during blocking.
             self.get_rels(UserFollow, **validated_data).delete()
-            self.get_rels(UserFollowRequest, **validated_data).filter(
-                status=UserFollowRequest.Status.PENDING
-            ).update(status=UserFollowRequest.Status.REJECTED)
+            rejected = (
+                self.get_rels(UserFollowRequest, **validated_data)
+                .filter(status=UserFollowRequest.Status.PENDING)
+                .update(status=UserFollowRequest.Status.REJECTED, updated_at=Now())
+            )
+            if rejected:
+                # Requests might have been sent in either direction, so the
+                # counters of both users are counted again on next read.
+                UserFollowRequest.objects.forget_pending_counts(
+                    validated_data["from_user"].pk,
+                    validated_data["to_user"].pk,
+                )
+            publish_relation_event("block.created", **self.get_event_users())
         return validated_data
 
 
 class UnblockSerializer(UserRelationSerializer):
     def create(self, validated_data: dict[str, Any]) -> dict[str, Any]:
-        UserBlock.objects.filter(**validated_data).delete()
+        deleted, _ = UserBlock.objects.filter(**validated_data).delete()
+        if deleted:
+            publish_relation_event("block.deleted", **self.get_event_users())
         return validated_data
 
 
@@ -101,10 +137,16 @@ class FollowSerializer(UserRelationSerializer):
             if from_user.is_following(to_user):
                 return FollowStatus.FOLLOWING
 
-            from_user.send_follow_request(to_user=to_user)
+            _, created = from_user.send_follow_request(to_user=to_user)
+            if created:
+                publish_relation_event(
+                    "follow_request.created", **self.get_event_users()
+                )
             return FollowStatus.REQUEST_SENT
 
-        from_user.add_following(to_user=to_user)
+        _, created = from_user.add_following(to_user=to_user)
+        if created:
+            publish_relation_event("follow.created", **self.get_event_users())
         return FollowStatus.FOLLOWING
 
     def create(self, validated_data: dict[str, Any]) -> dict[str, Any]:
@@ -116,7 +158,9 @@ class FollowSerializer(UserRelationSerializer):
 
 class UnfollowSerializer(UserRelationSerializer):
     def create(self, validated_data: dict[str, Any]) -> dict[str, Any]:
-        UserFollow.objects.filter(**validated_data).delete()
+        deleted, _ = UserFollow.objects.filter(**validated_data).delete()
+        if deleted:
+            publish_relation_event("follow.deleted", **self.get_event_users())
         return validated_data
 
 
@@ -128,6 +172,7 @@ class FollowRequestSerializer(serializers.ModelSerializer[UserFollowRequest]):
             "display_name",
             "username",
             "profile_picture",
+            "profile_picture_sources",
             "description",
             "is_private",
         ),
@@ -140,6 +185,44 @@ class FollowRequestSerializer(serializers.ModelSerializer[UserFollowRequest]):
         read_only_fields = ("id", "from_user")
 
 
+class FollowRequestCountSerializer(serializers.Serializer[dict[str, int]]):
+    count = serializers.IntegerField(read_only=True)
+
+
+class FollowRequestBulkSerializer(serializers.Serializer[dict[str, Any]]):
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        min_length=1,
+        max_length=1000,
+        required=False,
+        write_only=True,
+        help_text="Ids of the follow requests to answer.",
+    )
+    all = serializers.BooleanField(
+        default=False,
+        write_only=True,
+        help_text="Answer all pending follow requests, instead of given ids.",
+    )
+    count = serializers.IntegerField(
+        read_only=True,
+        help_text="Number of follow requests answered.",
+    )
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        if attrs["all"] == ("ids" in attrs):
+            raise serializers.ValidationError(gettext("Specify either 'ids' or 'all'."))
+        return attrs
+
+    def create(self, validated_data: dict[str, Any]) -> dict[str, Any]:
+        request: UserRequest = self.context["request"]
+        count = UserFollowRequest.objects.answer_pending(
+            request.user.pk,
+            accept=self.context["accept"],
+            ids=validated_data.get("ids"),
+        )
+        return {"count": count}
+
+
 class UserConnectionSerializer(UserPublicReadSerializer):
     class Meta(UserPublicReadSerializer.Meta):
         fields = (
@@ -147,31 +230,144 @@ class UserConnectionSerializer(UserPublicReadSerializer):
             "display_name",
             "username",
             "profile_picture",
+            "profile_picture_sources",
             "description",
             "is_private",
         )
 
 
+class UserSearchSerializer(serializers.Serializer[dict[str, Any]]):
+    results = UserConnectionSerializer(many=True)
+
+
+class UserConnectionWithRelationsSerializer(UserConnectionSerializer):
+    relations = serializers.SerializerMethodField()
+
+    class Meta(UserConnectionSerializer.Meta):
+        fields = (*UserConnectionSerializer.Meta.fields, "relations")
+
+    @extend_schema_field(
+        serializers.ListField(
+            child=serializers.ChoiceField(choices=RELATION_KINDS),
+            help_text="Relations of the authenticated user with this user. Only"
+            " included if requested.",
+        )
+    )
+    def get_relations(self, obj: User) -> list[str]:
+        # Relations of the whole page are computed beforehand, see
+        # `User.get_relations`.
+        relations = self.context["relations"][obj.pk]
+        return [name for name, exists in relations.items() if exists]
+
+
 class ProfilePictureEditSerializer(serializers.ModelSerializer[User]):
+    pending = serializers.SerializerMethodField()
+
     class Meta:
-        fields = ("profile_picture",)
+        fields = ("profile_picture", "pending")
         model = User
         extra_kwargs = {"profile_picture": {"required": True}}
 
+    def get_pending(self, obj: User) -> bool:
+        # The current picture is represented until the new one is processed.
+        return True
+
     def update(self, instance: User, validated_data: dict[str, Any]) -> User:
+        # Resizing and encoding the variants is left to the same task that
+        # processes direct uploads, the upload is only stored here.
         image = validated_data["profile_picture"]
-        instance.set_profile_picture(image)
+        storage = User._meta.get_field("profile_picture").storage  # type: ignore[attr-defined]
+        name = storage.save(
+            get_profile_picture_upload_name(instance, image.name), image
+        )
+        transaction.on_commit(
+            functools.partial(
+                process_profile_picture_upload.delay,
+                user_id=instance.pk,
+                name=name,
+            )
+        )
         return instance
 
 
-rels = (
-    "following",
-    "followed_by",
-    "follow_request_sent",
-    "follow_request_received",
-    "blocking",
-    "blocked_by",
-)
+def get_profile_picture_upload_name(user: User, filename: str) -> str:
+    field = User._meta.get_field("profile_picture")
+    name: str = field.storage.generate_filename(  # type: ignore[attr-defined]
+        PROFILE_PICTURE_UPLOAD_PATH(user, filename)
+    )
+    return name
+
+
+class ProfilePictureUploadSerializer(serializers.Serializer[dict[str, Any]]):
+    content_type = serializers.ChoiceField(
+        choices=PROFILE_PICTURE_TYPES,
+        write_only=True,
+    )
+    url = serializers.URLField(read_only=True)
+    form_fields = serializers.DictField(
+        child=serializers.CharField(),
+        read_only=True,
+        help_text="Form fields to include in the upload request, before the file.",
+    )
+    key = serializers.CharField(
+        read_only=True,
+        help_text="Key to confirm the upload with, once it is complete.",
+    )
+
+    def create(self, validated_data: dict[str, Any]) -> dict[str, Any]:
+        storage = self.context["storage"]
+        user, content_type = (
+            self.context["request"].user,
+            validated_data["content_type"],
+        )
+        name = get_profile_picture_upload_name(
+            user, "upload" + (mimetypes.guess_extension(content_type) or "")
+        )
+        post = storage.create_presigned_post(
+            name,
+            content_type=content_type,
+            max_size=PROFILE_PICTURE_MAX_SIZE,
+        )
+        return {"url": post["url"], "form_fields": post["fields"], "key": name}
+
+
+class ProfilePictureConfirmSerializer(serializers.Serializer[dict[str, Any]]):
+    key = serializers.CharField(write_only=True)
+
+    def validate_key(self, value: str) -> str:
+        # Uploads are only accepted from the directory that presigned posts
+        # are created for.
+        user = self.context["request"].user
+        directory = posixpath.dirname(get_profile_picture_upload_name(user, "upload"))
+        if posixpath.dirname(value) != directory or posixpath.normpath(value) != value:
+            raise serializers.ValidationError(gettext("Invalid upload key."))
+
+        # Only the first bytes of the upload are downloaded to validate it,
+        # enough to read the dimensions of most images.
+        field = User._meta.get_field("profile_picture")
+        try:
+            file = read_file_head(
+                self.context["storage"], value, length=IMAGE_HEADER_MAX_SIZE
+            )
+        except FileNotFoundError:
+            raise serializers.ValidationError(gettext("Upload was not found."))
+        try:
+            field.run_validators(file)
+            ImageDimensionsValidator(PROFILE_PICTURE_MAX_PIXELS)(file)
+        except django.core.exceptions.ValidationError as exc:
+            raise serializers.ValidationError(exc.messages)
+        return value
+
+    def create(self, validated_data: dict[str, Any]) -> dict[str, Any]:
+        user = self.context["request"].user
+        transaction.on_commit(
+            functools.partial(
+                process_profile_picture_upload.delay,
+                user_id=user.pk,
+                name=validated_data["key"],
+            )
+        )
+        return validated_data
 
 
 class UserWithRelationSerializer(serializers.ModelSerializer[User]):
@@ -184,7 +380,7 @@ class UserWithRelationSerializer(serializers.ModelSerializer[User]):
 
     @extend_schema_field(
         serializers.ListField(
-            child=serializers.ChoiceField(choices=rels),
+            child=serializers.ChoiceField(choices=RELATION_KINDS),
             help_text="May contain multiple relations.",
         )
     )
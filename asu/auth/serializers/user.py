@@ -1,13 +1,21 @@
-from collections.abc import Iterable, Sequence
-from typing import Any
+import itertools
+import types
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any, cast
+from uuid import UUID
 
 import django.core.exceptions
+from django.conf import settings
 from django.db.models.constraints import BaseConstraint
+from django.utils.translation import gettext
 
 from rest_framework import serializers
 
+from drf_spectacular.utils import extend_schema_field
+from rest_filters.fields import CSVField
+
 from asu.auth.models import User
-from asu.auth.models.user import USERNAME_CONSTRAINTS
+from asu.auth.models.user import PROFILE_PICTURE_FORMATS, USERNAME_CONSTRAINTS
 from asu.core.utils.rest import DynamicFieldsMixin
 
 
@@ -25,18 +33,60 @@ def validate_user_constraints(
             raise serializers.ValidationError({name: err.messages})
 
 
+class ProfilePictureField(serializers.ImageField):
+    # Uses the URLs resolved in bulk by `UserListSerializer`, if available.
+
+    def get_attribute(self, instance: User) -> Any:
+        urls = getattr(self.parent, "profile_picture_urls", None)
+        if urls is None:
+            return super().get_attribute(instance)
+        return urls.get(instance.pk)
+
+    def to_representation(self, value: Any) -> str | None:
+        if not isinstance(value, str):
+            return super().to_representation(value)
+        request = self.context.get("request")
+        return request.build_absolute_uri(value) if request else value
+
+
+class ProfilePictureSourceSerializer(serializers.Serializer[dict[str, str]]):
+    type = serializers.CharField(help_text="Mime type of the images.")
+    srcset = serializers.CharField(
+        help_text="Comma-separated list of image URLs and their widths."
+    )
+
+
+class UserListSerializer(serializers.ListSerializer[User]):
+    def to_representation(self, data: Any) -> list[Any]:
+        # Profile pictures of the whole page are resolved beforehand, so
+        # that their URLs are signed in bulk.
+        users = list(data.all() if hasattr(data, "all") else data)
+        child = cast("UserPublicReadSerializer", self.child)
+        if "profile_picture" in child.fields:
+            child.profile_picture_urls = User.get_profile_picture_urls(users)
+        if "profile_picture_sources" in child.fields:
+            child.profile_picture_source_map = User.get_profile_picture_sources(users)
+        return super().to_representation(users)
+
+
 class UserPublicReadSerializer(DynamicFieldsMixin, serializers.ModelSerializer[User]):
     following_count = serializers.IntegerField()
     follower_count = serializers.IntegerField()
-    profile_picture = serializers.ImageField(source="get_profile_picture")
+    profile_picture = ProfilePictureField(source="get_profile_picture")
+    profile_picture_sources = serializers.SerializerMethodField()
+
+    profile_picture_urls: dict[UUID, str] | None = None
+    profile_picture_source_map: dict[UUID, list[tuple[str, int, str]]] | None = None
 
     class Meta:
         model = User
+        list_serializer_class = UserListSerializer
         fields: Sequence[str] = (
             "id",
             "display_name",
             "username",
             "profile_picture",
+            "profile_picture_sources",
             "is_private",
             "description",
             "website",
@@ -46,9 +96,81 @@ class UserPublicReadSerializer(DynamicFieldsMixin, serializers.ModelSerializer[U
         )
         read_only_fields = fields
 
+    @extend_schema_field(ProfilePictureSourceSerializer(many=True))
+    def get_profile_picture_sources(self, obj: User) -> list[dict[str, str]]:
+        sources = self.profile_picture_source_map
+        if sources is None:
+            sources = User.get_profile_picture_sources([obj])
+        request = self.context.get("request")
+        srcsets: dict[str, list[str]] = {}
+        for ext, size, url in sources.get(obj.pk, ()):
+            uri = request.build_absolute_uri(url) if request else url
+            srcsets.setdefault(ext, []).append("%s %dw" % (uri, size))
+        return [
+            {"type": PROFILE_PICTURE_FORMATS[ext][0], "srcset": ", ".join(srcset)}
+            for ext, srcset in srcsets.items()
+        ]
+
+
+class UserBatchQuerySerializer(serializers.Serializer[dict[str, Any]]):
+    ids = CSVField(
+        child=serializers.UUIDField(),
+        max_length=100,
+        required=False,
+        help_text="Comma-separated list of user ids.",
+    )
+    usernames = CSVField(
+        child=serializers.CharField(max_length=16),
+        max_length=100,
+        required=False,
+        help_text="Comma-separated list of usernames.",
+    )
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        attrs = {key: value for key, value in attrs.items() if value}
+        if len(attrs) != 1:
+            raise serializers.ValidationError(
+                gettext("Specify either 'ids' or 'usernames'.")
+            )
+        return attrs
+
+
+class UserSearchQuerySerializer(serializers.Serializer[dict[str, Any]]):
+    q = serializers.CharField(
+        min_length=3,
+        max_length=32,
+        help_text="Text to search in usernames and display names.",
+    )
+
+
+class UserAutocompleteQuerySerializer(serializers.Serializer[dict[str, Any]]):
+    q = serializers.CharField(
+        max_length=32,
+        help_text="Prefix of a username, display name or a word in it.",
+    )
+
+
+class UserBatchReadSerializer(UserPublicReadSerializer):
+    # Follow counts are computed in bulk for all the users in the
+    # batch and passed through the serializer context.
+    following_count = serializers.SerializerMethodField()
+    follower_count = serializers.SerializerMethodField()
+
+    def get_following_count(self, obj: User) -> int:
+        counts: dict[UUID, int] = self.context["following_counts"]
+        return counts.get(obj.pk, 0)
+
+    def get_follower_count(self, obj: User) -> int:
+        counts: dict[UUID, int] = self.context["follower_counts"]
+        return counts.get(obj.pk, 0)
+
+
+class UserBatchSerializer(serializers.Serializer[dict[str, Any]]):
+    results = UserBatchReadSerializer(many=True)
+
 
 class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer[User]):
-    profile_picture = serializers.ImageField(source="get_profile_picture")
+    profile_picture = ProfilePictureField(source="get_profile_picture")
     two_factor_enabled = serializers.BooleanField()
 
     class Meta:
@@ -79,18 +201,81 @@ class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer[User]):
 
     def update(self, instance: User, validated_data: dict[str, Any]) -> User:
         # This method is overridden so that `validate_username_constraints`
-        # could be called, triggering related database constraints.
-        for attr, value in validated_data.items():
+        # could be called, triggering related database constraints. Only the
+        # values that differ from the loaded state are validated and saved.
+        changed = {
+            attr: value
+            for attr, value in validated_data.items()
+            if getattr(instance, attr) != value
+        }
+        if not changed:
+            return instance
+
+        username = instance.username
+        for attr, value in changed.items():
             setattr(instance, attr, value)
-        validate_user_constraints(
-            instance,
-            constraints=USERNAME_CONSTRAINTS,
-            name="username",
-        )
-        instance.save(update_fields={*validated_data, "updated_at"})
+        if "username" in changed:
+            validate_user_constraints(
+                instance,
+                constraints=USERNAME_CONSTRAINTS,
+                name="username",
+            )
+        instance.save(update_fields={*changed, "updated_at"})
+        if "username" in changed:
+            # Saving the instance invalidates the cache for the new username.
+            User.objects.forget_usernames(username)
         return instance
 
 
+def build_scoped_user_serializer(fields: Iterable[str]) -> type[UserSerializer]:
+    """
+    Create a subclass of `UserSerializer` that only declares given fields,
+    so that unwanted fields are never constructed in the first place.
+    """
+    allowed = set(fields)
+    meta = type(
+        "Meta",
+        (UserSerializer.Meta,),
+        {
+            "fields": tuple(f for f in UserSerializer.Meta.fields if f in allowed),
+            "read_only_fields": tuple(
+                f for f in UserSerializer.Meta.read_only_fields if f in allowed
+            ),
+        },
+    )
+    # Setting a declared field to `None` removes it from the subclass.
+    removed = dict.fromkeys(UserSerializer._declared_fields.keys() - allowed)
+    klass = type("ScopedUserSerializer", (UserSerializer,), {"Meta": meta, **removed})
+    return cast("type[UserSerializer]", klass)
+
+
+def build_scoped_user_serializers() -> Mapping[frozenset[str], type[UserSerializer]]:
+    # Compute a serializer class for every combination of the scopes in
+    # `OAUTH2_USER_FIELDS`. The number of such scopes is small, so this is
+    # done once, at import time.
+    scopes = sorted(settings.OAUTH2_USER_FIELDS)
+    classes: dict[frozenset[str], type[UserSerializer]] = {}
+    for size in range(len(scopes) + 1):
+        for combination in itertools.combinations(scopes, size):
+            fields = itertools.chain.from_iterable(
+                settings.OAUTH2_USER_FIELDS[scope] for scope in combination
+            )
+            classes[frozenset(combination)] = build_scoped_user_serializer(fields)
+    return types.MappingProxyType(classes)
+
+
+SCOPED_USER_SERIALIZERS = build_scoped_user_serializers()
+
+
+def get_scoped_user_serializer(scopes: Iterable[str]) -> type[UserSerializer]:
+    """
+    Get the prebuilt `UserSerializer` class which contains the fields
+    visible to given (granted) OAuth scopes.
+    """
+    granted = frozenset(scopes).intersection(settings.OAUTH2_USER_FIELDS)
+    return SCOPED_USER_SERIALIZERS[granted]
+
+
 class AuthSerializer(serializers.Serializer[dict[str, Any]]):
     access_token = serializers.CharField()
     token_type = serializers.ChoiceField(choices=["Bearer"])
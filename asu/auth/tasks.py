@@ -1,12 +1,23 @@
 import datetime
+import itertools
+import posixpath
+from uuid import UUID
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
 from django.utils import timezone
 
+from celery.utils.log import get_task_logger
 from oauth2_provider.models import clear_expired
 
-from asu.auth.models import User, UserDeactivation
+from asu.auth.models import User, UserDeactivation, UserFollowRequest
+from asu.auth.models.user import PROFILE_PICTURE_UPLOAD_PATH
 from asu.core.celery import app
 
+logger = get_task_logger(__name__)
+
 
 @app.task
 def clear_expired_oauth_tokens() -> None:
@@ -27,4 +38,118 @@ def delete_users_permanently() -> tuple[int, dict[str, int]]:
         revoked_at__isnull=True,
         created_at__lte=timezone.now() - datetime.timedelta(days=30),
     ).values("user_id")
-    return User.objects.filter(id__in=deactivations).delete()
+    with transaction.atomic():
+        users = User.objects.filter(id__in=deactivations)
+        usernames = list(users.values_list("username", flat=True))
+        # Pending follow requests sent by these users are deleted along with
+        # them, so the cached counters of their recipients are recounted.
+        recipients = set(
+            UserFollowRequest.objects.filter(
+                from_user__in=users,
+                status=UserFollowRequest.Status.PENDING,
+            ).values_list("to_user", flat=True)
+        )
+        # Profile pictures might be shared with other users, so they are
+        # released instead of being deleted along with the users.
+        pictured = list(
+            users.exclude(profile_picture="").only(
+                "id", "profile_picture", "profile_picture_variants"
+            )
+        )
+        deleted = users.delete()
+        User.objects.forget_usernames(*usernames)
+        UserFollowRequest.objects.forget_pending_counts(*recipients)
+    for user in pictured:
+        user.release_profile_picture()
+    return deleted
+
+
+@app.task
+def reconcile_follow_request_counts(minutes: int = 15) -> int:
+    """
+    Periodic task to correct the drift in cached pending follow request
+    counters. Only users who received follow requests that changed in the
+    last `minutes` are reconciled, so this should run more frequently than
+    that; other counters expire eventually.
+    """
+    user_ids = (
+        UserFollowRequest.objects.filter(
+            updated_at__gte=timezone.now() - datetime.timedelta(minutes=minutes)
+        )
+        .values_list("to_user", flat=True)
+        .distinct()
+        .iterator(chunk_size=500)
+    )
+    reconciled = 0
+    for batch in itertools.batched(user_ids, 500, strict=False):
+        UserFollowRequest.objects.reconcile_pending_counts(batch)
+        reconciled += len(batch)
+    return reconciled
+
+
+@app.task
+def delete_resolved_follow_requests() -> int:
+    """
+    Periodic task to delete follow requests that were approved or rejected
+    long ago; they have no use once resolved.
+    """
+    return UserFollowRequest.objects.delete_resolved(
+        before=timezone.now()
+        - datetime.timedelta(days=settings.FOLLOW_REQUEST_RETENTION_DAYS)
+    )
+
+
+@app.task
+def process_profile_picture_upload(*, user_id: UUID, name: str) -> None:
+    """
+    Set the profile picture of a user from a confirmed direct upload. The
+    uploaded original is removed once it is resized, or rejected.
+    """
+    storage = User._meta.get_field("profile_picture").storage  # type: ignore[attr-defined]
+    try:
+        user = User.objects.get(pk=user_id)
+        with storage.open(name) as file:
+            user.set_profile_picture(File(file, name=posixpath.basename(name)))
+    except User.DoesNotExist:
+        logger.info(
+            "Profile picture upload discarded, user no longer exists,"
+            " user_id=%s name=%s",
+            user_id,
+            name,
+        )
+    except ValidationError as exc:
+        logger.warning(
+            "Profile picture upload rejected, user_id=%s name=%s reason=%s",
+            user_id,
+            name,
+            exc.messages,
+        )
+    finally:
+        storage.delete(name)
+
+
+@app.task
+def delete_stale_profile_picture_uploads(hours: int = 6) -> int:
+    """
+    Periodic task to delete direct uploads of profile pictures that were
+    never confirmed. Buckets might instead expire the objects under the
+    upload prefix using a lifecycle rule.
+    """
+    storage = User._meta.get_field("profile_picture").storage  # type: ignore[attr-defined]
+    # Uploads are stored in a directory for each user, under this one.
+    root = posixpath.dirname(posixpath.dirname(PROFILE_PICTURE_UPLOAD_PATH.template))
+    before = timezone.now() - datetime.timedelta(hours=hours)
+    try:
+        directories, _ = storage.listdir(root)
+    except FileNotFoundError:
+        return 0
+
+    deleted = 0
+    for directory in directories:
+        path = posixpath.join(root, directory)
+        for filename in storage.listdir(path)[1]:
+            name = posixpath.join(path, filename)
+            if storage.get_modified_time(name) < before:
+                storage.delete(name)
+                deleted += 1
+    return deleted
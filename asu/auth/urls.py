@@ -2,7 +2,14 @@ from django.urls import include, path
 
 from rest_framework.routers import SimpleRouter
 
-from asu.auth.views import FollowRequestViewSet, UserViewSet
+from asu.auth.views import (
+    FollowRequestViewSet,
+    UserBlockedView,
+    UserFollowersView,
+    UserFollowingView,
+    UserRelationsView,
+    UserViewSet,
+)
 
 app_name = "auth"
 
@@ -10,5 +17,17 @@ router = SimpleRouter(use_regex_path=False)
 router.register("follow-requests", FollowRequestViewSet, basename="follow-request")
 router.register("", UserViewSet, basename="user")
 urlpatterns = [
+    path(
+        "users/<uuid:pk>/followers/",
+        UserFollowersView.as_view(),
+        name="user-followers",
+    ),
+    path(
+        "users/<uuid:pk>/following/",
+        UserFollowingView.as_view(),
+        name="user-following",
+    ),
+    path("users/blocked/", UserBlockedView.as_view(), name="user-blocked"),
+    path("users/relations/", UserRelationsView.as_view(), name="user-relations"),
     path("users/", include(router.urls)),
 ]
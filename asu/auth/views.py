@@ -1,48 +1,92 @@
-import itertools
-from typing import Any
+from collections.abc import Callable
+from operator import attrgetter
+from typing import Any, cast
 from uuid import UUID
 
-from django.conf import settings
 from django.db import transaction
-from django.db.models import Exists, OuterRef, QuerySet
-from django.db.models.functions import JSONObject
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.db.models.functions import Upper
 from django.shortcuts import get_object_or_404
+from django.utils.translation import gettext_lazy as _
 
 from rest_framework import mixins, parsers, serializers, status
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import APIException, NotFound, PermissionDenied
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from asgiref.sync import sync_to_async
 from rest_filters import Filter, FilterSet
 from rest_filters.fields import CSVField
 
 from asu.auth import schemas
-from asu.auth.models import AccessToken, User, UserBlock, UserFollow, UserFollowRequest
+from asu.auth.authentication import AsyncOAuth2Authentication
+from asu.auth.models import AccessToken, User, UserFollowRequest
+from asu.auth.models.user import PROFILE_PICTURE_MAX_PIXELS
 from asu.auth.permissions import (
     RequireFirstParty,
     RequireScope,
     RequireToken,
     RequireUser,
 )
+from asu.auth.search import get_autocomplete_ids
 from asu.auth.serializers.actions import (
     BlockSerializer,
+    FollowRequestBulkSerializer,
+    FollowRequestCountSerializer,
     FollowRequestSerializer,
     FollowSerializer,
     PasswordChangeSerializer,
+    ProfilePictureConfirmSerializer,
     ProfilePictureEditSerializer,
+    ProfilePictureUploadSerializer,
     RelationSerializer,
     UnblockSerializer,
     UnfollowSerializer,
     UserConnectionSerializer,
+    UserConnectionWithRelationsSerializer,
     UserDeactivationSerializer,
+    UserSearchSerializer,
 )
 from asu.auth.serializers.user import (
+    UserAutocompleteQuerySerializer,
+    UserBatchQuerySerializer,
+    UserBatchSerializer,
     UserPublicReadSerializer,
+    UserSearchQuerySerializer,
     UserSerializer,
+    get_scoped_user_serializer,
 )
-from asu.core.utils.rest import EmptySerializer, get_paginator
+from asu.core.utils.file import ImageUploadHandler
+from asu.core.utils.rest import EmptySerializer, get_paginator, get_sparse_fields
 from asu.core.utils.typing import UserRequest
-from asu.core.utils.views import ExtendedViewSet, action
+from asu.core.utils.views import AsyncAPIView, ExtendedViewSet, action
+
+RELATIONS_LIMIT = 500
+SEARCH_LIMIT = 20
+
+CONNECTION_FIELD_COLUMNS = {
+    "profile_picture": ("profile_picture", "profile_picture_variants"),
+    "profile_picture_sources": ("profile_picture", "profile_picture_variants"),
+}
+"""
+Columns to load for the serializer fields that are not backed by a column
+of the same name.
+"""
+
+
+def get_connection_columns(fields: tuple[str, ...]) -> set[str]:
+    return {
+        column
+        for field in fields
+        for column in CONNECTION_FIELD_COLUMNS.get(field, (field,))
+    }
+
+
+serialize = sync_to_async(attrgetter("data"))
+"""
+Get the data of given serializer in a thread. Serializers of users resolve
+the URLs of profile pictures, which might use the cache.
+"""
 
 
 class RelationFilter(FilterSet[User]):
@@ -50,7 +94,7 @@ class RelationFilter(FilterSet[User]):
         CSVField(
             child=serializers.CharField(max_length=16),
             min_length=1,
-            max_length=50,
+            max_length=RELATIONS_LIMIT,
         ),
         field="username",
         lookup="in",
@@ -61,19 +105,31 @@ class RelationFilter(FilterSet[User]):
 class UserLookupFilter(FilterSet[User]):
     username = Filter(
         serializers.CharField(max_length=16),
-        field="username",
-        lookup="iexact",
+        noop=True,
         required=True,
     )
 
+    def get_queryset(
+        self,
+        queryset: QuerySet[User],
+        values: dict[str, Any],
+    ) -> QuerySet[User]:
+        # Usernames are resolved to ids via cache, the username is also
+        # checked in case the cached entry is stale.
+        username = values["username"]
+        pk = User.objects.resolve_username(username)
+        if pk is None:
+            return queryset.none()
+        return queryset.filter(pk=pk, username__iexact=username)
+
+
+class DirectUploadUnavailableError(APIException):
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = _("Direct uploads are not available.")
+    default_code = "direct_upload_unavailable"
+
 
 class UserViewSet(mixins.RetrieveModelMixin, ExtendedViewSet[User]):
-    sensitive_actions = {"followers", "following"}
-    """
-    These actions may reveal sensitive information about the user. If the user
-    marked their account private, these will be inaccessible to users that
-    do not follow the user. This check is enforced in `get_object()` method.
-    """
     serializer_classes = {"retrieve": UserPublicReadSerializer}
     permission_classes = {"retrieve": [RequireToken]}
     schemas = schemas.user
@@ -103,29 +159,17 @@ class UserViewSet(mixins.RetrieveModelMixin, ExtendedViewSet[User]):
             # blocks them. To do that, they should be able to visit user detail
             # page, so retrieving is also allowed.
             raise PermissionDenied
-        if (
-            self.action in self.sensitive_actions
-            and user.is_private
-            and not (as_user and self.request.user.is_following(user))
-        ):
-            # If displayed user account is private, make sure sensitive actions
-            # are only available to their followers.
-            raise PermissionDenied
         return user
 
-    def get_profile_attrs(self, token: AccessToken | None) -> dict[str, Any]:
+    def get_profile_serializer_class(
+        self, token: AccessToken | None
+    ) -> type[UserSerializer]:
         if not token:
             # Probably using browsable API or used `force_login` in tests
             # so, allow all fields. In production environment, token will
             # always be present.
-            return {}
-        granted_scopes = token.scope.split()
-        fields = itertools.chain.from_iterable(
-            fields
-            for scope, fields in settings.OAUTH2_USER_FIELDS.items()
-            if scope in granted_scopes
-        )
-        return {"fields": fields, "ref_name": "User"}
+            return UserSerializer
+        return get_scoped_user_serializer(token.scope.split())
 
     @action(
         detail=False,
@@ -144,7 +188,8 @@ class UserViewSet(mixins.RetrieveModelMixin, ExtendedViewSet[User]):
             serializer = self.get_serializer(user, data=request.data, partial=True)
             return self.perform_action(serializer)
 
-        serializer = self.get_serializer(user, **self.get_profile_attrs(token))
+        serializer_class = self.get_profile_serializer_class(token)
+        serializer = serializer_class(user, context=self.get_serializer_context())
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(
@@ -162,6 +207,101 @@ class UserViewSet(mixins.RetrieveModelMixin, ExtendedViewSet[User]):
         serializer = self.get_serializer(user)
         return Response(serializer.data)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[RequireToken],
+        serializer_class=UserBatchSerializer,
+    )
+    def batch(self, request: Request) -> Response:
+        params = UserBatchQuerySerializer(data=request.query_params.dict())
+        params.is_valid(raise_exception=True)
+
+        queryset = self.get_queryset()
+        get_key: Callable[[User], object]
+        if ids := params.validated_data.get("ids"):
+            keys, get_key = ids, attrgetter("pk")
+            queryset = queryset.filter(pk__in=ids)
+        else:
+            # Match usernames case-insensitively, using the
+            # expression index of `unique_ci_username` constraint.
+            usernames = params.validated_data["usernames"]
+            keys = [username.upper() for username in usernames]
+            get_key = lambda user: user.username.upper()  # noqa: E731
+            queryset = queryset.alias(username_upper=Upper("username")).filter(
+                username_upper__in=keys
+            )
+
+        queryset = self.exclude_block_rels(queryset)
+
+        # Return users in the order they were requested.
+        position = {key: index for index, key in enumerate(dict.fromkeys(keys))}
+        users = sorted(queryset, key=lambda obj: position[get_key(obj)])
+
+        following_counts, follower_counts = User.objects.get_follow_counts(
+            [obj.pk for obj in users]
+        )
+        context = self.get_serializer_context()
+        context["following_counts"] = following_counts
+        context["follower_counts"] = follower_counts
+        serializer = self.get_serializer({"results": users}, context=context)
+        return Response(serializer.data)
+
+    def exclude_block_rels(self, queryset: QuerySet[User]) -> QuerySet[User]:
+        # Omit users that have blocking relations with the authenticated
+        # user, in the same query.
+        user = self.request.user
+        if user and user.is_authenticated:
+            return queryset.exclude(Exists(user.get_block_rels(OuterRef("pk"))))
+        return queryset
+
+    def get_search_response(self, users: list[User]) -> Response:
+        serializer = self.get_serializer({"results": users})
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[RequireToken],
+        serializer_class=UserSearchSerializer,
+    )
+    def search(self, request: Request) -> Response:
+        params = UserSearchQuerySerializer(data=request.query_params.dict())
+        params.is_valid(raise_exception=True)
+
+        columns = get_connection_columns(UserConnectionSerializer.Meta.fields)
+        queryset = User.objects.search(params.validated_data["q"]).only(*columns)
+        users = list(self.exclude_block_rels(queryset)[:SEARCH_LIMIT])
+        return self.get_search_response(users)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[RequireToken],
+        serializer_class=UserSearchSerializer,
+    )
+    def autocomplete(self, request: Request) -> Response:
+        params = UserAutocompleteQuerySerializer(data=request.query_params.dict())
+        params.is_valid(raise_exception=True)
+
+        prefix = params.validated_data["q"]
+        columns = get_connection_columns(UserConnectionSerializer.Meta.fields)
+        queryset = self.exclude_block_rels(User.objects.active().only(*columns))
+        # Some of the candidates might be omitted, fetch a few more of them.
+        pks = get_autocomplete_ids(prefix, limit=SEARCH_LIMIT * 2)
+        if pks is None:
+            # Autocomplete index is not available, match prefixes using the
+            # trigram indexes instead.
+            queryset = queryset.filter(
+                Q(username__istartswith=prefix) | Q(display_name__istartswith=prefix)
+            ).order_by("username")
+            return self.get_search_response(list(queryset[:SEARCH_LIMIT]))
+
+        # Return users in the order of their matching entries.
+        position = {pk: index for index, pk in enumerate(pks)}
+        users = sorted(queryset.filter(pk__in=pks), key=lambda obj: position[obj.pk])
+        return self.get_search_response(users[:SEARCH_LIMIT])
+
     @action(
         detail=False,
         methods=["post"],
@@ -220,48 +360,18 @@ class UserViewSet(mixins.RetrieveModelMixin, ExtendedViewSet[User]):
     def unfollow(self, request: Request, pk: UUID) -> Response:
         return self.perform_relation_action()
 
-    @action(
-        detail=True,
-        methods=["get"],
-        serializer_class=UserConnectionSerializer,
-        pagination_class=get_paginator("cursor", ordering="-from_userfollows"),
-        permission_classes=[RequireToken],
-    )
-    def followers(self, request: Request, pk: UUID) -> Response:
-        user = self.get_object()
-        queryset = User.objects.active().filter(following=user)
-        return self.perform_list_action(queryset)
-
-    @action(
-        detail=True,
-        methods=["get"],
-        serializer_class=UserConnectionSerializer,
-        pagination_class=get_paginator("cursor", ordering="-to_userfollows"),
-        permission_classes=[RequireToken],
-    )
-    def following(self, request: Request, pk: UUID) -> Response:
-        user = self.get_object()
-        queryset = User.objects.active().filter(followed_by=user)
-        return self.perform_list_action(queryset)
-
-    @action(
-        detail=False,
-        methods=["get"],
-        serializer_class=UserConnectionSerializer,
-        pagination_class=get_paginator("cursor", ordering="-to_userblocks"),
-        permission_classes=[RequireUser, RequireScope],
-        required_scopes=["user.block"],
-    )
-    def blocked(self, request: UserRequest) -> Response:
-        queryset = User.objects.active().filter(blocked_by=request.user)
-        return self.perform_list_action(queryset)
-
     @action(
         detail=False,
         methods=["put", "delete"],
         permission_classes=[RequireUser, RequireFirstParty],
         serializer_class=ProfilePictureEditSerializer,
         parser_classes=[parsers.MultiPartParser],
+        upload_handlers=[
+            ImageUploadHandler.for_field(
+                User._meta.get_field("profile_picture"),
+                max_pixels=PROFILE_PICTURE_MAX_PIXELS,
+            )
+        ],
         url_path="profile-picture",
     )
     def profile_picture(self, request: Request) -> Response:
@@ -274,60 +384,39 @@ class UserViewSet(mixins.RetrieveModelMixin, ExtendedViewSet[User]):
 
     @action(
         detail=False,
-        methods=["get"],
-        permission_classes=[RequireUser, RequireScope],
-        serializer_class=RelationSerializer,
-        filterset_class=RelationFilter,
-        required_scopes=["user.profile"],
+        methods=["post"],
+        permission_classes=[RequireUser, RequireFirstParty],
+        serializer_class=ProfilePictureUploadSerializer,
+        url_path="profile-picture/upload",
     )
-    def relations(self, request: UserRequest) -> Response:
-        user = request.user
-        queryset = User.objects.active().only("id", "username").order_by("-id")
-        queryset = queryset.annotate(
-            rels=JSONObject(
-                following=Exists(
-                    UserFollow.objects.filter(
-                        to_user=OuterRef("pk"),
-                        from_user=user,
-                    )
-                ),
-                followed_by=Exists(
-                    UserFollow.objects.filter(
-                        to_user=user,
-                        from_user=OuterRef("pk"),
-                    )
-                ),
-                blocking=Exists(
-                    UserBlock.objects.filter(
-                        to_user=OuterRef("pk"),
-                        from_user=user,
-                    )
-                ),
-                blocked_by=Exists(
-                    UserBlock.objects.filter(
-                        to_user=user,
-                        from_user=OuterRef("pk"),
-                    )
-                ),
-                follow_request_sent=Exists(
-                    UserFollowRequest.objects.filter(
-                        to_user=OuterRef("pk"),
-                        from_user=user,
-                        status=UserFollowRequest.Status.PENDING,
-                    )
-                ),
-                follow_request_received=Exists(
-                    UserFollowRequest.objects.filter(
-                        to_user=user,
-                        from_user=OuterRef("pk"),
-                        status=UserFollowRequest.Status.PENDING,
-                    )
-                ),
-            ),
+    def profile_picture_upload(self, request: Request) -> Response:
+        storage = User._meta.get_field("profile_picture").storage  # type: ignore[attr-defined]
+        # Direct uploads need a storage that can presign them, such as
+        # `S3MediaStorage`.
+        if not hasattr(storage, "create_presigned_post"):
+            raise DirectUploadUnavailableError
+        serializer = self.get_serializer(
+            data=request.data,
+            context=self.get_serializer_context() | {"storage": storage},
         )
-        queryset = self.filter_queryset(queryset)[:50]
-        serializer = self.get_serializer({"results": queryset})
-        return Response(serializer.data)
+        return self.perform_action(serializer, status_code=status.HTTP_201_CREATED)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[RequireUser, RequireFirstParty],
+        serializer_class=ProfilePictureConfirmSerializer,
+        url_path="profile-picture/confirm",
+    )
+    def profile_picture_confirm(self, request: Request) -> Response:
+        serializer = self.get_serializer(
+            data=request.data,
+            context=self.get_serializer_context()
+            | {"storage": User._meta.get_field("profile_picture").storage},  # type: ignore[attr-defined]
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(status=status.HTTP_202_ACCEPTED)
 
     @action(
         detail=False,
@@ -339,6 +428,127 @@ class UserViewSet(mixins.RetrieveModelMixin, ExtendedViewSet[User]):
         return self.perform_action(status_code=status.HTTP_204_NO_CONTENT)
 
 
+class UserConnectionListView(AsyncAPIView[User]):
+    """
+    Common list view for user connections, i.e., followers, follows and
+    blocked users. These are requested frequently, so they are async views:
+    under ASGI, they wait for the database in the event loop instead of
+    holding a thread each.
+    """
+
+    authentication_classes = [AsyncOAuth2Authentication]
+    permission_classes = [RequireToken]
+    serializer_class = UserConnectionSerializer
+
+    async def aget_user(self) -> User:
+        # Same checks as `UserViewSet.get_object()`. Connections may reveal
+        # sensitive information about the user, so if the user marked their
+        # account private, these will be inaccessible to users that do not
+        # follow the user.
+        viewer = self.request.user
+        as_user = bool(viewer and viewer.is_authenticated)
+        if as_user and viewer.pk == self.kwargs["pk"]:
+            return viewer
+        user = await User.objects.active().filter(pk=self.kwargs["pk"]).afirst()
+        if user is None:
+            raise NotFound
+        if as_user and await viewer.ahas_block_rel(user):
+            raise PermissionDenied
+        if user.is_private and not (as_user and await viewer.ais_following(user)):
+            raise PermissionDenied
+        return user
+
+    async def list_connections(self, queryset: QuerySet[User]) -> Response:
+        # Clients may select a subset of fields using the 'fields' query
+        # parameter, in which case only the related columns are loaded from
+        # the database.
+        fields = UserConnectionSerializer.Meta.fields
+        fields = get_sparse_fields(self.request, allowed=fields) or fields
+        include = get_sparse_fields(
+            self.request, allowed=["relations"], param="include"
+        )
+        queryset = queryset.only(*get_connection_columns(fields))
+        if not include:
+            page = await self.apaginate_queryset(queryset)
+            serializer = self.get_serializer(
+                page, many=True, fields=fields, ref_name="UserConnection"
+            )
+            return self.get_paginated_response(await serialize(serializer))
+
+        # Relations of the authenticated user with the users on this page,
+        # fetched with a single query; saves clients a call to `relations`.
+        user, token = self.request.user, self.request.auth
+        if not (user and user.is_authenticated):
+            raise PermissionDenied
+        if token is not None and not token.is_valid(["user.profile:read"]):
+            raise PermissionDenied
+
+        page = cast("list[User]", await self.apaginate_queryset(queryset))
+        context = self.get_serializer_context()
+        context["relations"] = await user.aget_relations([obj.pk for obj in page])
+        serializer = UserConnectionWithRelationsSerializer(
+            page,
+            many=True,
+            fields=(*fields, "relations"),
+            ref_name="UserConnectionWithRelations",
+            context=context,
+        )
+        return self.get_paginated_response(await serialize(serializer))
+
+
+class UserFollowersView(UserConnectionListView):
+    pagination_class = get_paginator("cursor", ordering="-from_userfollows")
+
+    @schemas.followers
+    async def get(self, request: Request, pk: UUID) -> Response:
+        user = await self.aget_user()
+        queryset = User.objects.active().filter(following=user)
+        return await self.list_connections(queryset)
+
+
+class UserFollowingView(UserConnectionListView):
+    pagination_class = get_paginator("cursor", ordering="-to_userfollows")
+
+    @schemas.following
+    async def get(self, request: Request, pk: UUID) -> Response:
+        user = await self.aget_user()
+        queryset = User.objects.active().filter(followed_by=user)
+        return await self.list_connections(queryset)
+
+
+class UserBlockedView(UserConnectionListView):
+    pagination_class = get_paginator("cursor", ordering="-to_userblocks")
+    permission_classes = [RequireUser, RequireScope]
+    required_scopes = ["user.block"]
+
+    @schemas.blocked
+    async def get(self, request: UserRequest) -> Response:
+        queryset = User.objects.active().filter(blocked_by=request.user)
+        return await self.list_connections(queryset)
+
+
+class UserRelationsView(AsyncAPIView[User]):
+    authentication_classes = [AsyncOAuth2Authentication]
+    permission_classes = [RequireUser, RequireScope]
+    serializer_class = RelationSerializer
+    filterset_class = RelationFilter
+    required_scopes = ["user.profile"]
+
+    @schemas.relations
+    async def get(self, request: UserRequest) -> Response:
+        # Candidates are resolved first, then all of their relations with
+        # the authenticated user are fetched with a single query.
+        queryset = User.objects.active().only("id", "username").order_by("-id")
+        users = [
+            user async for user in self.filter_queryset(queryset)[:RELATIONS_LIMIT]
+        ]
+        relations = await request.user.aget_relations([user.pk for user in users])
+        for user in users:
+            user.rels = relations[user.pk]  # type: ignore[attr-defined]
+        serializer = self.get_serializer({"results": users})
+        return Response(serializer.data)
+
+
 class FollowRequestViewSet(
     mixins.ListModelMixin,
     ExtendedViewSet[UserFollowRequest],
@@ -358,6 +568,18 @@ class FollowRequestViewSet(
             return queryset.select_for_update()
         return queryset.select_related("from_user")
 
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[RequireUser, RequireScope],
+        serializer_class=FollowRequestCountSerializer,
+        required_scopes=["user.follow"],
+    )
+    def count(self, request: UserRequest) -> Response:
+        count = UserFollowRequest.objects.get_pending_count(request.user.pk)
+        serializer = self.get_serializer({"count": count})
+        return Response(serializer.data)
+
     @action(
         detail=True,
         methods=["post"],
@@ -383,3 +605,33 @@ class FollowRequestViewSet(
             instance = self.get_object()
             instance.reject()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def perform_bulk_action(self, *, accept: bool) -> Response:
+        # Requests are answered in batches, each batch in a separate
+        # transaction, so that locks are not held for too long.
+        context = self.get_serializer_context()
+        context["accept"] = accept
+        serializer = self.get_serializer(data=self.request.data, context=context)
+        return self.perform_action(serializer)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[RequireUser, RequireScope],
+        serializer_class=FollowRequestBulkSerializer,
+        required_scopes=["user.follow"],
+        url_path="bulk-accept",
+    )
+    def bulk_accept(self, request: UserRequest) -> Response:
+        return self.perform_bulk_action(accept=True)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[RequireUser, RequireScope],
+        serializer_class=FollowRequestBulkSerializer,
+        required_scopes=["user.follow"],
+        url_path="bulk-reject",
+    )
+    def bulk_reject(self, request: UserRequest) -> Response:
+        return self.perform_bulk_action(accept=False)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from asu.core.models import ProjectVariable
+from asu.core.models import MediaBlob, ProjectVariable
 
 
 @admin.register(ProjectVariable)
@@ -8,3 +8,10 @@ class ProjectVariableAdmin(admin.ModelAdmin[ProjectVariable]):
     search_fields = ("name", "value")
     list_display = ("name", "value", "updated_at")
     readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin[MediaBlob]):
+    search_fields = ("digest", "name")
+    list_display = ("name", "ref_count", "created_at")
+    readonly_fields = ("digest", "name", "variants", "created_at", "updated_at")
@@ -1,6 +1,18 @@
+from typing import Any
+
 from celery import Celery
+from celery.signals import worker_process_init
 
 __all__ = ["app"]
 
 app = Celery("asu")
 app.config_from_object("django.conf:settings", namespace="CELERY")
+
+
+@worker_process_init.connect
+def reset_connections(**kwargs: Any) -> None:
+    # Pool processes are forked from the main worker process, which has
+    # already loaded the application.
+    from asu.core.utils.connections import close_connections  # noqa: PLC0415
+
+    close_connections()
@@ -0,0 +1,43 @@
+import hashlib
+import io
+import json
+import posixpath
+import shutil
+from typing import Any
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from asu.core.utils.openapi import SCHEMA_DIRECTORY, SCHEMA_MANIFEST, get_schema_name
+
+STATIC_DIR = settings.BASE_DIR / "asu/core/static"
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema into a content-hashed static file, which"
+        " is deployed by 'collectstatic'. Previously built schemas are removed."
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        out = io.StringIO()
+        call_command(
+            "spectacular",
+            stdout=out,
+            format="openapi",
+            api_version="v1",
+            lang="en",
+            validate=True,
+        )
+        content = out.getvalue().encode()
+        digest = hashlib.sha256(content).hexdigest()[:16]
+        name = posixpath.join(SCHEMA_DIRECTORY, "api-schema.%s.yaml" % digest)
+
+        shutil.rmtree(STATIC_DIR / SCHEMA_DIRECTORY, ignore_errors=True)
+        (STATIC_DIR / SCHEMA_DIRECTORY).mkdir(parents=True)
+        (STATIC_DIR / name).write_bytes(content)
+
+        SCHEMA_MANIFEST.write_text(json.dumps({"name": name}))
+        get_schema_name.cache_clear()
+        self.stdout.write("Built %s" % name)
@@ -0,0 +1,92 @@
+import subprocess
+import sys
+from collections import Counter
+from typing import Any, NamedTuple
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+DEFAULT_MODULES = ("asu.gateways.wsgi", "asu.core.urls")
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self: int
+    cumulative: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """
+    Parse the output of `python -X importtime`, times are in microseconds.
+    """
+    entries = []
+    for line in output.splitlines():
+        prefix, _, rest = line.partition(":")
+        if prefix != "import time":
+            continue
+        try:
+            own, cumulative, module = rest.split("|")
+            entries.append(ImportTime(module.strip(), int(own), int(cumulative)))
+        except ValueError:
+            # The header, which reads 'self [us] | cumulative | ...'.
+            continue
+    return entries
+
+
+class Command(BaseCommand):
+    help = (
+        "Import given modules in a fresh interpreter (after setting up Django)"
+        " and report the modules that took the longest to import."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "modules",
+            nargs="*",
+            default=DEFAULT_MODULES,
+            help="Modules to import, defaults to the WSGI application and URLs.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=25,
+            help="Number of entries to report.",
+        )
+        parser.add_argument(
+            "--packages",
+            action="store_true",
+            help="Report the total time spent importing each top-level"
+            " package, instead of cumulative time of each module.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        code = "import django; django.setup()\n" + "".join(
+            "import %s\n" % module for module in options["modules"]
+        )
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if process.returncode != 0:
+            raise CommandError(
+                "Could not import given modules:\n%s" % process.stderr.strip()
+            )
+        entries = parse_importtime(process.stderr)
+
+        if options["packages"]:
+            totals: Counter[str] = Counter()
+            for entry in entries:
+                totals[entry.module.partition(".")[0]] += entry.self
+            rows = totals.most_common(options["limit"])
+        else:
+            entries.sort(key=lambda entry: entry.cumulative, reverse=True)
+            rows = [
+                (entry.module, entry.cumulative)
+                for entry in entries[: options["limit"]]
+            ]
+
+        total = sum(entry.self for entry in entries)
+        self.stdout.write("Total: %.1f ms" % (total / 1000))
+        for name, value in rows:
+            self.stdout.write("%10.1f ms  %s" % (value / 1000, name))
@@ -0,0 +1,71 @@
+# Generated by Django 6.1a1 on 2026-10-19 12:00
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+import asu.core.models.base
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        db_default=django.db.models.functions.UUID7(),
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="id",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_default=django.db.models.functions.datetime.Now(),
+                        verbose_name="date created",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    asu.core.models.base.AutoUpdatedField(
+                        db_default=django.db.models.functions.datetime.Now(),
+                        editable=False,
+                        verbose_name="date updated",
+                    ),
+                ),
+                (
+                    "digest",
+                    models.CharField(max_length=64, unique=True, verbose_name="digest"),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, unique=True, verbose_name="name"),
+                ),
+                (
+                    "variants",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Manifest of the files derived from this blob.",
+                        verbose_name="variants",
+                    ),
+                ),
+                (
+                    "ref_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="reference count"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "media blob",
+                "verbose_name_plural": "media blobs",
+            },
+        ),
+    ]
@@ -1,5 +1,7 @@
+from asu.core.models.blob import MediaBlob
 from asu.core.models.variable import ProjectVariable
 
 __all__ = [
+    "MediaBlob",
     "ProjectVariable",
 ]
@@ -0,0 +1,102 @@
+from collections.abc import Callable
+from typing import Any, ClassVar
+
+from django.core.files.storage import Storage
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils.translation import gettext_lazy as _
+
+from asu.core.models.base import Base, BaseManager
+from asu.core.utils.file import save_content
+
+
+class MediaBlobManager(BaseManager["MediaBlob"]):
+    def acquire(
+        self,
+        digest: str,
+        *,
+        name: str,
+        storage: Storage,
+        create: Callable[[str], tuple[dict[str, bytes], dict[str, Any]]],
+    ) -> MediaBlob:
+        """
+        Get a reference to the blob with given content digest. If there is no
+        such blob, `create` is called to get the files to store for it (the
+        file under `name` and the files derived from it), along with the
+        manifest of derived files.
+        """
+        if (blob := self.increment(digest)) is not None:
+            return blob
+
+        # Processing might take a while, so it is done outside of any
+        # transaction; only storing the results is.
+        files, variants = create(name)
+        while True:
+            try:
+                with transaction.atomic():
+                    blob = self.create(
+                        digest=digest,
+                        name=name,
+                        variants=variants,
+                        ref_count=1,
+                    )
+                    # The new blob is locked until the transaction commits,
+                    # so `release` cannot delete the files while they are
+                    # written. Files are named after their content, existing
+                    # ones are identical.
+                    for file_name, content in files.items():
+                        save_content(storage, file_name, content)
+                    return blob
+            except IntegrityError:
+                # The same content was stored concurrently.
+                if (blob := self.increment(digest)) is not None:
+                    return blob
+
+    def increment(self, digest: str) -> MediaBlob | None:
+        with transaction.atomic():
+            if self.filter(digest=digest).update(
+                ref_count=F("ref_count") + 1, updated_at=Now()
+            ):
+                return self.get(digest=digest)
+        return None
+
+    def release(self, name: str, *, delete: Callable[[], None]) -> None:
+        """
+        Drop a reference to the blob stored under given name. Once the blob
+        is no longer referenced, `delete` is called to delete its files.
+        Files that are not tracked as blobs are always deleted.
+        """
+        with transaction.atomic():
+            blob = self.select_for_update().filter(name=name).first()
+            if blob is not None and blob.ref_count > 1:
+                blob.ref_count -= 1
+                blob.save(update_fields=["ref_count", "updated_at"])
+                return
+            # Files are deleted while the blob is locked. Concurrent calls to
+            # `acquire` wait for the blob, then store the files again since
+            # the blob is gone.
+            delete()
+            if blob is not None:
+                blob.delete()
+
+
+class MediaBlob(Base):
+    digest = models.CharField(_("digest"), max_length=64, unique=True)
+    name = models.CharField(_("name"), max_length=255, unique=True)
+    variants = models.JSONField(
+        _("variants"),
+        default=dict,
+        blank=True,
+        help_text=_("Manifest of the files derived from this blob."),
+    )
+    ref_count = models.PositiveIntegerField(_("reference count"), default=0)
+
+    objects: ClassVar[MediaBlobManager] = MediaBlobManager()
+
+    class Meta:
+        verbose_name = _("media blob")
+        verbose_name_plural = _("media blobs")
+
+    def __str__(self) -> str:
+        return self.name
@@ -10,7 +10,8 @@ BASE_DIR = Path(__file__).resolve().parents[3]
 TESTING = "pytest" in sys.argv[0]
 
 ROOT_URLCONF = "asu.core.urls"
-WSGI_APPLICATION = "asu.core.wsgi.application"
+WSGI_APPLICATION = "asu.gateways.wsgi.application"
+ASGI_APPLICATION = "asu.gateways.asgi.application"
 
 
 SECRET_KEY = env.str("DJANGO_SECRET_KEY")
@@ -28,10 +29,12 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # First party apps
     "asu.core",
     "asu.auth",
     "asu.verification",
+    "asu.messaging",
     # Third party apps
     "rest_framework",
     "drf_spectacular",
@@ -61,6 +64,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_otp.middleware.OTPMiddleware",
     "asu.auth.middleware.UserActivityMiddleware",
+    "asu.auth.middleware.HashingUnavailableMiddleware",
 ]
 
 DATABASES = {
@@ -109,6 +113,8 @@ PASSWORD_HASHERS = [
     "django.contrib.auth.hashers.Argon2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
 ]
+PASSWORD_HASHING_CONCURRENCY = env.int("PASSWORD_HASHING_CONCURRENCY")
+PASSWORD_HASHING_TIMEOUT = env.float("PASSWORD_HASHING_TIMEOUT")
 AUTH_USER_MODEL = "account.User"
 SESSION_ENGINE = env.str("SESSION_ENGINE")
 SESSION_COOKIE_AGE = env.int("SESSION_COOKIE_AGE")
@@ -223,6 +229,10 @@ OAUTH2_PROVIDER = {
         ),
         "user.block:read": _("Display your list of blocked users"),
         "user.block:write": _("Block and unblock people on your behalf."),
+        "user.messaging:read": _("Display your conversations and messages."),
+        "user.messaging:write": _(
+            "Send messages on your behalf, mark your conversations as read."
+        ),
     },
     "ERROR_RESPONSE_WITH_SCOPES": False,
     "ACCESS_TOKEN_EXPIRE_SECONDS": 3600,  # an hour
@@ -272,7 +282,8 @@ SPECTACULAR_SETTINGS = {
     "COMPONENT_SPLIT_REQUEST": True,
     "SCHEMA_COERCE_PATH_PK_SUFFIX": True,
     "AUTHENTICATION_WHITELIST": [
-        "oauth2_provider.contrib.rest_framework.OAuth2Authentication"
+        "oauth2_provider.contrib.rest_framework.OAuth2Authentication",
+        "asu.auth.authentication.AsyncOAuth2Authentication",
     ],
     "OAUTH2_FLOWS": ["authorizationCode", "clientCredentials"],
     "OAUTH2_AUTHORIZATION_URL": reverse_lazy("oauth2_provider:authorize"),
@@ -318,3 +329,5 @@ PASSWORD_RESET_VERIFY_TIMEOUT = env.int("PASSWORD_RESET_VERIFY_TIMEOUT")
 PASSWORD_RESET_COMPLETE_TIMEOUT = env.int("PASSWORD_RESET_COMPLETE_TIMEOUT")
 REGISTRATION_VERIFY_TIMEOUT = env.int("REGISTRATION_VERIFY_TIMEOUT")
 REGISTRATION_COMPLETE_TIMEOUT = env.int("REGISTRATION_COMPLETE_TIMEOUT")
+
+FOLLOW_REQUEST_RETENTION_DAYS = env.int("FOLLOW_REQUEST_RETENTION_DAYS")
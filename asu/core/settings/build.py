@@ -0,0 +1,66 @@
+"""
+Settings to build artifacts into the image, such as the OpenAPI schema (see
+'build_schema' command). Neither secrets nor services are available while
+building, so settings that are read from the environment get placeholders
+and storages are local. Never serve requests with these settings.
+"""
+
+import os
+
+BUILD_ENVIRONMENT = {
+    "DJANGO_SECRET_KEY": "build",
+    "DJANGO_DEBUG": "false",
+    "ALLOWED_HOSTS": "",
+    "DJANGO_LANGUAGE_CODE": "en-gb",
+    "DJANGO_TIME_ZONE": "UTC",
+    "POSTGRES_DB": "",
+    "POSTGRES_USER": "",
+    "POSTGRES_PASSWORD": "",
+    "DATABASE_HOST": "",
+    "DATABASE_PORT": "",
+    "REDIS_URL": "redis://",
+    "RABBITMQ_URL": "amqp://",
+    "PASSWORD_HASHING_CONCURRENCY": "1",
+    "PASSWORD_HASHING_TIMEOUT": "0",
+    "SESSION_ENGINE": "asu.auth.sessions.db",
+    "SESSION_COOKIE_AGE": "0",
+    "SESSION_COOKIE_SECURE": "true",
+    "DEFAULT_FILE_STORAGE": "django.core.files.storage.FileSystemStorage",
+    "STATICFILES_STORAGE": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    "EMAIL_HOST": "",
+    "EMAIL_PORT": "0",
+    "EMAIL_HOST_USER": "",
+    "EMAIL_HOST_PASSWORD": "",
+    "EMAIL_USE_TLS": "false",
+    "DEFAULT_FROM_EMAIL": "",
+    "CSRF_COOKIE_SECURE": "true",
+    "CSRF_TRUSTED_ORIGINS": "",
+    "CORS_ALLOWED_ORIGINS": "",
+    "AWS_ACCESS_KEY_ID": "",
+    "AWS_SECRET_ACCESS_KEY": "",
+    "AWS_STORAGE_BUCKET_NAME": "",
+    "AWS_S3_ENDPOINT_URL": "",
+    "AWS_S3_REGION_NAME": "",
+    "SENTRY_ENABLED": "false",
+    "SENTRY_DSN": "",
+    "SENTRY_TRACES_SAMPLE_RATE": "0",
+    "PROJECT_BRAND": "asu",
+    "PROJECT_ENVIRONMENT": "production",
+    "PROJECT_SUPPORT_EMAIL": "",
+    "PROJECT_URL_ACCOUNT_CREATION": "",
+    "PROJECT_URL_PASSWORD_RESET": "",
+    "PROJECT_URL_TERMS": "",
+    "PROJECT_URL_PRIVACY": "",
+    "PROJECT_URL_SECURITY": "",
+    "PROJECT_URL_CONTACT": "",
+    "VERIFICATION_SECRET_KEY": "build",
+    "EMAIL_CHANGE_VERIFY_TIMEOUT": "0",
+    "PASSWORD_RESET_VERIFY_TIMEOUT": "0",
+    "PASSWORD_RESET_COMPLETE_TIMEOUT": "0",
+    "REGISTRATION_VERIFY_TIMEOUT": "0",
+    "REGISTRATION_COMPLETE_TIMEOUT": "0",
+    "FOLLOW_REQUEST_RETENTION_DAYS": "0",
+}
+os.environ.update(BUILD_ENVIRONMENT)
+
+from asu.core.settings import *  # noqa: E402, F403
@@ -10,6 +10,7 @@ from two_factor import views as tf
 from asu.core.views import (
     APIRootView,
     DocsView,
+    HealthView,
     bad_request,
     page_not_found,
     permission_denied,
@@ -18,10 +19,29 @@ from asu.core.views import (
 
 api_v1_urls: list[URLResolver | URLPattern] = [
     path("", APIRootView.as_view(), name="api-root"),
+    path("health/", HealthView.as_view(), name="health"),
     path("", include("asu.auth.urls")),
     path("", include("asu.verification.urls")),
+    path("", include("asu.messaging.urls")),
 ]
 
+docs_urls: list[URLResolver | URLPattern] = [
+    path("", DocsView.as_view(), name="browse"),
+]
+
+if settings.DEBUG:
+    from drf_spectacular.views import SpectacularAPIView
+
+    # Schemas are built into the image, see 'build_schema' command. During
+    # development the schema is generated on request instead.
+    docs_urls.append(
+        path(
+            "schema/",
+            SpectacularAPIView.as_view(api_version="v1"),
+            name="schema",
+        )
+    )
+
 
 account_urls = [
     path("", tf.ProfileView.as_view(), name="profile"),
@@ -58,17 +78,7 @@ urlpatterns: list[URLPattern | URLResolver] = [
         ),
     ),
     path("o/", include((oauth_urls, "oauth2_provider"))),
-    path(
-        "docs/",
-        include(
-            (
-                [
-                    path("", DocsView.as_view(), name="browse"),
-                ],
-                "docs",
-            )
-        ),
-    ),
+    path("docs/", include((docs_urls, "docs"))),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,23 @@
+from django.core.cache import caches
+from django.db import connections
+
+from asu.auth import events
+
+__all__ = [
+    "close_connections",
+]
+
+
+def close_connections() -> None:
+    """
+    Close the database, cache and Redis connections of this process. Called
+    before forking worker processes from a preloaded application, so that
+    connections are never shared between processes, and again in forked
+    processes in case any were opened in between.
+    """
+    connections.close_all()
+    caches.close_all()
+    # Redis connection pools discard connections inherited from another
+    # process on their own, the client is dropped so that each process
+    # creates its own pool from scratch.
+    events.get_client.cache_clear()
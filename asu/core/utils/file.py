@@ -1,28 +1,69 @@
+import functools
+import hashlib
+import io
 import mimetypes
 import uuid
+from collections.abc import Callable, Iterable, Sequence
 from pathlib import Path
 from typing import Any
 
 from django.core.exceptions import ValidationError
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.core.files.uploadhandler import FileUploadHandler
+from django.http import HttpRequest
 from django.utils.deconstruct import deconstructible
 from django.utils.translation import gettext_lazy as _
 
-import magic
-from storages.backends.s3boto3 import (
-    S3Boto3Storage,
-    S3StaticStorage as BaseS3StaticStorage,
-)
+from rest_framework import serializers
+
+HEAD_SIZE = 2048
+"""
+Number of bytes needed to sniff the mime type of a file.
+"""
+
+IMAGE_HEADER_MAX_SIZE = 2**16
+"""
+Number of bytes an image header is expected to fit in, including metadata
+such as EXIF that precedes the dimensions in JPEG files.
+"""
 
 
 def get_mime_type(file: File[Any]) -> str:
+    # Loading libmagic is deferred until a file is actually inspected.
+    import magic  # noqa: PLC0415
+
     initial_pos = file.tell()
     file.seek(0)
-    mime_type = magic.from_buffer(file.read(2048), mime=True)
+    mime_type = magic.from_buffer(file.read(HEAD_SIZE), mime=True)
     file.seek(initial_pos)
     return mime_type
 
 
+def get_file_digest(file: File[Any]) -> str:
+    """
+    Compute the SHA-256 digest of a file, reading it in chunks.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def save_content(storage: Storage, name: str, content: bytes) -> None:
+    # Files are saved under their exact names, which are expected to be
+    # derived from their content; existing files are left as they are.
+    if not storage.exists(name):
+        storage.save(name, ContentFile(content))
+
+
+def get_blob_name(digest: str, ext: str) -> str:
+    # Content-addressed name of a file, e.g., 'usercontent/blobs/ab/ab12...'.
+    return "%sblobs/%s/%s%s" % (UserContentPath.base_path, digest[:2], digest, ext)
+
+
 @deconstructible
 class MimeTypeValidator:
     message = _("The file you uploaded did not have the valid mime type.")
@@ -56,6 +97,142 @@ class FileSizeValidator:
             raise ValidationError(self.message)
 
 
+@deconstructible
+class ImageDimensionsValidator:
+    """
+    Validate the number of pixels of an image. Only the header of the image
+    is parsed, so this also works with the head of a file (see
+    `read_file_head`). Files that cannot be parsed are left to other
+    validators, such as `MimeTypeValidator`.
+    """
+
+    message = _("The dimensions of the image you uploaded exceeded the maximum limit.")
+
+    def __init__(self, max_pixels: int) -> None:
+        self.max_pixels = max_pixels
+
+    def __call__(self, file: File[Any]) -> None:
+        from PIL import Image  # noqa: PLC0415
+
+        initial_pos = file.tell()
+        file.seek(0)
+        try:
+            width, height = Image.open(file).size
+        except Image.DecompressionBombError:
+            raise ValidationError(self.message)
+        except OSError:
+            return
+        finally:
+            file.seek(initial_pos)
+        if width * height > self.max_pixels:
+            raise ValidationError(self.message)
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Validate image uploads while they are being streamed, so that invalid
+    uploads are rejected without receiving the rest of the body. Size is
+    checked as chunks arrive, and the image header is parsed as soon as
+    enough of it is received to check its type and dimensions.
+
+    Chunks are passed on to the next handler, which stores the file.
+    """
+
+    size_message = FileSizeValidator.message
+    type_message = MimeTypeValidator.message
+    dimensions_message = ImageDimensionsValidator.message
+
+    def __init__(
+        self,
+        request: HttpRequest | None = None,
+        *,
+        field_name: str,
+        max_size: int,
+        allowed_types: Sequence[str],
+        max_pixels: int,
+    ) -> None:
+        super().__init__(request)
+        self.target = field_name
+        self.max_size = max_size
+        self.allowed_types = allowed_types
+        self.max_pixels = max_pixels
+        self.active = False
+
+    @classmethod
+    def for_field(
+        cls, field: Any, *, max_pixels: int
+    ) -> Callable[[HttpRequest], ImageUploadHandler]:
+        """
+        Create a handler factory using the limits of `FileSizeValidator` and
+        `MimeTypeValidator` of given model field.
+        """
+        (size,) = (v for v in field.validators if isinstance(v, FileSizeValidator))
+        (mime,) = (v for v in field.validators if isinstance(v, MimeTypeValidator))
+        return functools.partial(
+            cls,
+            field_name=field.name,
+            max_size=size.max_size,
+            allowed_types=mime.allowed_types,
+            max_pixels=max_pixels,
+        )
+
+    def reject(self, message: str) -> None:
+        raise serializers.ValidationError({self.target: [message]})
+
+    def new_file(
+        self, field_name: str, file_name: str, *args: Any, **kwargs: Any
+    ) -> None:
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.active = field_name == self.target
+        if not self.active:
+            return
+
+        self.received, self.head, self.checked = 0, b"", False
+        if self.content_length is not None and self.content_length > self.max_size:
+            self.reject(self.size_message)
+        mime_type, _ = mimetypes.guess_type(file_name)
+        if mime_type not in self.allowed_types:
+            self.reject(self.type_message)
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> bytes:
+        if not self.active:
+            return raw_data
+
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.reject(self.size_message)
+        if not self.checked:
+            self.head = (self.head + raw_data)[:IMAGE_HEADER_MAX_SIZE]
+            self.check_header(complete=len(self.head) == IMAGE_HEADER_MAX_SIZE)
+        return raw_data
+
+    def file_complete(self, file_size: int) -> None:
+        if self.active and not self.checked:
+            self.check_header(complete=True)
+
+    def check_header(self, *, complete: bool) -> None:
+        from PIL import Image  # noqa: PLC0415
+
+        # Opening an image only parses its header; pixel data is not decoded.
+        try:
+            image = Image.open(io.BytesIO(self.head))
+        except Image.DecompressionBombError:
+            self.reject(self.dimensions_message)
+            return
+        except OSError:
+            if complete:
+                self.reject(self.type_message)
+            return
+
+        mime_type = Image.MIME.get(image.format or "")
+        if mime_type not in self.allowed_types:
+            self.reject(self.type_message)
+        width, height = image.size
+        if width * height > self.max_pixels:
+            self.reject(self.dimensions_message)
+        self.checked = True
+
+
 @deconstructible
 class UserContentPath:
     base_path = "usercontent/"
@@ -71,11 +248,42 @@ class UserContentPath:
         )
 
 
-class S3StaticStorage(BaseS3StaticStorage):
-    location = "static"
-    default_acl = "public-read"
+def read_file_head(storage: Storage, name: str, length: int = HEAD_SIZE) -> File[bytes]:
+    """
+    Get a file that contains the first `length` bytes of the stored file,
+    enough to run validators such as `MimeTypeValidator` and
+    `FileSizeValidator` without downloading the whole file. Its size is that
+    of the stored file.
+    """
+    # Storages that support ranged reads implement `read_head`, such as
+    # `asu.core.utils.storage.S3MediaStorage`.
+    if hasattr(storage, "read_head"):
+        head, size = storage.read_head(name, length)
+    else:
+        with storage.open(name) as f:
+            head = f.read(length)
+        size = storage.size(name)
+    file = ContentFile(head, name=name)
+    file.size = size
+    return file
+
+
+def get_urls(storage: Storage, names: Iterable[str]) -> dict[str, str]:
+    """
+    Get the URLs of multiple files, in bulk if the storage supports it.
+    """
+    if hasattr(storage, "get_urls"):
+        urls: dict[str, str] = storage.get_urls(names)
+        return urls
+    return {name: storage.url(name) for name in names}
+
 
+def __getattr__(name: str) -> Any:
+    # Storages used to be defined in this module, and might still be
+    # configured by their old paths. They are imported on demand, since
+    # boto3 is slow to import.
+    if name in {"S3MediaStorage", "S3StaticStorage", "URLCacheInfo"}:
+        from asu.core.utils import storage  # noqa: PLC0415
 
-class S3MediaStorage(S3Boto3Storage):
-    location = "media"
-    default_acl = "private"
+        return getattr(storage, name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
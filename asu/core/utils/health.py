@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from django.conf import settings
+from django.db import connection, transaction
+
+import redis
+
+from asu.core.celery import app
+
+__all__ = [
+    "get_health",
+]
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_TIMEOUT = 2
+"""
+Timeout of each check, in seconds.
+"""
+HEALTH_CACHE_TIMEOUT = 5
+"""
+Number of seconds to reuse the results of the checks, so that frequent
+probes do not put any load on the services.
+"""
+
+
+def check_database() -> None:
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SET LOCAL statement_timeout = %s", [HEALTH_CHECK_TIMEOUT * 1000]
+        )
+        cursor.execute("SELECT 1")
+
+
+def check_redis() -> None:
+    client = redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=HEALTH_CHECK_TIMEOUT,
+        socket_connect_timeout=HEALTH_CHECK_TIMEOUT,
+    )
+    with client:
+        client.ping()
+
+
+def check_broker() -> None:
+    with app.connection_for_write() as conn:
+        conn.ensure_connection(max_retries=1, timeout=HEALTH_CHECK_TIMEOUT)
+
+
+CHECKS: dict[str, Callable[[], None]] = {
+    "database": check_database,
+    "redis": check_redis,
+    "broker": check_broker,
+}
+
+
+def run_checks() -> dict[str, bool]:
+    results = {}
+    for name, check in CHECKS.items():
+        try:
+            check()
+        except Exception:
+            logger.warning("Health check '%s' failed", name, exc_info=True)
+            results[name] = False
+        else:
+            results[name] = True
+    return results
+
+
+class HealthCache:
+    # The cache framework is not used since it is backed by Redis, which is
+    # one of the checked services.
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.results: dict[str, bool] | None = None
+        self.expires = 0.0
+
+    def get(self) -> dict[str, bool]:
+        # Concurrent probes wait for the running checks instead of running
+        # their own.
+        with self.lock:
+            if self.results is None or time.monotonic() >= self.expires:
+                self.results = run_checks()
+                self.expires = time.monotonic() + HEALTH_CACHE_TIMEOUT
+            return self.results
+
+    def clear(self) -> None:
+        with self.lock:
+            self.results = None
+
+
+health_cache = HealthCache()
+
+
+def get_health() -> dict[str, bool]:
+    """
+    Check whether the database, Redis and the message broker are available.
+    Results are reused for `HEALTH_CACHE_TIMEOUT` seconds.
+    """
+    return health_cache.get()
@@ -1,7 +1,10 @@
 import enum
+import functools
+import json
 import types
 from typing import Any, cast
 
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
@@ -13,6 +16,29 @@ from drf_spectacular.utils import Direction, OpenApiExample
 
 from asu.core.utils.rest import DynamicFieldsMixin, exception_handler
 
+SCHEMA_NAME = "api-schema.yaml"
+"""
+Name of the static schema that is used if no schema was built.
+"""
+SCHEMA_DIRECTORY = "schema"
+"""
+Static directory of built schemas, which are content-hashed.
+"""
+SCHEMA_MANIFEST = settings.BASE_DIR / "asu/core/schema-manifest.json"
+
+
+@functools.cache
+def get_schema_name() -> str:
+    """
+    Get the static file name of the OpenAPI schema, as written by the
+    'build_schema' command.
+    """
+    try:
+        manifest = json.loads(SCHEMA_MANIFEST.read_text())
+    except FileNotFoundError:
+        return SCHEMA_NAME
+    return cast("str", manifest["name"])
+
 
 class Tag(enum.StrEnum):
     USER_REGISTRATION = "User Registration"
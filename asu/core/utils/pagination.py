@@ -0,0 +1,156 @@
+import hashlib
+from typing import Any
+
+from django.contrib import messages
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.utils.functional import cached_property
+from django.utils.translation import gettext
+
+__all__ = [
+    "ApproximateCountAdminMixin",
+    "ApproximatePaginator",
+    "get_approximate_count",
+]
+
+COUNT_CAP = 1000
+"""
+Number of rows to count at most, for querysets that are filtered.
+"""
+COUNT_CACHE_TIMEOUT = 60
+
+
+def get_estimated_count(queryset: QuerySet[Any]) -> int | None:
+    """
+    Get the number of rows of the table of given queryset, as estimated by
+    PostgreSQL statistics. Returns `None` if the queryset is filtered, or
+    if no estimate is available.
+    """
+    query = queryset.query
+    if (
+        query.where
+        or query.distinct
+        or query.combinator
+        or query.is_sliced
+        or connections[queryset.db].vendor != "postgresql"
+    ):
+        return None
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # Tables that were never vacuumed or analyzed have a negative estimate.
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def get_approximate_count(
+    queryset: QuerySet[Any], *, cap: int = COUNT_CAP
+) -> tuple[int, bool]:
+    """
+    Count the rows of given queryset, returning the count and whether it is
+    exact. Unfiltered querysets of large tables are counted using table
+    statistics, others are counted up to `cap + 1` rows and cached for a
+    short while.
+    """
+    estimate = get_estimated_count(queryset)
+    if estimate is not None and estimate > cap:
+        return estimate, False
+
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(repr((queryset.db, sql, params, cap)).encode())
+    key = "count.%s" % digest.hexdigest()
+    cached: tuple[int, bool] | None = cache.get(key)
+    if cached is not None:
+        return cached
+
+    count = queryset.order_by()[: cap + 1].count()
+    result = (count, count <= cap)
+    cache.set(key, result, timeout=COUNT_CACHE_TIMEOUT)
+    return result
+
+
+class ApproximatePaginator(Paginator):
+    """
+    A paginator that avoids exact counts for querysets, see
+    `get_approximate_count`. If the count is approximate, any page past the
+    first one may be requested, and pages are sliced without relying on the
+    count.
+    """
+
+    count_cap = COUNT_CAP
+    is_approximate = False
+
+    @cached_property
+    def count(self) -> int:
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        count, exact = get_approximate_count(self.object_list, cap=self.count_cap)
+        self.is_approximate = not exact
+        return count
+
+    def validate_number(self, number: Any) -> int:
+        if not (self.count and self.is_approximate):
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except TypeError, ValueError:
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number: Any) -> Page:
+        number = self.validate_number(number)
+        if not self.is_approximate:
+            return super().page(number)
+        # The count cannot tell whether there is a next page, so an extra
+        # row is fetched to find out.
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        return ApproximatePage(
+            rows[: self.per_page],
+            number,
+            self,
+            has_next=len(rows) > self.per_page,
+        )
+
+
+class ApproximatePage(Page):
+    def __init__(self, *args: Any, has_next: bool, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._has_next = has_next
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+
+class ApproximateCountAdminMixin:
+    """
+    Use approximate counts in changelists of `ModelAdmin` classes, and let
+    the user know when they are.
+    """
+
+    paginator = ApproximatePaginator
+    show_full_result_count = False
+
+    def changelist_view(
+        self,
+        request: HttpRequest,
+        extra_context: dict[str, Any] | None = None,
+    ) -> HttpResponse:
+        response = super().changelist_view(request, extra_context)  # type: ignore[misc]
+        context = getattr(response, "context_data", None) or {}
+        changelist = context.get("cl")
+        if changelist is not None and changelist.paginator.is_approximate:
+            messages.info(
+                request,
+                gettext("Result counts on this page are approximate."),
+            )
+        return response
@@ -1,6 +1,8 @@
+from collections.abc import Sequence
 from typing import TYPE_CHECKING, Any
 
 from django.core.exceptions import PermissionDenied
+from django.db.models import QuerySet
 from django.http import Http404
 from django.utils.translation import gettext
 
@@ -8,12 +10,16 @@ from rest_framework import exceptions, pagination, serializers
 from rest_framework.fields import Field
 from rest_framework.metadata import BaseMetadata
 from rest_framework.mixins import UpdateModelMixin
-from rest_framework.pagination import BasePagination
+from rest_framework.pagination import BasePagination, _reverse_ordering
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.settings import api_settings
 from rest_framework.views import exception_handler as default_exception_handler
 
+from rest_filters.fields import CSVField
+
+from asu.core.utils.pagination import ApproximatePaginator
+
 if TYPE_CHECKING:
     from rest_framework.views import APIView
 
@@ -72,9 +78,133 @@ def exception_handler(exc: Exception, context: dict[str, Any]) -> Response | Non
     return response
 
 
+class ApproximatePageNumberPagination(pagination.PageNumberPagination):
+    # Page number pagination without exact counts, see `ApproximatePaginator`.
+    django_paginator_class = ApproximatePaginator
+
+    def get_paginated_response(self, data: Any) -> Response:
+        response = super().get_paginated_response(data)
+        response.data["count_is_approximate"] = self.page.paginator.is_approximate  # type: ignore[union-attr]
+        return response
+
+    def get_paginated_response_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_approximate"] = {"type": "boolean"}
+        response_schema["required"].append("count_is_approximate")
+        return response_schema
+
+
+class CursorPagination(pagination.CursorPagination):
+    # Cursor pagination that can also fetch pages using the async ORM, see
+    # `apaginate_queryset`. Pages are sliced and evaluated the same way as
+    # `pagination.CursorPagination`.
+
+    def paginate_queryset(
+        self, queryset: QuerySet[Any], request: Request, view: APIView | None = None
+    ) -> list[Any] | None:
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(
+        self, queryset: QuerySet[Any], request: Request, view: APIView | None = None
+    ) -> list[Any] | None:
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([obj async for obj in queryset])
+
+    def get_page_queryset(
+        self, queryset: QuerySet[Any], request: Request, view: APIView | None = None
+    ) -> QuerySet[Any] | None:
+        """
+        Get the queryset of the requested page, including the item that
+        follows the page, if any.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        # Cursor pagination always enforces an ordering.
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        # If we have a cursor with a fixed position then filter by that.
+        if current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith("-")
+            order_attr = order.lstrip("-")
+
+            # Test for: (cursor reversed) XOR (queryset reversed)
+            if reverse != is_reversed:
+                kwargs = {order_attr + "__lt": current_position}
+            else:
+                kwargs = {order_attr + "__gt": current_position}
+            queryset = queryset.filter(**kwargs)
+
+        # Fetch an extra item to determine if there is a following page.
+        return queryset[offset : offset + self.page_size + 1]
+
+    def set_page(self, results: list[Any]) -> list[Any]:
+        """
+        Set the page and the positions of adjacent pages, using the results
+        of the queryset returned by `get_page_queryset`.
+        """
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+        self.page = list(results[: self.page_size])
+
+        # Determine the position of the final item following the page.
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            # The query ordering was in reverse, so the items are reversed
+            # again before returning them to the user.
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+
 _pagination_map = {
-    "page_number": pagination.PageNumberPagination,
-    "cursor": pagination.CursorPagination,
+    "page_number": ApproximatePageNumberPagination,
+    "cursor": CursorPagination,
     "limit_offset": pagination.LimitOffsetPagination,
 }
 
@@ -105,6 +235,30 @@ class DynamicFieldsMixin:
                 self.fields.pop(field_name)
 
 
+def get_sparse_fields(
+    request: Request,
+    /,
+    *,
+    allowed: Sequence[str],
+    param: str = "fields",
+) -> tuple[str, ...] | None:
+    """
+    Parse the comma-separated list of field names given in `param` query
+    parameter. Returns `None` if the parameter is missing, otherwise the
+    requested fields, in the order they are listed in `allowed`.
+    """
+    value = request.query_params.get(param)
+    if not value:
+        return None
+
+    parser = CSVField(child=serializers.ChoiceField(choices=allowed), min_length=1)
+    try:
+        requested = set(parser.run_validation(value))
+    except serializers.ValidationError as exc:
+        raise serializers.ValidationError({param: exc.detail})
+    return tuple(field for field in allowed if field in requested)
+
+
 class PartialUpdateModelMixin:
     """
     Update a model instance.
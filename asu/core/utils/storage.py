@@ -0,0 +1,169 @@
+import time
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+from django.core.cache import cache
+
+from botocore.exceptions import ClientError
+from storages.backends.s3boto3 import (
+    S3Boto3Storage,
+    S3StaticStorage as BaseS3StaticStorage,
+)
+from storages.utils import clean_name
+
+from asu.core.utils.file import HEAD_SIZE
+
+__all__ = [
+    "S3MediaStorage",
+    "S3StaticStorage",
+    "URLCacheInfo",
+]
+
+
+class S3StaticStorage(BaseS3StaticStorage):
+    location = "static"
+    default_acl = "public-read"
+    immutable_directories = ("schema/",)
+    """
+    Directories of content-hashed files, e.g., the schemas written by the
+    'build_schema' command. These files never change once they are saved.
+    """
+    gzip = True
+    gzip_content_types = ("application/yaml",)
+    """
+    Files of these types are saved compressed, with 'Content-Encoding'
+    header set. The bucket cannot pick an encoding per request, so only gzip
+    is used, which HTTP clients accept by default.
+    """
+
+    def get_object_parameters(self, name: str) -> dict[str, Any]:
+        params: dict[str, Any] = super().get_object_parameters(name)
+        # Names are prefixed with the location at this point.
+        name = name.removeprefix(self.location + "/")
+        if name.startswith(self.immutable_directories):
+            params["CacheControl"] = "public, max-age=31536000, immutable"
+        if name.endswith(".yaml"):
+            # Not every platform maps YAML in its MIME types.
+            params["ContentType"] = "application/yaml"
+        return params
+
+
+class URLCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class S3MediaStorage(S3Boto3Storage):
+    location = "media"
+    default_acl = "private"
+
+    url_cache_margin = 300
+    """
+    Minimum number of seconds a cached URL stays valid for, once it is
+    served from the cache.
+    """
+    _url_cache_hits = 0
+    _url_cache_misses = 0
+
+    def url(
+        self,
+        name: str,
+        parameters: dict[str, Any] | None = None,
+        expire: int | None = None,
+        http_method: str | None = None,
+    ) -> str:
+        if parameters is None and expire is None and http_method is None:
+            return self.get_urls([name])[name]
+        url: str = super().url(name, parameters, expire, http_method)
+        return url
+
+    def get_urls(self, names: Iterable[str]) -> dict[str, str]:
+        """
+        Get the URLs of multiple files. Signed URLs are cached and reused
+        until shortly before they expire, and the ones that are missing
+        from the cache are signed in bulk.
+        """
+        names = list(dict.fromkeys(names))
+        if not (self.querystring_auth and not self.custom_domain):
+            return {name: super().url(name) for name in names}
+
+        # Time is divided into windows that are `url_cache_margin` shorter
+        # than the expiry of a URL. A URL signed at any point within a
+        # window will still be valid by the time that window ends.
+        window = self.querystring_expire - self.url_cache_margin
+        now = time.time()
+        bucket = int(now // window)
+        keys = {name: "media_url.%s.%s" % (bucket, name) for name in names}
+
+        cached: dict[str, str] = cache.get_many(keys.values())
+        urls, misses = {}, {}
+        for name, key in keys.items():
+            if key in cached:
+                urls[name] = cached[key]
+            else:
+                urls[name] = misses[key] = super().url(name)
+        if misses:
+            cache.set_many(misses, timeout=(bucket + 1) * window - now)
+
+        cls = type(self)
+        cls._url_cache_hits += len(cached)
+        cls._url_cache_misses += len(misses)
+        return urls
+
+    @classmethod
+    def url_cache_info(cls) -> URLCacheInfo:
+        """
+        Hits and misses of the URL cache, within this process.
+        """
+        return URLCacheInfo(cls._url_cache_hits, cls._url_cache_misses)
+
+    def create_presigned_post(
+        self,
+        name: str,
+        *,
+        content_type: str,
+        max_size: int,
+        expires_in: int = 300,
+    ) -> dict[str, Any]:
+        """
+        Create a presigned POST that allows clients to upload a file of given
+        type and size, to given name, directly to the bucket.
+        """
+        key = self._normalize_name(clean_name(name))
+        post: dict[str, Any] = self.connection.meta.client.generate_presigned_post(
+            Bucket=self.bucket_name,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_size],
+            ],
+            ExpiresIn=expires_in,
+        )
+        return post
+
+    def read_head(self, name: str, length: int = HEAD_SIZE) -> tuple[bytes, int]:
+        """
+        Read the first `length` bytes of a file using a ranged GET, along with
+        the size of the whole file.
+        """
+        key = self._normalize_name(clean_name(name))
+        try:
+            response = self.connection.meta.client.get_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Range="bytes=0-%d" % (length - 1),
+            )
+        except ClientError as err:
+            if err.response["ResponseMetadata"]["HTTPStatusCode"] in (404, 416):
+                raise FileNotFoundError("File does not exist: %s" % name)
+            raise
+        # Content-Range looks like 'bytes 0-2047/146515'.
+        _, _, size = response["ContentRange"].rpartition("/")
+        with response["Body"] as body:
+            return body.read(), int(size)
@@ -1,4 +1,5 @@
 import abc
+import inspect
 from collections.abc import Callable, Mapping, Sequence
 from typing import (
     TYPE_CHECKING,
@@ -13,14 +14,17 @@ from typing import (
 )
 from uuid import UUID
 
+from django.core.files.uploadhandler import FileUploadHandler
 from django.db.models import Model, QuerySet
-from django.http import HttpResponseBase
+from django.http import HttpRequest, HttpResponseBase
 
-from rest_framework import serializers, status, viewsets
+from rest_framework import exceptions, generics, serializers, status, viewsets
 from rest_framework.decorators import action as viewset_action
 from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
 from rest_framework.response import Response
 
+from asgiref.sync import sync_to_async
 from drf_spectacular.utils import extend_schema_view
 from rest_filters import FilterSet
 
@@ -109,6 +113,22 @@ class ExtendedViewSet[T: Model](viewsets.GenericViewSet[T], metaclass=ViewSetMet
 
     # Set `filterset_class` so that non-mixin actions can override this.
     filterset_class = None
+    # Factories of upload handlers that run before the default ones, for
+    # actions that need to validate uploads while they are being streamed.
+    upload_handlers: Sequence[Callable[[HttpRequest], FileUploadHandler]] = ()
+
+    def initialize_request(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> Request:
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        # Handlers must be set before the request body is parsed, which may
+        # happen as early as authentication.
+        if self.upload_handlers:
+            request.upload_handlers = [
+                *(factory(request) for factory in self.upload_handlers),
+                *request.upload_handlers,
+            ]
+        return drf_request
 
     def perform_action(
         self,
@@ -130,9 +150,10 @@ class ExtendedViewSet[T: Model](viewsets.GenericViewSet[T], metaclass=ViewSetMet
         status_code = status_code if data else status.HTTP_204_NO_CONTENT
         return Response(data, status=status_code)
 
-    def perform_list_action(self, queryset: QuerySet[T]) -> Response:
+    def perform_list_action(self, queryset: QuerySet[T], **kwargs: Any) -> Response:
+        # Keyword arguments are passed to the serializer.
         page = self.paginate_queryset(queryset)
-        serializer = self.get_serializer(page, many=True)
+        serializer = self.get_serializer(page, many=True, **kwargs)
         return self.get_paginated_response(serializer.data)
 
     def get_filterset_class(self) -> type[FilterSet[T]] | None:
@@ -167,6 +188,104 @@ class ExtendedViewSet[T: Model](viewsets.GenericViewSet[T], metaclass=ViewSetMet
         return super().get_permissions()
 
 
+class AsyncAPIView[T: Model](generics.GenericAPIView[T]):
+    """
+    A view whose handlers are coroutines, e.g., `async def get()`. Requests
+    are authenticated and permissions are checked in the event loop.
+
+    Authenticators may implement `aauthenticate()`, otherwise `authenticate()`
+    is run in a thread. Similarly, permissions may implement
+    `ahas_permission()`, otherwise `has_permission()` is called as is, so it
+    should not query the database.
+    """
+
+    required_scopes: list[str] | None = None
+
+    async def dispatch(  # type: ignore[override]
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        # Same as `APIView.dispatch()`, except for the awaited parts.
+        self.args = args
+        self.kwargs = kwargs
+        drf_request = self.initialize_request(request, *args, **kwargs)
+        self.request = drf_request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(drf_request, *args, **kwargs)
+            method = drf_request.method.lower()  # type: ignore[union-attr]
+            handler = self.http_method_not_allowed
+            if method in self.http_method_names:
+                handler = getattr(self, method, self.http_method_not_allowed)
+            response = handler(drf_request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                # Handlers such as `options()` are not coroutines.
+                response = await response
+        except Exception as exc:  # noqa: BLE001
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(drf_request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request: Request, *args: Any, **kwargs: Any) -> None:
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        await self.acheck_permissions(request)
+        self.check_throttles(request)
+
+    async def aperform_authentication(self, request: Request) -> None:
+        # Same as `Request._authenticate()`, which is run lazily (and
+        # synchronously) once the user is accessed otherwise.
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(
+                        request
+                    )
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    async def acheck_permissions(self, request: Request) -> None:
+        for permission in self.get_permissions():
+            if hasattr(permission, "ahas_permission"):
+                allowed = await permission.ahas_permission(request, self)
+            else:
+                allowed = permission.has_permission(request, self)
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def apaginate_queryset(self, queryset: QuerySet[T]) -> list[T] | None:
+        # The paginator must implement `apaginate_queryset()`, such as the
+        # cursor pagination of `asu.core.utils.rest.get_paginator`.
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(  # type: ignore[attr-defined, no-any-return]
+            queryset, self.request, view=self
+        )
+
+    def get_required_scopes(self) -> list[str]:
+        mode = "read" if self.request.method in SAFE_METHODS else "write"
+        assert self.required_scopes, "missing scopes for view '%s'" % type(self)
+        return ["%s:%s" % (scope, mode) for scope in self.required_scopes]
+
+
 def action[RT: HttpResponseBase, **P](
     *,
     methods: list[Literal["get", "post", "put", "patch", "delete"]],
@@ -0,0 +1,16 @@
+from typing import Any
+
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    # Django does not implement the lifespan protocol, so it is disabled to
+    # avoid startup warnings. HTTP and WebSocket protocols are handled using
+    # pure Python implementations (h11 and wsproto) since optional compiled
+    # uvicorn dependencies are not installed.
+    CONFIG_KWARGS: dict[str, Any] = {
+        "loop": "asyncio",
+        "http": "h11",
+        "ws": "wsproto",
+        "lifespan": "off",
+    }
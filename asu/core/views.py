@@ -1,15 +1,16 @@
 from collections.abc import Callable
-from typing import Any, cast
+from typing import Any, ClassVar, cast
 
 from django import urls
 from django.conf import settings
 from django.contrib.staticfiles.storage import staticfiles_storage
-from django.core.management import call_command
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.urls import URLPattern, URLResolver
 from django.urls.converters import UUIDConverter
 from django.views import defaults
 
+from rest_framework import status
+from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import (
     APIException,
     NotAcceptable,
@@ -17,7 +18,7 @@ from rest_framework.exceptions import (
     PermissionDenied,
 )
 from rest_framework.negotiation import DefaultContentNegotiation
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, BasePermission
 from rest_framework.renderers import JSONRenderer, TemplateHTMLRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -27,10 +28,11 @@ from rest_framework.views import APIView
 
 from drf_spectacular.settings import spectacular_settings
 from drf_spectacular.utils import extend_schema
-from drf_spectacular.views import AUTHENTICATION_CLASSES
 from ipware import get_client_ip
 
 from asu.core.utils import messages
+from asu.core.utils.health import get_health
+from asu.core.utils.openapi import get_schema_name
 from asu.core.utils.rest import exception_handler
 
 
@@ -38,6 +40,12 @@ class APIRootView(BaseAPIRootView):
     namespaces = ("docs", "api", "oauth2_provider", "two_factor")
     permission_classes = [AllowAny]
 
+    route_cache: ClassVar[dict[tuple[Any, ...], dict[str, Any]]] = {}
+    """
+    Routes with relative URLs, computed once per process for each URLconf
+    and script prefix. Hosts are applied per request.
+    """
+
     def resolve_url(self, namespace: str, url: URLPattern) -> str | None:
         try:
             if url.pattern.converters:
@@ -47,14 +55,9 @@ class APIRootView(BaseAPIRootView):
                 }
             else:
                 kwargs = dict(url.pattern.regex.groupindex)
-            relpath = reverse(
-                namespace + ":" + str(url.name),
-                kwargs=kwargs,
-                request=self.request,
-            )
+            return reverse(namespace + ":" + str(url.name), kwargs=kwargs)
         except urls.NoReverseMatch:
             return None
-        return self.request.build_absolute_uri(relpath)
 
     def converter_to_sample(self, converter: object) -> str:
         if isinstance(converter, UUIDConverter):
@@ -70,7 +73,7 @@ class APIRootView(BaseAPIRootView):
         except ValueError:
             return len(self.namespaces)
 
-    def get_routes(self) -> dict[str, Any]:
+    def build_routes(self) -> dict[str, Any]:
         url_resolver = urls.get_resolver(urls.get_urlconf())
         resolvers = url_resolver.url_patterns
 
@@ -88,6 +91,24 @@ class APIRootView(BaseAPIRootView):
             routes[regex] = values
         return routes
 
+    def get_routes(self) -> dict[str, Any]:
+        key = (type(self), urls.get_urlconf(), urls.get_script_prefix())
+        routes = self.route_cache.get(key)
+        if routes is None:
+            routes = self.route_cache[key] = self.build_routes()
+        # Relative URLs start with a slash, so the host is prepended as is.
+        host = self.request.build_absolute_uri("/")[:-1]
+        return self.with_host(routes, host)
+
+    def with_host(self, node: Any, host: str) -> Any:
+        # Patterns are always listed, namespaces are always mapped.
+        if isinstance(node, list):
+            return [
+                {**value, "url": host + value["url"]} if "url" in value else value
+                for value in node
+            ]
+        return {key: self.with_host(value, host) for key, value in node.items()}
+
     def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         ip, _ = get_client_ip(request)
         ret: dict[str, Any] = {
@@ -95,9 +116,7 @@ class APIRootView(BaseAPIRootView):
             "ip": ip,
             "user-agent": request.headers.get("user-agent"),
             "docs": request.build_absolute_uri(reverse("docs:browse")),
-            "schema": request.build_absolute_uri(
-                staticfiles_storage.url("api-schema.yaml")
-            ),
+            "schema": request.build_absolute_uri(get_schema_url()),
         }
         if settings.DEBUG or request.query_params.get("routes") == "1":
             ret["routes"] = self.get_routes()
@@ -146,27 +165,51 @@ class APIRootView(BaseAPIRootView):
 
 class DocsView(APIView):
     renderer_classes = [TemplateHTMLRenderer]
-    permission_classes = spectacular_settings.SERVE_PERMISSIONS
-    authentication_classes = AUTHENTICATION_CLASSES
+
+    # Schema views of drf-spectacular import the schema generator, which is
+    # only needed here, so their settings are resolved on first request.
+    def get_authenticators(self) -> list[BaseAuthentication]:
+        from drf_spectacular.views import AUTHENTICATION_CLASSES  # noqa: PLC0415
+
+        return [auth() for auth in AUTHENTICATION_CLASSES]
+
+    def get_permissions(self) -> list[BasePermission]:
+        return [permission() for permission in spectacular_settings.SERVE_PERMISSIONS]
 
     @extend_schema(exclude=True)
     def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        if settings.DEBUG:
-            # Refresh OpenAPI schema during development.
-            call_command(
-                "spectacular",
-                file=settings.BASE_DIR / "asu/core/static/api-schema.yaml",
-                format="openapi",
-                api_version="v1",
-                lang="en",
-                validate=True,
-            )
         return Response(
-            data={"title": spectacular_settings.TITLE},
+            data={"title": spectacular_settings.TITLE, "schema": get_schema_url()},
             template_name="docs.html",
         )
 
 
+def get_schema_url() -> str:
+    # During development the schema is generated on each request, so that
+    # it follows the code being served; built schemas are static files.
+    if settings.DEBUG:
+        return reverse("docs:schema")
+    return staticfiles_storage.url(get_schema_name())
+
+
+class HealthView(APIView):
+    # Used by monitoring probes, so authentication and throttling are not
+    # involved.
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = []
+
+    @extend_schema(exclude=True)
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        checks = get_health()
+        if all(checks.values()):
+            return Response({"status": "ok", "checks": checks})
+        return Response(
+            {"status": "unavailable", "checks": checks},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
 class GenericServerError(APIException):
     status_code = 500
     default_detail = messages.GENERIC_ERROR
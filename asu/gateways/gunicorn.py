@@ -0,0 +1,23 @@
+"""
+Gunicorn configuration, used with `gunicorn -c python:asu.gateways.gunicorn`.
+Workers may be forked from a preloaded application (see '--preload'), in
+which case connections opened while loading it are closed around forks.
+"""
+
+from typing import Any
+
+
+def pre_fork(server: Any, worker: Any) -> None:
+    if server.cfg.preload_app:
+        # Django is only set up in the master process if the application
+        # was preloaded.
+        from asu.core.utils.connections import close_connections  # noqa: PLC0415
+
+        close_connections()
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    if server.cfg.preload_app:
+        from asu.core.utils.connections import close_connections  # noqa: PLC0415
+
+        close_connections()
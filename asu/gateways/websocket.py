@@ -0,0 +1,214 @@
+"""
+ASGI application that pushes relation events (see `asu.auth.events`) to
+connected clients over WebSocket. Clients authenticate using their OAuth
+access tokens, via the 'Authorization' header.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "asu.core.settings")
+django.setup(set_prefix=False)
+
+from django.conf import settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+import redis.asyncio  # noqa: E402
+
+from asu.auth.authentication import aget_access_token, get_bearer_token  # noqa: E402
+from asu.auth.events import get_channel  # noqa: E402
+from asu.auth.models import AccessToken  # noqa: E402
+
+type Scope = dict[str, Any]
+type Message = dict[str, Any]
+type Receive = Callable[[], Awaitable[Message]]
+type Send = Callable[[Message], Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_SCOPES = ["user.follow:read"]
+QUEUE_SIZE = 64
+"""
+Number of events that can be buffered for a single connection; slow
+clients exceeding this limit are disconnected.
+"""
+
+# https://www.rfc-editor.org/rfc/rfc6455#section-7.4.1
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class Subscription:
+    def __init__(self, channel: str) -> None:
+        self.channel = channel
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = asyncio.Event()
+
+    def put(self, data: str) -> None:
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.overflowed.set()
+
+
+class EventHub:
+    """
+    Fan out events published to Redis to the connections of this process,
+    using a single pub/sub connection. Each channel is subscribed to as
+    long as there is at least one connection interested in it.
+    """
+
+    def __init__(self, url: str) -> None:
+        client = redis.asyncio.Redis.from_url(url, decode_responses=True)
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.subscriptions: dict[str, set[Subscription]] = {}
+        self.reader: asyncio.Task[None] | None = None
+
+    async def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(channel)
+        subscribers = self.subscriptions.setdefault(channel, set())
+        subscribers.add(subscription)
+        if len(subscribers) == 1:
+            await self.pubsub.subscribe(channel)
+        if self.reader is None or self.reader.done():
+            self.reader = asyncio.create_task(self.read())
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        channel = subscription.channel
+        subscribers = self.subscriptions.get(channel, set())
+        subscribers.discard(subscription)
+        if not subscribers:
+            self.subscriptions.pop(channel, None)
+            await self.pubsub.unsubscribe(channel)
+
+    async def read(self) -> None:
+        # The reader stops once there are no subscriptions left; it will be
+        # started again by the next subscription.
+        while self.subscriptions:
+            try:
+                message = await self.pubsub.get_message(timeout=1.0)
+            except redis.RedisError:
+                # The connection (and subscriptions) will be re-established
+                # with the next read. Events published in between are lost.
+                logger.exception("Could not read events from Redis")
+                await asyncio.sleep(1)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+            for subscription in tuple(self.subscriptions.get(message["channel"], ())):
+                subscription.put(message["data"])
+
+
+@functools.cache
+def get_hub() -> EventHub:
+    return EventHub(settings.REDIS_URL)
+
+
+async def authenticate(scope: Scope) -> AccessToken | None:
+    headers = dict(scope["headers"])
+    token = get_bearer_token(headers.get(b"authorization", b"").decode("latin-1"))
+    if token is None:
+        return None
+
+    access_token = await aget_access_token(token)
+    if (
+        access_token is None
+        or not access_token.is_valid(REQUIRED_SCOPES)
+        or access_token.user is None
+        or not access_token.user.is_accessible
+    ):
+        return None
+    return access_token
+
+
+async def relay(
+    subscription: Subscription,
+    receive: Receive,
+    send: Send,
+    *,
+    timeout: float,
+) -> int | None:
+    """
+    Forward events to the client until it disconnects. Returns the close
+    code if the connection should be closed by the server instead.
+    """
+
+    async def forward() -> None:
+        while True:
+            data = await subscription.queue.get()
+            await send({"type": "websocket.send", "text": data})
+
+    async def disconnect() -> None:
+        # Messages sent by the client are not used, and ignored.
+        while (await receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = {
+        "forward": asyncio.create_task(forward()),
+        "disconnect": asyncio.create_task(disconnect()),
+        "overflow": asyncio.create_task(subscription.overflowed.wait()),
+    }
+    try:
+        done, _ = await asyncio.wait(
+            tasks.values(),
+            timeout=timeout,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    for task in done:
+        # Retrieve exceptions (e.g., sending to a closed connection), so
+        # that they are not reported as unhandled.
+        task.exception()
+
+    if tasks["disconnect"] in done or tasks["forward"] in done:
+        # Sending only fails if the client is gone.
+        return None
+    if tasks["overflow"] in done:
+        return CLOSE_TRY_AGAIN_LATER
+    # The access token has expired, clients need to connect again using
+    # a fresh token.
+    return CLOSE_POLICY_VIOLATION
+
+
+async def application(scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] == "http":
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    if scope["type"] != "websocket":
+        return
+
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+
+    token = await authenticate(scope)
+    if token is None:
+        # Closing before accepting the connection rejects the handshake.
+        await send({"type": "websocket.close", "code": CLOSE_POLICY_VIOLATION})
+        return
+    await send({"type": "websocket.accept"})
+
+    hub = get_hub()
+    subscription = await hub.subscribe(get_channel(token.user_id))
+    try:
+        code = await relay(
+            subscription,
+            receive,
+            send,
+            timeout=(token.expires - timezone.now()).total_seconds(),
+        )
+    finally:
+        await hub.unsubscribe(subscription)
+
+    if code is not None:
+        await send({"type": "websocket.close", "code": code})
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+from django.utils.translation import pgettext_lazy
+
+
+class MessagingConfig(AppConfig):
+    name = "asu.messaging"
+    verbose_name = pgettext_lazy("app name", "Messaging")
@@ -0,0 +1,75 @@
+import random
+import statistics
+import time
+from typing import Any
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from asu.auth.models import User
+from asu.messaging.models import ConversationMember, Message
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure message send throughput and inbox read latency using"
+        " synthetic users. Changes are rolled back once the benchmark is"
+        " complete, so it is safe to run against a populated database."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--messages", type=int, default=2000)
+        parser.add_argument("--reads", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            self.run(
+                users=options["users"],
+                messages=options["messages"],
+                reads=options["reads"],
+                rng=random.Random(options["seed"]),
+            )
+            transaction.set_rollback(True)
+
+    def run(self, *, users: int, messages: int, reads: int, rng: random.Random) -> None:
+        password = make_password(None)
+        population = User.objects.bulk_create(
+            User(
+                username="bench%s" % index,
+                display_name="Benchmark %s" % index,
+                email="bench%s@example.com" % index,
+                password=password,
+            )
+            for index in range(users)
+        )
+
+        start = time.perf_counter()
+        for _ in range(messages):
+            sender, recipient = rng.sample(population, 2)
+            Message.objects.send(sender=sender, recipient_id=recipient.pk, body="hi")
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            "send: %d messages in %.2fs (%.1f messages/s)"
+            % (messages, elapsed, messages / elapsed)
+        )
+
+        latencies = []
+        for _ in range(reads):
+            user = rng.choice(population)
+            start = time.perf_counter()
+            list(
+                ConversationMember.objects.get_inbox(user)
+                .select_related("peer", "last_message")
+                .order_by("-last_message_id")[:10]
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        p50, p95, p99 = (
+            statistics.quantiles(latencies, n=100)[q - 1] for q in (50, 95, 99)
+        )
+        self.stdout.write(
+            "inbox: %d reads, p50=%.2fms p95=%.2fms p99=%.2fms" % (reads, p50, p95, p99)
+        )
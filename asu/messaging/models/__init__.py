@@ -0,0 +1,8 @@
+from asu.messaging.models.conversation import Conversation, ConversationMember
+from asu.messaging.models.message import Message
+
+__all__ = [
+    "Conversation",
+    "ConversationMember",
+    "Message",
+]
@@ -0,0 +1,137 @@
+from uuid import UUID
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, QuerySet
+from django.db.models.functions import Now
+from django.utils.translation import gettext_lazy as _
+
+from asu.auth.models import User
+from asu.core.models.base import Base, BaseManager
+
+
+class ConversationManager(BaseManager["Conversation"]):
+    def get_or_create_between(self, user: User, peer_id: UUID) -> UUID:
+        """
+        Get the id of the direct conversation between given users, creating
+        it (along with its members) if it does not exist.
+        """
+        members = ConversationMember.objects.filter(user=user, peer_id=peer_id)
+        pk = members.values_list("conversation_id", flat=True).first()
+        if pk is not None:
+            return pk
+        try:
+            with transaction.atomic():
+                conversation = self.create()
+                ConversationMember.objects.bulk_create(
+                    [
+                        ConversationMember(
+                            conversation=conversation,
+                            user=user,
+                            peer_id=peer_id,
+                        ),
+                        ConversationMember(
+                            conversation=conversation,
+                            user_id=peer_id,
+                            peer=user,
+                        ),
+                    ]
+                )
+        except IntegrityError:
+            # The conversation was created concurrently.
+            return members.values_list("conversation_id", flat=True).get()
+        return conversation.pk
+
+
+class Conversation(Base):
+    """
+    A direct conversation between two users. The state specific to each
+    user, such as the number of unread messages, is kept in their
+    `ConversationMember` entry, which also makes up their inbox.
+    """
+
+    objects = ConversationManager()
+
+    class Meta:
+        verbose_name = _("conversation")
+        verbose_name_plural = _("conversations")
+
+    def __str__(self) -> str:
+        return str(self.pk)
+
+
+class ConversationMemberManager(BaseManager["ConversationMember"]):
+    def get_inbox(self, user: User) -> QuerySet[ConversationMember]:
+        return self.filter(user=user, last_message__isnull=False)
+
+
+class ConversationMember(Base):
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.DB_CASCADE,
+        related_name="members",
+        verbose_name=_("conversation"),
+    )
+    # Indexes starting with `user` cover lookups on this field.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DB_CASCADE,
+        related_name="conversation_memberships",
+        db_index=False,
+        verbose_name=_("user"),
+    )
+    peer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DB_CASCADE,
+        related_name="+",
+        verbose_name=_("peer"),
+    )
+
+    # Denormalized from messages, so that the inbox can be displayed
+    # without scanning them. Since message ids are time-ordered, the
+    # inbox is sorted by `last_message_id`.
+    last_message = models.ForeignKey(
+        "messaging.Message",
+        on_delete=models.DB_SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+        verbose_name=_("last message"),
+    )
+    last_read_message = models.ForeignKey(
+        "messaging.Message",
+        on_delete=models.DB_SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+        verbose_name=_("last read message"),
+    )
+    unread_count = models.PositiveIntegerField(_("unread count"), default=0)
+
+    objects = ConversationMemberManager()
+
+    class Meta:
+        verbose_name = _("conversation member")
+        verbose_name_plural = _("conversation members")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "peer"],
+                name="unique_conversation_member",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-last_message"],
+                name="conversation_inbox",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return "user=%s, peer=%s" % (self.user_id, self.peer_id)
+
+    def mark_read(self) -> None:
+        ConversationMember.objects.filter(pk=self.pk).update(
+            unread_count=0,
+            last_read_message=F("last_message"),
+            updated_at=Now(),
+        )
@@ -0,0 +1,100 @@
+from collections.abc import Collection
+from uuid import UUID
+
+from django.conf import settings
+from django.core.validators import MaxLengthValidator
+from django.db import models, transaction
+from django.db.models import Case, Exists, F, OuterRef, Q, Value, When
+from django.db.models.functions import Now
+from django.utils.translation import gettext_lazy as _
+
+from asu.auth.models import User, UserFollow
+from asu.core.models.base import Base, BaseManager
+from asu.messaging.models.conversation import Conversation, ConversationMember
+
+
+class MessageManager(BaseManager["Message"]):
+    def get_allowed_recipients(
+        self, sender: User, recipients: Collection[UUID]
+    ) -> set[UUID]:
+        """
+        Get the ids of given users that `sender` is allowed to send messages
+        to, using a single query. Users with blocking relations are
+        excluded, so are the users who only accept messages from the people
+        they follow, unless they follow `sender`.
+        """
+        follows_sender = UserFollow.objects.filter(
+            from_user=OuterRef("pk"),
+            to_user=sender,
+        )
+        return set(
+            User.objects.active()
+            .filter(pk__in=recipients)
+            .exclude(pk=sender.pk)
+            .exclude(Exists(sender.get_block_rels(OuterRef("pk"))))
+            .filter(Q(allows_all_messages=True) | Exists(follows_sender))
+            .values_list("pk", flat=True)
+        )
+
+    @transaction.atomic
+    def send(self, *, sender: User, recipient_id: UUID, body: str) -> Message:
+        """
+        Send a message, creating the conversation if necessary. This does not
+        check whether the recipient accepts messages from the sender, see
+        `get_allowed_recipients`.
+        """
+        conversation_id = Conversation.objects.get_or_create_between(
+            sender, recipient_id
+        )
+        message = self.create(conversation_id=conversation_id, sender=sender, body=body)
+        # Update the inbox entries of both users with a single query. Sending
+        # a message implies that the sender has read the conversation.
+        ConversationMember.objects.filter(conversation_id=conversation_id).update(
+            last_message=message,
+            last_read_message=Case(
+                When(user=sender, then=Value(message.pk)),
+                default=F("last_read_message"),
+            ),
+            unread_count=Case(
+                When(user=sender, then=Value(0)),
+                default=F("unread_count") + 1,
+            ),
+            updated_at=Now(),
+        )
+        return message
+
+
+class Message(Base):
+    # Covered by the index on `conversation` and `id`.
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.DB_CASCADE,
+        related_name="messages",
+        db_index=False,
+        verbose_name=_("conversation"),
+    )
+    sender = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DB_CASCADE,
+        related_name="+",
+        verbose_name=_("sender"),
+    )
+    body = models.TextField(_("body"), validators=[MaxLengthValidator(1000)])
+
+    # Messages are not edited.
+    updated_at = None
+
+    objects = MessageManager()
+
+    class Meta:
+        verbose_name = _("message")
+        verbose_name_plural = _("messages")
+        indexes = [
+            models.Index(
+                fields=["conversation", "-id"],
+                name="conversation_messages",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return str(self.pk)
@@ -0,0 +1,63 @@
+from drf_spectacular.utils import OpenApiExample, extend_schema
+
+from asu.core.utils.openapi import Tag, examples, get_error_repr
+from asu.core.utils.rest import APIError
+from asu.messaging.serializers import (
+    ConversationSerializer,
+    MessageSendSerializer,
+    MessageSerializer,
+)
+
+__all__ = ["conversation"]
+
+
+list_conversations = extend_schema(
+    summary="List conversations",
+    description="List conversations of the authenticated user, most"
+    " recently active first.",
+    tags=[Tag.MESSAGING],
+    responses={200: ConversationSerializer(many=True)},
+)
+
+messages = extend_schema(
+    summary="List messages of a conversation",
+    description="List messages of a conversation, most recent first.",
+    tags=[Tag.MESSAGING],
+    responses={200: MessageSerializer(many=True), 404: APIError},
+    examples=[examples.not_found],
+)
+
+read = extend_schema(
+    summary="Mark a conversation as read",
+    tags=[Tag.MESSAGING],
+    responses={204: None, 404: APIError},
+    examples=[examples.not_found],
+)
+
+send = extend_schema(
+    summary="Send a message",
+    description="Send a message to one or more users. A conversation is"
+    " created with each recipient, if there is none. Request fails with 400"
+    " if any of the recipients do not accept messages from the authenticated"
+    " user, in which case no messages are sent.",
+    tags=[Tag.MESSAGING],
+    responses={201: MessageSendSerializer, 400: APIError},
+    examples=[
+        OpenApiExample(
+            "recipients not allowed",
+            value=get_error_repr(
+                {"recipients": ["Some of these users do not accept your messages."]}
+            ),
+            response_only=True,
+            status_codes=["400"],
+        )
+    ],
+)
+
+
+conversation = {
+    "list": list_conversations,
+    "messages": messages,
+    "read": read,
+    "send": send,
+}
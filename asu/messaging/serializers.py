@@ -0,0 +1,97 @@
+from typing import Any
+
+from django.db import transaction
+from django.utils.translation import gettext
+
+from rest_framework import serializers
+
+from asu.auth.serializers.user import UserPublicReadSerializer
+from asu.messaging.models import ConversationMember, Message
+
+
+class MessageSerializer(serializers.ModelSerializer[Message]):
+    sender = serializers.UUIDField(source="sender_id", read_only=True)
+
+    class Meta:
+        model = Message
+        fields = ("id", "sender", "body", "created_at")
+        read_only_fields = fields
+
+
+class MessageSendSerializer(serializers.Serializer[dict[str, Any]]):
+    sender = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    recipients = serializers.ListField(
+        child=serializers.UUIDField(),
+        min_length=1,
+        max_length=20,
+        write_only=True,
+        help_text="Ids of the users to send the message to.",
+    )
+    body = serializers.CharField(max_length=1000, write_only=True)
+    results = MessageSerializer(many=True, read_only=True)
+
+    def validate_recipients(self, value: list[Any]) -> list[Any]:
+        return list(dict.fromkeys(value))
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        # Permissions of all recipients are checked using a single query.
+        recipients = attrs["recipients"]
+        allowed = Message.objects.get_allowed_recipients(attrs["sender"], recipients)
+        if len(allowed) != len(recipients):
+            raise serializers.ValidationError(
+                {
+                    "recipients": gettext(
+                        "Some of these users do not accept your messages."
+                    )
+                }
+            )
+        return attrs
+
+    @transaction.atomic(durable=True)
+    def create(self, validated_data: dict[str, Any]) -> dict[str, Any]:
+        # Conversations are updated in a consistent order, so that concurrent
+        # sends with overlapping recipients do not deadlock.
+        sender, body = validated_data["sender"], validated_data["body"]
+        messages = {
+            recipient_id: Message.objects.send(
+                sender=sender,
+                recipient_id=recipient_id,
+                body=body,
+            )
+            for recipient_id in sorted(validated_data["recipients"])
+        }
+        return {
+            "results": [messages[pk] for pk in validated_data["recipients"]],
+        }
+
+
+class ConversationSerializer(serializers.ModelSerializer[ConversationMember]):
+    id = serializers.UUIDField(source="conversation_id", read_only=True)
+    peer = UserPublicReadSerializer(
+        read_only=True,
+        fields=(
+            "id",
+            "display_name",
+            "username",
+            "profile_picture",
+        ),
+        ref_name="ConversationPeer",
+    )
+    last_message = MessageSerializer(read_only=True)
+    peer_last_read_message = serializers.UUIDField(
+        read_only=True,
+        allow_null=True,
+        help_text="Id of the last message read by the peer. Only available"
+        " if both users allow message receipts.",
+    )
+
+    class Meta:
+        model = ConversationMember
+        fields = (
+            "id",
+            "peer",
+            "last_message",
+            "unread_count",
+            "peer_last_read_message",
+        )
+        read_only_fields = fields
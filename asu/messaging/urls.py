@@ -0,0 +1,13 @@
+from django.urls import include, path
+
+from rest_framework.routers import SimpleRouter
+
+from asu.messaging.views import ConversationViewSet
+
+app_name = "messaging"
+
+router = SimpleRouter(use_regex_path=False)
+router.register("conversations", ConversationViewSet, basename="conversation")
+urlpatterns = [
+    path("messaging/", include(router.urls)),
+]
@@ -0,0 +1,94 @@
+from uuid import UUID
+
+from django.db.models import OuterRef, QuerySet, Subquery, Value
+from django.db.models.fields import UUIDField
+
+from rest_framework import mixins, status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from asu.auth.permissions import RequireScope, RequireUser
+from asu.core.utils.rest import EmptySerializer, get_paginator
+from asu.core.utils.views import ExtendedViewSet, action
+from asu.messaging import schemas
+from asu.messaging.models import ConversationMember, Message
+from asu.messaging.serializers import (
+    ConversationSerializer,
+    MessageSendSerializer,
+    MessageSerializer,
+)
+
+
+class ConversationViewSet(mixins.ListModelMixin, ExtendedViewSet[ConversationMember]):
+    # Conversations are looked up by their id, through the membership of
+    # the authenticated user.
+    lookup_field = "conversation"
+    lookup_url_kwarg = "pk"
+
+    serializer_classes = {"list": ConversationSerializer}
+    # Message ids are time-ordered, so the most recently active
+    # conversations come first.
+    pagination_class = get_paginator("cursor", ordering="-last_message_id")
+
+    permission_classes = {"list": [RequireUser, RequireScope]}
+    required_scopes = {"list": ["user.messaging"]}
+
+    schemas = schemas.conversation
+
+    def get_queryset(self) -> QuerySet[ConversationMember]:
+        user = self.request.user
+        if self.action != "list":
+            return ConversationMember.objects.filter(user=user)
+
+        queryset = ConversationMember.objects.get_inbox(user).select_related(
+            "peer", "last_message"
+        )
+        if not user.allows_receipts:
+            return queryset.annotate(
+                peer_last_read_message=Value(None, output_field=UUIDField())
+            )
+        # Peers that do not allow receipts are excluded within the
+        # subquery, using the joined user row.
+        return queryset.annotate(
+            peer_last_read_message=Subquery(
+                ConversationMember.objects.filter(
+                    conversation=OuterRef("conversation"),
+                    user=OuterRef("peer"),
+                    user__allows_receipts=True,
+                ).values("last_read_message")
+            )
+        )
+
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[RequireUser, RequireScope],
+        serializer_class=MessageSerializer,
+        pagination_class=get_paginator("cursor", ordering="-id", page_size=50),
+        required_scopes=["user.messaging"],
+    )
+    def messages(self, request: Request, pk: UUID) -> Response:
+        member = self.get_object()
+        queryset = Message.objects.filter(conversation_id=member.conversation_id)
+        return self.perform_list_action(queryset)  # type: ignore[arg-type]
+
+    @action(
+        detail=True,
+        methods=["post"],
+        permission_classes=[RequireUser, RequireScope],
+        serializer_class=EmptySerializer,
+        required_scopes=["user.messaging"],
+    )
+    def read(self, request: Request, pk: UUID) -> Response:
+        self.get_object().mark_read()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[RequireUser, RequireScope],
+        serializer_class=MessageSendSerializer,
+        required_scopes=["user.messaging"],
+    )
+    def send(self, request: Request) -> Response:
+        return self.perform_action(status_code=status.HTTP_201_CREATED)
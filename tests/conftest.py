@@ -1,5 +1,6 @@
 from datetime import timedelta
 from functools import cached_property
+from unittest.mock import MagicMock
 
 from django.utils import timezone
 
@@ -7,6 +8,7 @@ from rest_framework.test import APIClient
 
 import pytest
 from oauth2_provider.settings import oauth2_settings
+from pytest_mock import MockerFixture
 
 from asu.auth.models import AccessToken, Application, User
 from asu.core.models import ProjectVariable
@@ -75,6 +77,13 @@ class OAuthClient(APIClient):
         self.credentials(Authorization=f"Bearer {token}")
 
 
+@pytest.fixture(autouse=True)
+def autocomplete_index(mocker: MockerFixture) -> MagicMock:
+    # Redis is not available in tests, so autocomplete entries that are
+    # updated on commit are only recorded.
+    return mocker.patch("asu.auth.search.index_users")
+
+
 @pytest.fixture
 def client() -> OAuthClient:
     return OAuthClient()
@@ -0,0 +1,142 @@
+import uuid
+
+from django.urls import reverse
+
+import pytest
+from pytest_django import DjangoAssertNumQueries
+
+from asu.auth.models import User, UserBlock, UserFollow
+
+from tests.conftest import OAuthClient
+from tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+def test_user_batch_by_ids(
+    user_client: OAuthClient,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    helen, bob, james = (
+        UserFactory.create(username="helen"),
+        UserFactory.create(username="bob"),
+        UserFactory.create(username="james"),
+    )
+    UserFollow.objects.create(from_user=helen, to_user=bob)
+    UserFollow.objects.create(from_user=james, to_user=bob)
+    UserFollow.objects.create(from_user=bob, to_user=helen)
+
+    ids = [james.pk, helen.pk, bob.pk, uuid.uuid4()]
+    with django_assert_num_queries(
+        1  # fetch user
+        + 1  # fetch users in batch
+        + 2  # fetch follow counts
+    ):
+        response = user_client.get(
+            reverse(
+                "api:v1:auth:user-batch",
+                query={"ids": ",".join(str(pk) for pk in ids)},
+            )
+        )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["username"] for item in results] == ["james", "helen", "bob"]
+    assert [(item["following_count"], item["follower_count"]) for item in results] == [
+        (1, 0),
+        (1, 1),
+        (1, 2),
+    ]
+
+
+@pytest.mark.django_db
+def test_user_batch_by_usernames(user_client: OAuthClient) -> None:
+    UserFactory.create(username="helen")
+    UserFactory.create(username="Bob")
+    UserFactory.create(username="inactive", is_active=False)
+    UserFactory.create(username="frozen", is_frozen=True)
+
+    response = user_client.get(
+        reverse(
+            "api:v1:auth:user-batch",
+            query={"usernames": "BOB,inactive,frozen,Helen,bob,unknown"},
+        )
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["username"] for item in results] == ["Bob", "helen"]
+
+
+@pytest.mark.django_db
+def test_user_batch_excludes_block_rels(user: User, user_client: OAuthClient) -> None:
+    helen, bob, james = (
+        UserFactory.create(username="helen"),
+        UserFactory.create(username="bob"),
+        UserFactory.create(username="james"),
+    )
+    UserBlock.objects.create(from_user=user, to_user=helen)
+    UserBlock.objects.create(from_user=bob, to_user=user)
+
+    response = user_client.get(
+        reverse(
+            "api:v1:auth:user-batch",
+            query={"usernames": "helen,bob,james"},
+        )
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["id"] for item in results] == [str(james.pk)]
+
+
+@pytest.mark.django_db
+def test_user_batch_client_credentials(app_client: OAuthClient, user: User) -> None:
+    response = app_client.get(
+        reverse(
+            "api:v1:auth:user-batch",
+            query={"usernames": user.username},
+        )
+    )
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query",
+    (
+        {},
+        {"usernames": ""},
+        {"ids": "", "usernames": ""},
+        {"ids": "019b04e3-90e4-7751-a386-7a4550a69409", "usernames": "helen"},
+    ),
+)
+def test_user_batch_requires_either_ids_or_usernames(
+    app_client: OAuthClient,
+    query: dict[str, str],
+) -> None:
+    response = app_client.get(reverse("api:v1:auth:user-batch", query=query))
+    assert response.status_code == 400
+    assert response.json()["errors"] == {
+        "non_field_errors": [
+            {
+                "message": "Specify either 'ids' or 'usernames'.",
+                "code": "invalid",
+            }
+        ]
+    }
+
+
+@pytest.mark.django_db
+def test_user_batch_limit(app_client: OAuthClient) -> None:
+    usernames = ",".join("user%s" % index for index in range(101))
+    response = app_client.get(
+        reverse("api:v1:auth:user-batch", query={"usernames": usernames})
+    )
+    assert response.status_code == 400
+    assert "usernames" in response.json()["errors"]
+
+
+@pytest.mark.django_db
+def test_user_batch_requires_authentication(client: OAuthClient) -> None:
+    response = client.get(
+        reverse("api:v1:auth:user-batch", query={"usernames": "helen"})
+    )
+    assert response.status_code == 401
@@ -1,6 +1,8 @@
+from datetime import timedelta
 from typing import Any
 
 from django.urls import reverse
+from django.utils import timezone
 
 import pytest
 from pytest_mock import MockerFixture
@@ -390,6 +392,37 @@ def test_user_block_only_rejects_pending_follow_requests(
     assert request_previously_accepted.status == UserFollowRequest.Status.APPROVED
 
 
+@pytest.mark.django_db
+def test_user_block_rejected_follow_request_retained(
+    user: User,
+    user_client: OAuthClient,
+) -> None:
+    profile = UserFactory.create()
+    request_received = UserFollowRequest.objects.create(
+        from_user=profile,
+        to_user=user,
+        status=UserFollowRequest.Status.PENDING,
+    )
+    UserFollowRequest.objects.filter(pk=request_received.pk).update(
+        updated_at=timezone.now() - timedelta(days=100)
+    )
+    response = user_client.post(
+        reverse(
+            "api:v1:auth:user-block",
+            kwargs={"pk": profile.pk},
+        )
+    )
+    assert response.status_code == 204
+
+    # Retention is counted from the rejection, not from the request.
+    deleted = UserFollowRequest.objects.delete_resolved(
+        before=timezone.now() - timedelta(days=1)
+    )
+    assert deleted == 0
+    request_received.refresh_from_db()
+    assert request_received.status == UserFollowRequest.Status.REJECTED
+
+
 @pytest.mark.django_db
 def test_user_blocked_list(
     user: User,
@@ -423,6 +456,7 @@ def test_user_blocked_list(
                 "id": mocker.ANY,
                 "is_private": True,
                 "profile_picture": None,
+                "profile_picture_sources": [],
                 "username": mocker.ANY,
             },
             {
@@ -431,6 +465,7 @@ def test_user_blocked_list(
                 "id": mocker.ANY,
                 "is_private": False,
                 "profile_picture": None,
+                "profile_picture_sources": [],
                 "username": mocker.ANY,
             },
         ],
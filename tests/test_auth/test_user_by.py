@@ -1,12 +1,15 @@
 import datetime
 import zoneinfo
 
+from django.core.cache import cache
 from django.urls import reverse
 
 import pytest
+from pytest_django import DjangoAssertNumQueries
 from pytest_mock import MockerFixture
 
 from asu.auth.models import User
+from asu.auth.models.user import get_username_cache_key
 
 from tests.conftest import OAuthClient
 from tests.factories import UserFactory
@@ -51,6 +54,7 @@ def test_user_by(
         "display_name": "Helen",
         "username": "helen",
         "profile_picture": None,
+        "profile_picture_sources": [],
         "is_private": False,
         "description": "hello world!",
         "website": "https://example.com",
@@ -104,3 +108,125 @@ def test_user_by_query_param_required(app_client: OAuthClient) -> None:
             }
         ]
     }
+
+
+@pytest.mark.django_db
+def test_user_resolve_username_cache(
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    helen = UserFactory.create(username="Helen")
+    with django_assert_num_queries(1):
+        assert User.objects.resolve_username("helen") == helen.pk
+        assert User.objects.resolve_username("HELEN") == helen.pk
+    assert cache.get(get_username_cache_key("hElEn")) == (helen.pk, True)
+
+
+@pytest.mark.django_db
+def test_user_resolve_username_cache_miss(
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    with django_assert_num_queries(1):
+        assert User.objects.resolve_username("helen") is None
+        assert User.objects.resolve_username("helen") is None
+
+    # Creating the user invalidates the negative entry.
+    helen = UserFactory.create(username="helen")
+    assert User.objects.resolve_username("helen") == helen.pk
+
+
+@pytest.mark.django_db
+def test_user_resolve_username_cache_inaccessible(mocker: MockerFixture) -> None:
+    helen = UserFactory.create(username="helen", is_frozen=True)
+    cache_set = mocker.spy(cache, "set")
+    assert User.objects.resolve_username("helen") is None
+    cache_set.assert_called_once_with(
+        get_username_cache_key("helen"), (helen.pk, False), timeout=30
+    )
+
+    helen.reactivate()
+    assert User.objects.resolve_username("helen") == helen.pk
+
+
+@pytest.mark.django_db
+def test_user_by_uses_username_cache(
+    app_client: OAuthClient,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    UserFactory.create(username="helen")
+    url = reverse("api:v1:auth:user-lookup", query={"username": "helen"})
+    assert app_client.get(url).status_code == 200
+
+    with django_assert_num_queries(
+        1  # fetch token
+        + 1  # fetch user by id
+        + 2  # fetch follow counts
+    ):
+        response = app_client.get(url)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_user_by_not_found_uses_username_cache(
+    app_client: OAuthClient,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    url = reverse("api:v1:auth:user-lookup", query={"username": "helen"})
+    assert app_client.get(url).status_code == 404
+
+    with django_assert_num_queries(1):  # fetch token
+        response = app_client.get(url)
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_user_by_username_cache_invalidates_on_username_change(
+    user: User,
+    user_client: OAuthClient,
+) -> None:
+    old = user.username
+    assert User.objects.resolve_username(old) == user.pk
+    assert User.objects.resolve_username("helen") is None
+
+    response = user_client.patch(
+        reverse("api:v1:auth:user-me"),
+        data={"username": "helen"},
+    )
+    assert response.status_code == 200
+    assert cache.get(get_username_cache_key(old)) is None
+    assert cache.get(get_username_cache_key("helen")) is None
+
+    response = user_client.get(
+        reverse("api:v1:auth:user-lookup", query={"username": old})
+    )
+    assert response.status_code == 404
+    response = user_client.get(
+        reverse("api:v1:auth:user-lookup", query={"username": "helen"})
+    )
+    assert response.status_code == 200
+    assert response.json()["id"] == str(user.pk)
+
+
+@pytest.mark.django_db
+def test_user_by_username_cache_invalidates_on_deactivation(
+    app_client: OAuthClient,
+) -> None:
+    helen = UserFactory.create(username="helen")
+    url = reverse("api:v1:auth:user-lookup", query={"username": "helen"})
+    assert app_client.get(url).status_code == 200
+
+    helen.deactivate()
+    assert app_client.get(url).status_code == 404
+
+    helen.reactivate()
+    assert app_client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_user_by_username_cache_stale_entry(app_client: OAuthClient) -> None:
+    bob = UserFactory.create(username="bob")
+    cache.set(get_username_cache_key("helen"), (bob.pk, True))
+
+    response = app_client.get(
+        reverse("api:v1:auth:user-lookup", query={"username": "helen"})
+    )
+    assert response.status_code == 404
@@ -18,6 +18,7 @@ from asu.auth.models import (
     Session,
     User,
     UserDeactivation,
+    UserFollowRequest,
 )
 from asu.auth.tasks import delete_users_permanently
 
@@ -52,7 +53,7 @@ def test_user_deactivate(
         )
     assert response.status_code == 204
     assert len(mail.outbox) == 0
-    assert len(callbacks) == 0
+    assert len(callbacks) == 2  # username cache, autocomplete update
 
     user.refresh_from_db()
     refresh_token.refresh_from_db()
@@ -94,7 +95,7 @@ def test_user_deactivate_for_deletion(
         )
     assert response.status_code == 204
     assert len(mail.outbox) == 1
-    assert len(callbacks) == 1
+    assert len(callbacks) == 3  # username cache, autocomplete update, notice
     assert "account has been deactivated" in mail.outbox[0].body
 
     user.refresh_from_db()
@@ -224,6 +225,29 @@ def test_task_delete_users_permanently(mocker: MockerFixture) -> None:
         gone.refresh_from_db()
 
 
+@pytest.mark.django_db
+def test_task_delete_users_permanently_pending_counts(
+    user: User,
+    mocker: MockerFixture,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
+    sender = UserFactory.create()
+    UserFollowRequest.objects.create(from_user=sender, to_user=user)
+    assert UserFollowRequest.objects.get_pending_count(user.pk) == 1
+
+    now = timezone.now()
+    UserDeactivation.objects.create(user=sender, for_deletion=True, created_at=now)
+    mocker.patch(
+        "django.utils.timezone.now",
+        return_value=now + datetime.timedelta(days=30),
+    )
+    # Pending requests of deleted users are cascaded by the database, the
+    # cached counters of their recipients are recounted.
+    with django_capture_on_commit_callbacks(execute=True):
+        delete_users_permanently()
+    assert UserFollowRequest.objects.get_pending_count(user.pk) == 0
+
+
 @pytest.mark.django_db
 def test_user_deactivation_unique_constraint(user: User) -> None:
     UserDeactivation.objects.create(user=user, revoked_at=timezone.now())
@@ -47,6 +47,7 @@ def test_user_detail(
         "display_name": "Helen",
         "username": "helen",
         "profile_picture": None,
+        "profile_picture_sources": [],
         "is_private": False,
         "description": "hello world!",
         "website": "https://example.com",
@@ -1,12 +1,29 @@
+import io
+import json
+from datetime import timedelta
 from typing import Any
 
+from django.core.management import call_command
+from django.test import AsyncClient
 from django.urls import reverse
+from django.utils import timezone
 
 import pytest
-from pytest_django import DjangoAssertNumQueries
+from asgiref.sync import async_to_sync
+from pytest_django import DjangoAssertNumQueries, DjangoCaptureOnCommitCallbacks
 from pytest_mock import MockerFixture
 
 from asu.auth.models import User, UserBlock, UserFollow, UserFollowRequest
+from asu.auth.tasks import (
+    delete_resolved_follow_requests,
+    reconcile_follow_request_counts,
+)
+from asu.auth.views import (
+    UserBlockedView,
+    UserFollowersView,
+    UserFollowingView,
+    UserRelationsView,
+)
 
 from tests.conftest import OAuthClient
 from tests.factories import UserFactory
@@ -606,6 +623,7 @@ def test_user_followers(
                 "id": mocker.ANY,
                 "is_private": True,
                 "profile_picture": None,
+                "profile_picture_sources": [],
                 "username": mocker.ANY,
             },
             {
@@ -614,6 +632,7 @@ def test_user_followers(
                 "id": mocker.ANY,
                 "is_private": False,
                 "profile_picture": None,
+                "profile_picture_sources": [],
                 "username": mocker.ANY,
             },
         ],
@@ -658,6 +677,7 @@ def test_user_following(
                 "id": mocker.ANY,
                 "is_private": True,
                 "profile_picture": None,
+                "profile_picture_sources": [],
                 "username": mocker.ANY,
             },
             {
@@ -666,6 +686,7 @@ def test_user_following(
                 "id": mocker.ANY,
                 "is_private": False,
                 "profile_picture": None,
+                "profile_picture_sources": [],
                 "username": mocker.ANY,
             },
         ],
@@ -781,3 +802,389 @@ def test_user_follower_endpoints_user_not_found(
         )
     )
     assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_user_followers_sparse_fields(
+    user: User,
+    user_client: OAuthClient,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    profile = UserFactory.create(username="helen", description="hello world!")
+    UserFollow.objects.create(from_user=profile, to_user=user)
+
+    url = reverse(
+        "api:v1:auth:user-followers",
+        kwargs={"pk": user.pk},
+        query={"fields": "username,id"},
+    )
+    with django_assert_num_queries(
+        1  # fetch user
+        + 1  # fetch followers
+    ) as ctx:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"id": str(profile.pk), "username": "helen"}]
+    assert '"description"' not in ctx.captured_queries[-1]["sql"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "endpoint",
+    (
+        "api:v1:auth:user-following",
+        "api:v1:auth:user-followers",
+    ),
+)
+def test_user_follower_endpoints_sparse_fields_invalid(
+    user: User,
+    user_client: OAuthClient,
+    endpoint: str,
+) -> None:
+    response = user_client.get(
+        reverse(
+            endpoint,
+            kwargs={"pk": user.pk},
+            query={"fields": "username,email"},
+        )
+    )
+    assert response.status_code == 400
+    assert response.json()["errors"] == {
+        "fields": {
+            "1": [
+                {
+                    "message": '"email" is not a valid choice.',
+                    "code": "invalid_choice",
+                }
+            ]
+        }
+    }
+
+
+@pytest.mark.django_db
+def test_user_follow_request_count(
+    user: User,
+    user_client: OAuthClient,
+    django_assert_num_queries: DjangoAssertNumQueries,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch("asu.auth.events.send")
+    url = reverse("api:v1:auth:follow-request-count")
+    senders = UserFactory.create_batch(3)
+    UserFollowRequest.objects.create(from_user=senders[0], to_user=user)
+    with django_assert_num_queries(2):  # fetch user, count
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert response.json() == {"count": 1}
+
+    # Counter is maintained as follow requests are sent and answered.
+    with django_capture_on_commit_callbacks(execute=True):
+        senders[1].send_follow_request(to_user=user)
+        senders[2].send_follow_request(to_user=user)
+        user.get_pending_follow_requests().get(from_user=senders[0]).reject()
+    with django_assert_num_queries(1):  # fetch user
+        response = user_client.get(url)
+    assert response.json() == {"count": 2}
+
+
+@pytest.mark.django_db
+def test_user_follow_request_count_block(
+    user: User,
+    user_client: OAuthClient,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch("asu.auth.events.send")
+    url = reverse("api:v1:auth:follow-request-count")
+    sender = UserFactory.create()
+    UserFollowRequest.objects.create(from_user=sender, to_user=user)
+    assert user_client.get(url).json() == {"count": 1}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post(reverse("api:v1:auth:user-block", kwargs={"pk": sender.pk}))
+    assert user_client.get(url).json() == {"count": 0}
+
+
+@pytest.mark.django_db
+def test_user_follow_request_count_reconcile(user: User) -> None:
+    sender = UserFactory.create()
+    assert UserFollowRequest.objects.get_pending_count(user.pk) == 0
+
+    # Counter drifts, since the request is created without maintaining it.
+    UserFollowRequest.objects.create(from_user=sender, to_user=user)
+    assert UserFollowRequest.objects.get_pending_count(user.pk) == 0
+
+    assert reconcile_follow_request_counts() == 1
+    assert UserFollowRequest.objects.get_pending_count(user.pk) == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "endpoint, status",
+    (
+        ("api:v1:auth:follow-request-bulk-accept", UserFollowRequest.Status.APPROVED),
+        ("api:v1:auth:follow-request-bulk-reject", UserFollowRequest.Status.REJECTED),
+    ),
+)
+def test_user_follow_request_bulk_all(
+    user: User,
+    user_client: OAuthClient,
+    *,
+    endpoint: str,
+    status: str,
+) -> None:
+    senders = UserFactory.create_batch(5)
+    for sender in senders:
+        UserFollowRequest.objects.create(from_user=sender, to_user=user)
+    other = UserFollowRequest.objects.create(
+        from_user=senders[0], to_user=UserFactory.create()
+    )
+    response = user_client.post(reverse(endpoint), data={"all": True})
+    assert response.status_code == 200
+    assert response.json() == {"count": 5}
+    assert not user.get_pending_follow_requests().exists()
+    assert UserFollowRequest.objects.filter(status=status).count() == 5
+    other.refresh_from_db()
+    assert other.is_pending
+
+    followers = UserFollow.objects.filter(to_user=user).count()
+    assert followers == (5 if status == UserFollowRequest.Status.APPROVED else 0)
+
+
+@pytest.mark.django_db
+def test_user_follow_request_bulk_ids(user: User, user_client: OAuthClient) -> None:
+    senders = UserFactory.create_batch(3)
+    requests = [
+        UserFollowRequest.objects.create(from_user=sender, to_user=user)
+        for sender in senders
+    ]
+    # Already a follower, accepting does not fail.
+    UserFollow.objects.create(from_user=senders[0], to_user=user)
+    response = user_client.post(
+        reverse("api:v1:auth:follow-request-bulk-accept"),
+        data={"ids": [str(requests[0].pk), str(requests[1].pk)]},
+        format="json",
+    )
+    assert response.status_code == 200
+    assert response.json() == {"count": 2}
+    assert set(
+        UserFollow.objects.filter(to_user=user).values_list("from_user", flat=True)
+    ) == {senders[0].pk, senders[1].pk}
+    assert list(user.get_pending_follow_requests()) == [requests[2]]
+
+
+@pytest.mark.django_db
+def test_user_follow_request_bulk_batches(user: User) -> None:
+    senders = UserFactory.create_batch(5)
+    for sender in senders:
+        UserFollowRequest.objects.create(from_user=sender, to_user=user)
+    count = UserFollowRequest.objects.answer_pending(user.pk, accept=True, batch_size=2)
+    assert count == 5
+    assert UserFollow.objects.filter(to_user=user).count() == 5
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("data", ({}, {"all": True, "ids": []}, {"all": False}))
+def test_user_follow_request_bulk_invalid(
+    user_client: OAuthClient,
+    data: dict[str, Any],
+) -> None:
+    response = user_client.post(
+        reverse("api:v1:auth:follow-request-bulk-accept"), data=data, format="json"
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_user_follow_request_delete_resolved(user: User) -> None:
+    senders = UserFactory.create_batch(4)
+    old_approved, old_rejected, old_pending, recent = (
+        UserFollowRequest.objects.create(from_user=sender, to_user=user, status=status)
+        for sender, status in zip(
+            senders,
+            (
+                UserFollowRequest.Status.APPROVED,
+                UserFollowRequest.Status.REJECTED,
+                UserFollowRequest.Status.PENDING,
+                UserFollowRequest.Status.REJECTED,
+            ),
+            strict=True,
+        )
+    )
+    UserFollowRequest.objects.filter(
+        pk__in=[old_approved.pk, old_rejected.pk, old_pending.pk]
+    ).update(updated_at=timezone.now() - timedelta(days=100))
+
+    assert delete_resolved_follow_requests() == 2
+    assert set(UserFollowRequest.objects.values_list("pk", flat=True)) == {
+        old_pending.pk,
+        recent.pk,
+    }
+
+
+@pytest.mark.django_db
+def test_user_follow_request_delete_resolved_batches(user: User) -> None:
+    for sender in UserFactory.create_batch(5):
+        UserFollowRequest.objects.create(
+            from_user=sender,
+            to_user=user,
+            status=UserFollowRequest.Status.REJECTED,
+        )
+    deleted = UserFollowRequest.objects.delete_resolved(
+        before=timezone.now() + timedelta(minutes=1), batch_size=2
+    )
+    assert deleted == 5
+    assert not UserFollowRequest.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "endpoint",
+    (
+        "api:v1:auth:user-following",
+        "api:v1:auth:user-followers",
+    ),
+)
+def test_user_follower_endpoints_include_relations(
+    user: User,
+    user_client: OAuthClient,
+    django_assert_num_queries: DjangoAssertNumQueries,
+    endpoint: str,
+) -> None:
+    helen = UserFactory.create(username="helen")
+    connections = UserFactory.create_batch(5)
+    for connection in connections:
+        UserFollow.objects.create(from_user=connection, to_user=helen)
+        UserFollow.objects.create(from_user=helen, to_user=connection)
+    UserFollow.objects.create(from_user=user, to_user=connections[0])
+    UserFollow.objects.create(from_user=connections[0], to_user=user)
+    UserFollowRequest.objects.create(from_user=user, to_user=connections[1])
+
+    url = reverse(
+        endpoint,
+        kwargs={"pk": helen.pk},
+        query={"fields": "id", "include": "relations"},
+    )
+    with django_assert_num_queries(
+        1  # fetch user
+        + 1  # fetch helen
+        + 1  # check blocks
+        + 1  # fetch connections
+        + 1  # fetch relations
+    ):
+        response = user_client.get(url)
+    assert response.status_code == 200
+    relations = {item["id"]: item["relations"] for item in response.json()["results"]}
+    assert relations == {
+        str(connections[0].pk): ["following", "followed_by"],
+        str(connections[1].pk): ["follow_request_sent"],
+        **{str(connection.pk): [] for connection in connections[2:]},
+    }
+
+
+@pytest.mark.django_db
+def test_user_follower_endpoints_include_relations_requires_scope(
+    user: User,
+    client: OAuthClient,
+) -> None:
+    client.set_user(user, scope="user.follow:read")
+    response = client.get(
+        reverse(
+            "api:v1:auth:user-followers",
+            kwargs={"pk": user.pk},
+            query={"include": "relations"},
+        )
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_user_follower_endpoints_include_invalid(
+    user: User,
+    user_client: OAuthClient,
+) -> None:
+    response = user_client.get(
+        reverse(
+            "api:v1:auth:user-followers",
+            kwargs={"pk": user.pk},
+            query={"include": "email"},
+        )
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "view",
+    (UserFollowersView, UserFollowingView, UserBlockedView, UserRelationsView),
+)
+def test_user_connection_views_are_async(view: Any) -> None:
+    assert view.view_is_async
+
+
+@pytest.mark.django_db
+def test_user_follower_endpoints_async_client(
+    user: User,
+    user_client: OAuthClient,
+) -> None:
+    # Served in the event loop, e.g., under ASGI.
+    profile, private = UserFactory.create(), UserFactory.create(is_private=True)
+    profile.add_following(to_user=user)
+    token = user_client._oauth[user.pk].token
+    client = AsyncClient(headers={"Authorization": f"Bearer {token}"})
+    get = async_to_sync(client.get)
+
+    response = get(reverse("api:v1:auth:user-followers", kwargs={"pk": user.pk}))
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["results"]] == [str(profile.pk)]
+
+    response = get(
+        reverse(
+            "api:v1:auth:user-followers",
+            kwargs={"pk": user.pk},
+            query={"include": "relations"},
+        )
+    )
+    assert response.status_code == 200
+    assert response.json()["results"][0]["relations"] == ["followed_by"]
+
+    response = get(reverse("api:v1:auth:user-following", kwargs={"pk": private.pk}))
+    assert response.status_code == 403
+
+    response = get(reverse("api:v1:auth:user-blocked"))
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+
+    response = get(
+        reverse("api:v1:auth:user-relations", query={"usernames": profile.username})
+    )
+    assert response.status_code == 200
+    assert response.json()["results"][0]["relations"] == ["followed_by"]
+
+
+@pytest.mark.django_db
+def test_user_follower_endpoints_async_client_authentication(user: User) -> None:
+    url = reverse("api:v1:auth:user-followers", kwargs={"pk": user.pk})
+    response = async_to_sync(AsyncClient().get)(url)
+    assert response.status_code == 401
+
+    client = OAuthClient()
+    client.set_user(user)
+    access = client._oauth[user.pk]
+    access.expires = timezone.now() - timedelta(minutes=1)
+    access.save(update_fields=["expires"])
+    response = async_to_sync(
+        AsyncClient(headers={"Authorization": f"Bearer {access.token}"}).get
+    )(url)
+    assert response.status_code == 401
+    assert 'error="invalid_token"' in response.headers["WWW-Authenticate"]
+
+
+def test_user_connection_views_schema_security() -> None:
+    out = io.StringIO()
+    call_command("spectacular", stdout=out, format="openapi-json", api_version="v1")
+    paths = json.loads(out.getvalue())["paths"]
+    followers = next(v for k, v in paths.items() if k.endswith("/followers/"))
+    assert {"oauth2": []} in followers["get"]["security"]
+    blocked = next(v for k, v in paths.items() if k.endswith("/users/blocked/"))
+    assert {"oauth2": ["user.block:read"]} in blocked["get"]["security"]
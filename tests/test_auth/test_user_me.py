@@ -10,6 +10,7 @@ from pytest_django import DjangoAssertNumQueries
 from pytest_mock import MockerFixture
 
 from asu.auth.models import Application, User
+from asu.auth.serializers.user import get_scoped_user_serializer
 
 from tests.conftest import OAuthClient
 from tests.factories import UserFactory
@@ -88,6 +89,50 @@ def test_user_me_update(
     assert user.description == "Lorem ipsum"
 
 
+@pytest.mark.django_db
+def test_user_me_update_skips_unchanged_constraints(
+    user: User,
+    user_client: OAuthClient,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    with django_assert_num_queries(
+        1  # fetch user
+        + 1  # update user
+        + 2  # fetch otp devices (totp, static)
+    ) as context:
+        response = user_client.patch(
+            reverse("api:v1:auth:user-me"),
+            data={"username": user.username, "is_private": True},
+        )
+    assert response.status_code == 200
+    assert response.json()["is_private"] is True
+
+    update = context.captured_queries[1]["sql"]
+    assert update.startswith("UPDATE")
+    assert '"is_private"' in update
+    assert '"username"' not in update
+
+    user.refresh_from_db()
+    assert user.is_private is True
+
+
+@pytest.mark.django_db
+def test_user_me_update_unchanged(
+    user: User,
+    user_client: OAuthClient,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    with django_assert_num_queries(
+        1  # fetch user
+        + 2  # fetch otp devices (totp, static)
+    ):
+        response = user_client.patch(
+            reverse("api:v1:auth:user-me"),
+            data={"display_name": user.display_name, "is_private": user.is_private},
+        )
+    assert response.status_code == 200
+
+
 @pytest.mark.django_db
 def test_user_me_update_username_taken(user_client: OAuthClient) -> None:
     UserFactory.create(username="suzie")
@@ -270,3 +315,22 @@ def test_user_me_properly_responds_with_405_rather_than_403(
     client.set_user(user, app=authorization_code_third_party_app)
     response = client.post(reverse("api:v1:auth:user-me"))
     assert response.status_code == 405
+
+
+def test_user_me_scoped_serializer_is_prebuilt() -> None:
+    klass = get_scoped_user_serializer(["user.profile:read", "unrelated:read"])
+    assert klass is get_scoped_user_serializer(["user.profile:read"])
+    assert set(klass().fields) == {
+        "id",
+        "display_name",
+        "username",
+        "description",
+        "website",
+        "profile_picture",
+        "is_private",
+        "created_at",
+    }
+
+    klass = get_scoped_user_serializer(["user.profile:read", "user.profile.email:read"])
+    assert "email" in klass().fields
+    assert "two_factor_enabled" not in klass().fields
@@ -0,0 +1,128 @@
+import threading
+
+from django.contrib.auth.hashers import make_password
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+import pytest
+from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
+
+from asu.auth import hashing
+from asu.auth.hashing import HashingExecutor, HashingUnavailable
+from asu.auth.middleware import HashingUnavailableMiddleware
+from asu.auth.models import User
+
+from tests.conftest import OAuthClient
+
+
+def test_hashing_executor_run() -> None:
+    executor = HashingExecutor(concurrency=2, timeout=1)
+    assert executor.run(pow, 2, 10) == 1024
+    assert executor.queue_depth == 0
+
+
+def test_hashing_executor_saturated() -> None:
+    executor = HashingExecutor(concurrency=1, timeout=0.01)
+    started, release = threading.Event(), threading.Event()
+
+    def block() -> None:
+        started.set()
+        release.wait()
+
+    assert executor.submit(block) is True
+    started.wait()
+    try:
+        with pytest.raises(HashingUnavailable):
+            executor.run(pow, 2, 10)
+        assert executor.submit(pow, 2, 10) is False
+    finally:
+        release.set()
+    assert executor.run(pow, 2, 10) == 1024
+
+
+def test_hashing_executor_closes_old_connections(mocker: MockerFixture) -> None:
+    close_old_connections = mocker.patch("asu.auth.hashing.close_old_connections")
+    executor = HashingExecutor(concurrency=1, timeout=1)
+
+    assert executor.run(pow, 2, 10) == 1024
+    close_old_connections.assert_called_once_with()
+
+    with pytest.raises(ZeroDivisionError):
+        executor.run(divmod, 1, 0)
+    assert close_old_connections.call_count == 2
+
+
+@pytest.mark.django_db
+def test_user_check_password_upgrades_in_background(
+    user: User,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    user.password = make_password("0ld_password*")
+    settings.PASSWORD_HASHERS = [
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+    ]
+    submit = mocker.patch.object(hashing.executor, "submit")
+
+    assert user.check_password("0ld_password*") is True
+    submit.assert_called_once_with(
+        User.objects.upgrade_password_hash,
+        user.pk,
+        user.password,
+        "0ld_password*",
+    )
+
+
+@pytest.mark.django_db
+def test_user_check_password_up_to_date(user: User, mocker: MockerFixture) -> None:
+    user.password = make_password("0ld_password*")
+    submit = mocker.patch.object(hashing.executor, "submit")
+
+    assert user.check_password("0ld_password*") is True
+    assert user.check_password("1new_password*") is False
+    submit.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_user_upgrade_password_hash(user: User) -> None:
+    encoded = user.password
+    User.objects.upgrade_password_hash(user.pk, "outdated", "0ld_password*")
+    user.refresh_from_db()
+    assert user.password == encoded
+
+    User.objects.upgrade_password_hash(user.pk, encoded, "0ld_password*")
+    user.refresh_from_db()
+    assert user.password != encoded
+    assert user.check_password("0ld_password*") is True
+
+
+@pytest.mark.django_db
+def test_user_password_change_hashing_unavailable(
+    user_client: OAuthClient,
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(hashing.executor, "run", side_effect=HashingUnavailable)
+    response = user_client.post(
+        reverse("api:v1:auth:user-change-password"),
+        data={
+            "old_password": "0ld_password*",
+            "new_password": "1new_password*",
+        },
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["code"] == "hashing_unavailable"
+
+
+def test_hashing_unavailable_middleware() -> None:
+    middleware = HashingUnavailableMiddleware(lambda request: HttpResponse())
+    request = RequestFactory().post("/o/token/")
+
+    assert middleware.process_exception(request, ValueError()) is None
+    response = middleware.process_exception(request, HashingUnavailable())
+    assert response is not None
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
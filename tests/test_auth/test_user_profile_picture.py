@@ -1,11 +1,34 @@
+import io
+import uuid
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
 from django.core.files.base import ContentFile
+from django.db import connection
 from django.urls import reverse
+from django.utils import timezone
 
 import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+from PIL import Image
+from pytest_mock import MockerFixture
 
-from asu.auth.models import Application, User
+from asu.auth.models import Application, User, UserDeactivation
+from asu.auth.models.user import PROFILE_PICTURE_FORMATS
+from asu.auth.serializers.actions import get_profile_picture_upload_name
+from asu.auth.tasks import (
+    delete_stale_profile_picture_uploads,
+    delete_users_permanently,
+    process_profile_picture_upload,
+)
+from asu.core.models import MediaBlob
+from asu.core.utils.file import get_blob_name, get_file_digest
+from asu.core.utils.storage import S3MediaStorage
 
 from tests.conftest import OAuthClient
+from tests.factories import UserFactory
 
 
 @pytest.fixture
@@ -20,16 +43,17 @@ def test_user_set_profile_picture(
     user: User,
     user_client: OAuthClient,
     sample_profile_picture: ContentFile,
+    django_capture_on_commit_callbacks: Any,
 ) -> None:
-    response = user_client.put(
-        reverse("api:v1:auth:user-profile-picture"),
-        data={"profile_picture": sample_profile_picture},
-        format="multipart",
-    )
-    path = response.json()["profile_picture"]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.put(
+            reverse("api:v1:auth:user-profile-picture"),
+            data={"profile_picture": sample_profile_picture},
+            format="multipart",
+        )
     assert response.status_code == 200
-    assert f"/usercontent/{user.pk}/profile_picture" in path
-    assert path.endswith(".jpeg")
+    # The picture is processed after the response is rendered.
+    assert response.json() == {"profile_picture": None, "pending": True}
 
     profile = user_client.get(
         reverse(
@@ -39,8 +63,91 @@ def test_user_set_profile_picture(
     )
     profile_picture_url = profile.json()["profile_picture"]
     assert profile_picture_url is not None
-    assert "/cache/" in profile_picture_url
-    assert profile_picture_url.endswith(".jpg")
+    assert "/usercontent/blobs/" in profile_picture_url
+    assert profile_picture_url.endswith("/150.jpeg")
+
+    user.refresh_from_db()
+    formats = user.profile_picture_variants["formats"]
+    assert formats in (["avif", "webp", "jpeg"], ["webp", "jpeg"])
+    sources = profile.json()["profile_picture_sources"]
+    assert [source["type"] for source in sources] == [
+        PROFILE_PICTURE_FORMATS[ext][0] for ext in formats
+    ]
+    for source in sources:
+        widths = [item.rsplit(" ", 1)[1] for item in source["srcset"].split(", ")]
+        assert widths == ["64w", "150w", "400w"]
+
+
+@pytest.mark.django_db
+def test_user_set_profile_picture_variants(
+    user: User,
+    sample_profile_picture: ContentFile,
+) -> None:
+    user.set_profile_picture(sample_profile_picture)
+    user.refresh_from_db()
+    storage = user.profile_picture.storage
+
+    variants = user.get_profile_picture_variants()
+    assert user.profile_picture_variants["sizes"] == [64, 150, 400]
+    assert len(variants) == 3 * len(user.profile_picture_variants["formats"])
+    for ext, size, name in variants:
+        with storage.open(name) as file, Image.open(file) as image:
+            assert image.format == ext.upper()
+            assert image.size == (size, size)
+
+    # Variants of the previous picture are removed once it is replaced.
+    user.set_profile_picture(ContentFile(get_png((500, 500)), name="other.png"))
+    assert not any(storage.exists(name) for *_, name in variants)
+
+    variants = user.get_profile_picture_variants()
+    user.delete_profile_picture()
+    user.refresh_from_db()
+    assert user.profile_picture_variants == {}
+    assert not any(storage.exists(name) for *_, name in variants)
+
+
+@pytest.mark.django_db
+def test_user_profile_picture_without_variants(
+    user: User,
+    user_client: OAuthClient,
+    sample_profile_picture: ContentFile,
+) -> None:
+    # Pictures set before variants were introduced are served as thumbnails.
+    user.profile_picture = sample_profile_picture
+    user.save(update_fields=["profile_picture", "updated_at"])
+    profile = user_client.get(
+        reverse("api:v1:auth:user-detail", kwargs={"pk": user.pk})
+    ).json()
+    assert "/cache/" in profile["profile_picture"]
+    assert profile["profile_picture_sources"] == []
+
+
+@pytest.mark.django_db
+def test_user_set_profile_picture_processed_in_background(
+    user: User,
+    user_client: OAuthClient,
+    sample_profile_picture: ContentFile,
+    mocker: MockerFixture,
+    django_capture_on_commit_callbacks: Any,
+) -> None:
+    delay = mocker.patch(
+        "asu.auth.serializers.actions.process_profile_picture_upload.delay"
+    )
+    create_variants = mocker.spy(User, "create_profile_picture_variants")
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.put(
+            reverse("api:v1:auth:user-profile-picture"),
+            data={"profile_picture": sample_profile_picture},
+            format="multipart",
+        )
+    assert response.status_code == 200
+    create_variants.assert_not_called()
+
+    (call,) = delay.call_args_list
+    assert call.kwargs["user_id"] == user.pk
+    assert call.kwargs["name"].startswith(f"usercontent/uploads/{user.pk}/")
+    storage = User._meta.get_field("profile_picture").storage
+    assert storage.exists(call.kwargs["name"])
 
 
 @pytest.mark.django_db
@@ -48,17 +155,19 @@ def test_user_replace_profile_picture(
     user: User,
     user_client: OAuthClient,
     sample_profile_picture: ContentFile,
+    django_capture_on_commit_callbacks: Any,
 ) -> None:
     user.profile_picture = sample_profile_picture
     user.save(update_fields=["profile_picture", "updated_at"])
     previous = user.profile_picture.path
     sample_profile_picture.seek(0)
 
-    response = user_client.put(
-        reverse("api:v1:auth:user-profile-picture"),
-        data={"profile_picture": sample_profile_picture},
-        format="multipart",
-    )
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.put(
+            reverse("api:v1:auth:user-profile-picture"),
+            data={"profile_picture": sample_profile_picture},
+            format="multipart",
+        )
     assert response.status_code == 200
     user.refresh_from_db()
     assert previous != user.profile_picture.path
@@ -120,3 +229,424 @@ def test_user_delete_profile_picture_ok_if_not_previously_exists(
 ) -> None:
     response = user_client.delete(reverse("api:v1:auth:user-profile-picture"))
     assert response.status_code == 204
+
+
+@pytest.fixture
+def s3_storage() -> S3MediaStorage:
+    return S3MediaStorage(
+        access_key="access",
+        secret_key="secret",
+        bucket_name="bucket",
+        endpoint_url="http://s3.localhost",
+        region_name="us-east-1",
+    )
+
+
+@pytest.mark.django_db
+def test_user_profile_picture_upload(
+    user: User,
+    user_client: OAuthClient,
+    s3_storage: S3MediaStorage,
+    mocker: MockerFixture,
+) -> None:
+    field = User._meta.get_field("profile_picture")
+    mocker.patch.object(field, "storage", s3_storage)
+
+    response = user_client.post(
+        reverse("api:v1:auth:user-profile-picture-upload"),
+        data={"content_type": "image/png"},
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["url"] == "http://s3.localhost/bucket"
+    assert data["key"].startswith(f"usercontent/uploads/{user.pk}/")
+    assert data["key"].endswith(".png")
+    assert data["form_fields"]["key"] == "media/" + data["key"]
+    assert data["form_fields"]["Content-Type"] == "image/png"
+    assert "policy" in data["form_fields"]
+
+
+@pytest.mark.django_db
+def test_user_profile_picture_upload_bad_content_type(
+    user_client: OAuthClient,
+    s3_storage: S3MediaStorage,
+    mocker: MockerFixture,
+) -> None:
+    field = User._meta.get_field("profile_picture")
+    mocker.patch.object(field, "storage", s3_storage)
+
+    response = user_client.post(
+        reverse("api:v1:auth:user-profile-picture-upload"),
+        data={"content_type": "image/gif"},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_user_profile_picture_upload_requires_object_storage(
+    user_client: OAuthClient,
+) -> None:
+    response = user_client.post(
+        reverse("api:v1:auth:user-profile-picture-upload"),
+        data={"content_type": "image/png"},
+    )
+    assert response.status_code == 501
+
+
+@pytest.mark.django_db
+def test_user_profile_picture_confirm(
+    user: User,
+    user_client: OAuthClient,
+    sample_profile_picture: ContentFile,
+    mocker: MockerFixture,
+    django_capture_on_commit_callbacks: Any,
+) -> None:
+    delay = mocker.patch(
+        "asu.auth.serializers.actions.process_profile_picture_upload.delay"
+    )
+    storage = User._meta.get_field("profile_picture").storage
+    key = storage.save(
+        get_profile_picture_upload_name(user, "upload.jpeg"), sample_profile_picture
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.post(
+            reverse("api:v1:auth:user-profile-picture-confirm"),
+            data={"key": key},
+        )
+    assert response.status_code == 202
+    delay.assert_called_once_with(user_id=user.pk, name=key)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "get_key",
+    (
+        lambda user: "usercontent/uploads/%s/upload.jpeg" % uuid.uuid4(),
+        lambda user: "usercontent/uploads/%s/../upload.jpeg" % user.pk,
+        lambda user: "usercontent/uploads/%s/missing.jpeg" % user.pk,
+        lambda user: "usercontent/%s/profile_picture/upload.jpeg" % user.pk,
+        lambda user: "upload.jpeg",
+    ),
+)
+def test_user_profile_picture_confirm_bad_key(
+    user: User,
+    user_client: OAuthClient,
+    get_key: Callable[[User], str],
+    mocker: MockerFixture,
+) -> None:
+    delay = mocker.patch(
+        "asu.auth.serializers.actions.process_profile_picture_upload.delay"
+    )
+    response = user_client.post(
+        reverse("api:v1:auth:user-profile-picture-confirm"),
+        data={"key": get_key(user)},
+    )
+    assert response.status_code == 400
+    assert "key" in response.json()["errors"]
+    delay.assert_not_called()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "content",
+    (
+        b"GIF89a" + b"\x00" * 64,
+        b"\xff\xd8\xff\xe0" + b"\x00" * (2**21),
+    ),
+)
+def test_user_profile_picture_confirm_bad_file(
+    user: User,
+    user_client: OAuthClient,
+    content: bytes,
+) -> None:
+    storage = User._meta.get_field("profile_picture").storage
+    key = storage.save(
+        get_profile_picture_upload_name(user, "upload.jpeg"), ContentFile(content)
+    )
+    response = user_client.post(
+        reverse("api:v1:auth:user-profile-picture-confirm"),
+        data={"key": key},
+    )
+    assert response.status_code == 400
+    assert "key" in response.json()["errors"]
+
+
+@pytest.mark.django_db
+def test_process_profile_picture_upload(
+    user: User,
+    sample_profile_picture: ContentFile,
+) -> None:
+    storage = User._meta.get_field("profile_picture").storage
+    key = storage.save(
+        get_profile_picture_upload_name(user, "upload.jpeg"), sample_profile_picture
+    )
+    process_profile_picture_upload(user_id=user.pk, name=key)
+
+    user.refresh_from_db()
+    assert user.profile_picture.name.startswith("usercontent/blobs/")
+    assert user.profile_picture.name != key
+    assert not storage.exists(key)
+
+
+def get_large_image() -> ContentFile:
+    # Exceeds the pixel limit, but compresses well below the size limit.
+    buffer = io.BytesIO()
+    Image.new("1", (5000, 4000)).save(buffer, format="PNG")
+    return ContentFile(buffer.getvalue(), name="large.png")
+
+
+@pytest.mark.django_db
+def test_user_profile_picture_confirm_too_many_pixels(
+    user: User,
+    user_client: OAuthClient,
+) -> None:
+    storage = User._meta.get_field("profile_picture").storage
+    key = storage.save(
+        get_profile_picture_upload_name(user, "upload.png"), get_large_image()
+    )
+    response = user_client.post(
+        reverse("api:v1:auth:user-profile-picture-confirm"),
+        data={"key": key},
+    )
+    assert response.status_code == 400
+    assert "key" in response.json()["errors"]
+
+
+@pytest.mark.django_db
+def test_process_profile_picture_upload_too_many_pixels(user: User) -> None:
+    # Uploads might be replaced after they are confirmed.
+    storage = User._meta.get_field("profile_picture").storage
+    key = storage.save(
+        get_profile_picture_upload_name(user, "upload.png"), get_large_image()
+    )
+    process_profile_picture_upload(user_id=user.pk, name=key)
+
+    user.refresh_from_db()
+    assert not user.profile_picture
+    assert not storage.exists(key)
+
+
+@pytest.mark.django_db
+def test_process_profile_picture_upload_user_deleted(
+    user: User,
+    sample_profile_picture: ContentFile,
+) -> None:
+    storage = User._meta.get_field("profile_picture").storage
+    key = storage.save(
+        get_profile_picture_upload_name(user, "upload.jpeg"), sample_profile_picture
+    )
+    user_id = user.pk
+    user.delete()
+
+    process_profile_picture_upload(user_id=user_id, name=key)
+    assert not storage.exists(key)
+
+
+@pytest.mark.django_db
+def test_delete_stale_profile_picture_uploads(
+    user: User,
+    sample_profile_picture: ContentFile,
+    mocker: MockerFixture,
+) -> None:
+    storage = User._meta.get_field("profile_picture").storage
+    stale, recent = (
+        storage.save(
+            get_profile_picture_upload_name(user, "upload.jpeg"),
+            sample_profile_picture,
+        )
+        for _ in range(2)
+    )
+    now = timezone.now()
+    mocker.patch.object(
+        type(storage),
+        "get_modified_time",
+        lambda self, name: now - timedelta(hours=7 if name == stale else 1),
+    )
+    assert delete_stale_profile_picture_uploads() == 1
+    assert not storage.exists(stale)
+    assert storage.exists(recent)
+
+
+def test_s3_media_storage_read_head(s3_storage: S3MediaStorage) -> None:
+    client = s3_storage.connection.meta.client
+    with Stubber(client) as stubber:
+        stubber.add_response(
+            "get_object",
+            {
+                "Body": StreamingBody(io.BytesIO(b"head"), 4),
+                "ContentRange": "bytes 0-3/146515",
+            },
+            {"Bucket": "bucket", "Key": "media/a/b.jpeg", "Range": "bytes=0-3"},
+        )
+        stubber.add_client_error(
+            "get_object",
+            service_error_code="NoSuchKey",
+            http_status_code=404,
+        )
+        assert s3_storage.read_head("a/b.jpeg", 4) == (b"head", 146515)
+        with pytest.raises(FileNotFoundError):
+            s3_storage.read_head("a/missing.jpeg", 4)
+
+
+def get_png(size: tuple[int, int]) -> bytes:
+    buf = io.BytesIO()
+    Image.new("1", size).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "file",
+    (
+        ContentFile(get_png((5000, 5000)), name="large.png"),
+        ContentFile(b"not an image", name="text.png"),
+        ContentFile(b"\x00" * (2**21 + 1), name="big.png"),
+    ),
+)
+def test_user_set_profile_picture_rejected_while_streaming(
+    user: User,
+    user_client: OAuthClient,
+    file: ContentFile,
+) -> None:
+    response = user_client.put(
+        reverse("api:v1:auth:user-profile-picture"),
+        data={"profile_picture": file},
+        format="multipart",
+    )
+    assert response.status_code == 400
+    assert "profile_picture" in response.json()["errors"]
+    user.refresh_from_db()
+    assert not user.profile_picture
+
+
+@pytest.mark.django_db
+def test_user_set_profile_picture_png(
+    user: User,
+    user_client: OAuthClient,
+    django_capture_on_commit_callbacks: Any,
+) -> None:
+    buf = io.BytesIO()
+    Image.new("RGBA", (800, 600)).save(buf, format="PNG")
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.put(
+            reverse("api:v1:auth:user-profile-picture"),
+            data={"profile_picture": ContentFile(buf.getvalue(), name="image.png")},
+            format="multipart",
+        )
+    assert response.status_code == 200
+    user.refresh_from_db()
+    with Image.open(user.profile_picture) as image:
+        assert image.format == "JPEG"
+        assert image.size == (400, 300)
+
+
+@pytest.mark.django_db
+def test_user_profile_picture_shared_blob(
+    user: User,
+    sample_profile_picture: ContentFile,
+) -> None:
+    other = UserFactory.create()
+    user.set_profile_picture(sample_profile_picture)
+    other.set_profile_picture(sample_profile_picture)
+    storage = user.profile_picture.storage
+    names = [user.profile_picture.name] + [
+        name for *_, name in user.get_profile_picture_variants()
+    ]
+
+    (blob,) = MediaBlob.objects.all()
+    assert blob.name == user.profile_picture.name == other.profile_picture.name
+    assert blob.name == get_blob_name(get_file_digest(sample_profile_picture), ".jpeg")
+    assert blob.ref_count == 2
+    assert other.profile_picture_variants == user.profile_picture_variants
+
+    # Files are only removed once they are no longer referenced.
+    user.delete_profile_picture()
+    blob.refresh_from_db()
+    assert blob.ref_count == 1
+    assert all(storage.exists(name) for name in names)
+
+    other.delete_profile_picture()
+    assert not MediaBlob.objects.exists()
+    assert not any(storage.exists(name) for name in names)
+
+
+@pytest.mark.django_db
+def test_user_profile_picture_stored_again_after_release(
+    user: User,
+    sample_profile_picture: ContentFile,
+) -> None:
+    user.set_profile_picture(sample_profile_picture)
+    storage = user.profile_picture.storage
+    names = [user.profile_picture.name] + [
+        name for *_, name in user.get_profile_picture_variants()
+    ]
+    user.delete_profile_picture()
+    assert not any(storage.exists(name) for name in names)
+
+    user.set_profile_picture(sample_profile_picture)
+    assert user.profile_picture.name == names[0]
+    assert all(storage.exists(name) for name in names)
+
+
+@pytest.mark.django_db
+def test_media_blob_created_outside_transaction(user: User) -> None:
+    storage = User._meta.get_field("profile_picture").storage
+    depth = len(connection.atomic_blocks)
+
+    def create(name: str) -> tuple[dict[str, bytes], dict[str, Any]]:
+        # Processing does not hold any locks.
+        assert len(connection.atomic_blocks) == depth
+        return {name: b"blob", name + ".variant": b"variant"}, {"sizes": [1]}
+
+    blob = MediaBlob.objects.acquire(
+        "0" * 64, name="usercontent/blobs/blob", storage=storage, create=create
+    )
+    assert blob.ref_count == 1
+    assert blob.variants == {"sizes": [1]}
+    assert storage.exists("usercontent/blobs/blob")
+    assert storage.exists("usercontent/blobs/blob.variant")
+
+
+@pytest.mark.django_db
+def test_delete_users_permanently_releases_profile_pictures(
+    user: User,
+    sample_profile_picture: ContentFile,
+    mocker: MockerFixture,
+) -> None:
+    deleted, other = UserFactory.create_batch(2)
+    deleted.set_profile_picture(sample_profile_picture)
+    other.set_profile_picture(sample_profile_picture)
+    unique = io.BytesIO()
+    Image.new("RGB", (100, 100)).save(unique, format="PNG")
+    user.set_profile_picture(ContentFile(unique.getvalue(), name="unique.png"))
+    storage = user.profile_picture.storage
+    now = timezone.now()
+    UserDeactivation.objects.bulk_create(
+        UserDeactivation(user=u, for_deletion=True, created_at=now)
+        for u in (user, deleted)
+    )
+    mocker.patch("django.utils.timezone.now", return_value=now + timedelta(days=30))
+    delete_users_permanently()
+
+    # Shared picture is still referenced, the other one is deleted.
+    (blob,) = MediaBlob.objects.all()
+    assert blob.name == other.profile_picture.name
+    assert blob.ref_count == 1
+    assert storage.exists(blob.name)
+    assert not storage.exists(user.profile_picture.name)
+
+
+@pytest.mark.django_db
+def test_user_profile_picture_reupload_keeps_blob(
+    user: User,
+    sample_profile_picture: ContentFile,
+) -> None:
+    user.set_profile_picture(sample_profile_picture)
+    name = user.profile_picture.name
+    user.set_profile_picture(sample_profile_picture)
+
+    (blob,) = MediaBlob.objects.all()
+    assert user.profile_picture.name == name
+    assert blob.ref_count == 1
+    assert user.profile_picture.storage.exists(name)
@@ -0,0 +1,239 @@
+import asyncio
+import json
+from typing import Any
+from unittest.mock import MagicMock
+
+from django.urls import reverse
+
+import pytest
+from pytest_django import DjangoCaptureOnCommitCallbacks
+from pytest_mock import MockerFixture
+
+from asu.auth.events import get_channel, publish_relation_event, send
+from asu.auth.models import User, UserBlock, UserFollow, UserFollowRequest
+from asu.gateways.websocket import (
+    CLOSE_POLICY_VIOLATION,
+    CLOSE_TRY_AGAIN_LATER,
+    QUEUE_SIZE,
+    Subscription,
+    application,
+    relay,
+)
+
+from tests.conftest import OAuthClient
+from tests.factories import UserFactory
+
+
+@pytest.fixture
+def publish(mocker: MockerFixture) -> MagicMock:
+    return mocker.patch("asu.auth.events.send")
+
+
+def get_events(publish: MagicMock) -> list[tuple[list[str], dict[str, Any]]]:
+    return [
+        (channels, json.loads(payload))
+        for (channels, payload), _ in publish.call_args_list
+    ]
+
+
+def make_event(type: str, from_user: User, to_user: User) -> Any:
+    return (
+        [get_channel(from_user.pk), get_channel(to_user.pk)],
+        {"type": type, "from_user": str(from_user.pk), "to_user": str(to_user.pk)},
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "is_private, event",
+    (
+        (False, "follow.created"),
+        (True, "follow_request.created"),
+    ),
+)
+def test_user_follow_publishes_event(
+    user: User,
+    user_client: OAuthClient,
+    publish: MagicMock,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+    *,
+    is_private: bool,
+    event: str,
+) -> None:
+    profile = UserFactory.create(is_private=is_private)
+    url = reverse("api:v1:auth:user-follow", kwargs={"pk": profile.pk})
+    with django_capture_on_commit_callbacks(execute=True):
+        assert user_client.post(url).status_code == 200
+        # Subsequent requests do not create relations, so no events.
+        assert user_client.post(url).status_code == 200
+    assert get_events(publish) == [make_event(event, user, profile)]
+
+
+@pytest.mark.django_db
+def test_user_unfollow_publishes_event(
+    user: User,
+    user_client: OAuthClient,
+    publish: MagicMock,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
+    profile = UserFactory.create()
+    UserFollow.objects.create(from_user=user, to_user=profile)
+    url = reverse("api:v1:auth:user-unfollow", kwargs={"pk": profile.pk})
+    with django_capture_on_commit_callbacks(execute=True):
+        assert user_client.post(url).status_code == 204
+        assert user_client.post(url).status_code == 204
+    assert get_events(publish) == [make_event("follow.deleted", user, profile)]
+
+
+@pytest.mark.django_db
+def test_user_block_unblock_publishes_event(
+    user: User,
+    user_client: OAuthClient,
+    publish: MagicMock,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
+    profile = UserFactory.create()
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.post(
+            reverse("api:v1:auth:user-block", kwargs={"pk": profile.pk})
+        )
+        assert response.status_code == 204
+        assert UserBlock.objects.filter(from_user=user, to_user=profile).exists()
+        response = user_client.post(
+            reverse("api:v1:auth:user-unblock", kwargs={"pk": profile.pk})
+        )
+        assert response.status_code == 204
+    assert get_events(publish) == [
+        make_event("block.created", user, profile),
+        make_event("block.deleted", user, profile),
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "action, event",
+    (
+        ("accept", "follow_request.accepted"),
+        ("reject", "follow_request.rejected"),
+    ),
+)
+def test_user_follow_request_resolve_publishes_event(
+    user: User,
+    user_client: OAuthClient,
+    publish: MagicMock,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+    *,
+    action: str,
+    event: str,
+) -> None:
+    profile = UserFactory.create()
+    request = UserFollowRequest.objects.create(
+        from_user=profile,
+        to_user=user,
+        status=UserFollowRequest.Status.PENDING,
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.post(
+            reverse(
+                "api:v1:auth:follow-request-%s" % action,
+                kwargs={"pk": request.pk},
+            )
+        )
+    assert response.status_code == 204
+    assert get_events(publish) == [make_event(event, profile, user)]
+
+
+def test_relation_event_send(mocker: MockerFixture) -> None:
+    get_client = mocker.patch("asu.auth.events.get_client")
+    pipe = get_client.return_value.pipeline.return_value.__enter__.return_value
+
+    send(["channel-1", "channel-2"], "{}")
+    assert pipe.publish.call_args_list == [
+        mocker.call("channel-1", "{}"),
+        mocker.call("channel-2", "{}"),
+    ]
+    pipe.execute.assert_called_once_with()
+
+
+@pytest.mark.django_db
+def test_relation_event_published_on_commit(
+    publish: MagicMock,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
+    helen, bob = UserFactory.create(), UserFactory.create()
+    with django_capture_on_commit_callbacks() as callbacks:
+        publish_relation_event(
+            "follow.created", from_user_id=helen.pk, to_user_id=bob.pk
+        )
+    publish.assert_not_called()
+    assert len(callbacks) == 1
+
+
+def test_websocket_requires_token() -> None:
+    messages = [{"type": "websocket.connect"}]
+    sent: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        return messages.pop(0)
+
+    async def send(message: dict[str, Any]) -> None:
+        sent.append(message)
+
+    scope = {"type": "websocket", "headers": [(b"authorization", b"Basic abc")]}
+    asyncio.run(application(scope, receive, send))
+    assert sent == [{"type": "websocket.close", "code": CLOSE_POLICY_VIOLATION}]
+
+
+def test_websocket_relay() -> None:
+    async def run() -> tuple[list[dict[str, Any]], int | None]:
+        subscription = Subscription("channel")
+        disconnected = asyncio.Event()
+        sent: list[dict[str, Any]] = []
+
+        async def receive() -> dict[str, Any]:
+            await disconnected.wait()
+            return {"type": "websocket.disconnect"}
+
+        async def send(message: dict[str, Any]) -> None:
+            sent.append(message)
+            disconnected.set()
+
+        subscription.put('{"type":"follow.created"}')
+        code = await relay(subscription, receive, send, timeout=5)
+        return sent, code
+
+    sent, code = asyncio.run(run())
+    assert sent == [{"type": "websocket.send", "text": '{"type":"follow.created"}'}]
+    assert code is None
+
+
+def test_websocket_relay_closes_slow_clients() -> None:
+    async def run() -> int | None:
+        subscription = Subscription("channel")
+        for _ in range(QUEUE_SIZE + 1):
+            subscription.put("{}")
+
+        async def receive() -> dict[str, Any]:
+            await asyncio.Event().wait()
+            raise AssertionError
+
+        async def send(message: dict[str, Any]) -> None:
+            await asyncio.Event().wait()
+
+        return await relay(subscription, receive, send, timeout=5)
+
+    assert asyncio.run(run()) == CLOSE_TRY_AGAIN_LATER
+
+
+def test_websocket_relay_closes_on_token_expiry() -> None:
+    async def run() -> int | None:
+        async def receive() -> dict[str, Any]:
+            await asyncio.Event().wait()
+            raise AssertionError
+
+        async def send(message: dict[str, Any]) -> None:
+            raise AssertionError
+
+        return await relay(Subscription("channel"), receive, send, timeout=0.01)
+
+    assert asyncio.run(run()) == CLOSE_POLICY_VIOLATION
@@ -0,0 +1,109 @@
+import itertools
+import json
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from django.db import connection
+from django.db.models import QuerySet
+
+import pytest
+
+from asu.auth.models import User, UserBlock, UserFollow
+
+PAGE_SIZE = 10
+
+
+def walk(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from walk(child)
+
+
+def get_plan_nodes(queryset: QuerySet[Any]) -> list[dict[str, Any]]:
+    (result,) = json.loads(queryset.explain(format="json", analyze=True))
+    return list(walk(result["Plan"]))
+
+
+@pytest.fixture
+def graph() -> dict[str, User]:
+    """
+    Seed a relation graph that is large enough for the planner to care
+    about indexes; a couple of hundred connections for the users under test
+    and many more between others.
+    """
+    users = User.objects.bulk_create(
+        User(
+            username="user%s" % index,
+            display_name="User %s" % index,
+            email="user%s@example.com" % index,
+        )
+        for index in range(600)
+    )
+    helen, bob, *others = users
+    UserFollow.objects.bulk_create(
+        itertools.chain(
+            (UserFollow(from_user=user, to_user=helen) for user in others[:250]),
+            (UserFollow(from_user=helen, to_user=user) for user in others[250:500]),
+            (
+                UserFollow(from_user=from_user, to_user=to_user)
+                for from_user, to_user in itertools.permutations(others[:120], 2)
+            ),
+        )
+    )
+    UserBlock.objects.bulk_create(
+        UserBlock(from_user=bob, to_user=user) for user in others[:250]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE account_user, account_userfollow, account_userblock")
+    return {"helen": helen, "bob": bob}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "name, get_queryset, ordering",
+    (
+        (
+            "followers",
+            lambda users: User.objects.active().filter(following=users["helen"]),
+            "from_userfollows",
+        ),
+        (
+            "following",
+            lambda users: User.objects.active().filter(followed_by=users["helen"]),
+            "to_userfollows",
+        ),
+        (
+            "blocked",
+            lambda users: User.objects.active().filter(blocked_by=users["bob"]),
+            "to_userblocks",
+        ),
+    ),
+)
+def test_user_relation_list_plans(
+    graph: dict[str, User],
+    *,
+    name: str,
+    get_queryset: Callable[[dict[str, User]], QuerySet[User]],
+    ordering: str,
+) -> None:
+    queryset = get_queryset(graph).order_by("-%s" % ordering)
+    first = queryset[: PAGE_SIZE + 1]
+    (position,) = queryset.values_list(ordering, flat=True)[PAGE_SIZE : PAGE_SIZE + 1]
+    # Cursor pagination filters the pages after the first one by the
+    # position of the last item.
+    subsequent = queryset.filter(**{"%s__lt" % ordering: position})[: PAGE_SIZE + 1]
+
+    for page in (first, subsequent):
+        nodes = get_plan_nodes(page)
+        scans = [node for node in nodes if "Relation Name" in node]
+        assert not [node for node in scans if node["Node Type"] == "Seq Scan"], name
+        assert not [node for node in nodes if node["Node Type"] == "Sort"], name
+
+        # Relation rows are read in index order, and only as many as needed
+        # for the page.
+        (relation,) = (
+            node
+            for node in scans
+            if node["Relation Name"] in ("account_userfollow", "account_userblock")
+        )
+        assert relation["Actual Rows"] * relation["Actual Loops"] <= PAGE_SIZE + 1
@@ -1,6 +1,7 @@
 from django.urls import reverse
 
 import pytest
+from pytest_django import DjangoAssertNumQueries
 from pytest_mock import MockerFixture
 
 from asu.auth.models import User, UserBlock, UserFollow, UserFollowRequest
@@ -399,3 +400,55 @@ def test_user_relations_mixed_followed_by_follow_request_sent(
             }
         ]
     }
+
+
+@pytest.mark.django_db
+def test_user_relations_single_query(
+    user: User,
+    user_client: OAuthClient,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    users = UserFactory.create_batch(100)
+    for profile in users[:50]:
+        UserFollow.objects.create(from_user=user, to_user=profile)
+    for profile in users[25:75]:
+        UserBlock.objects.create(from_user=profile, to_user=user)
+
+    with django_assert_num_queries(
+        1  # fetch user
+        + 1  # fetch candidates
+        + 1  # fetch relations
+    ):
+        response = user_client.get(
+            reverse(
+                "api:v1:auth:user-relations",
+                query={"usernames": ",".join(u.username for u in users)},
+            )
+        )
+    assert response.status_code == 200
+    results = {
+        item["username"]: item["relations"] for item in response.json()["results"]
+    }
+    assert len(results) == 100
+    assert results[users[0].username] == ["following"]
+    assert results[users[30].username] == ["following", "blocked_by"]
+    assert results[users[60].username] == ["blocked_by"]
+    assert results[users[90].username] == []
+
+
+@pytest.mark.django_db
+def test_user_relations_limit(user_client: OAuthClient) -> None:
+    usernames = ",".join("user%s" % index for index in range(501))
+    response = user_client.get(
+        reverse("api:v1:auth:user-relations", query={"usernames": usernames})
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_user_get_relations_empty(
+    user: User,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    with django_assert_num_queries(0):
+        assert user.get_relations([]) == {}
@@ -0,0 +1,195 @@
+import json
+import uuid
+from unittest.mock import MagicMock
+
+from django.urls import reverse
+
+import pytest
+import redis
+from pytest_django import DjangoCaptureOnCommitCallbacks
+from pytest_mock import MockerFixture
+
+from asu.auth.models import User, UserBlock
+from asu.auth.search import (
+    AUTOCOMPLETE_ENTRIES_KEY,
+    AUTOCOMPLETE_KEY,
+    get_autocomplete_ids,
+    index_users,
+)
+
+from tests.conftest import OAuthClient
+from tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+def test_user_search(user: User, user_client: OAuthClient) -> None:
+    UserFactory.create(username="quokkas_x", display_name="Quokkas")
+    UserFactory.create(username="quokka", display_name="Quokka")
+    UserFactory.create(username="someone", display_name="Kathy Quokkas")
+    UserFactory.create(username="bob", display_name="Bob")
+    UserFactory.create(username="quokka_i", display_name="Quokka", is_active=False)
+    UserFactory.create(username="quokka_f", display_name="Quokka", is_frozen=True)
+
+    response = user_client.get(
+        reverse("api:v1:auth:user-search", query={"q": "QUOKKA"})
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["username"] == "quokka"
+    assert {item["username"] for item in results} == {"quokka", "quokkas_x", "someone"}
+    assert set(results[0]) == {
+        "id",
+        "display_name",
+        "username",
+        "profile_picture",
+        "profile_picture_sources",
+        "description",
+        "is_private",
+    }
+
+
+@pytest.mark.django_db
+def test_user_search_excludes_block_rels(user: User, user_client: OAuthClient) -> None:
+    helen, bob, james = (
+        UserFactory.create(username="quokka_1"),
+        UserFactory.create(username="quokka_2"),
+        UserFactory.create(username="quokka_3"),
+    )
+    UserBlock.objects.create(from_user=user, to_user=helen)
+    UserBlock.objects.create(from_user=bob, to_user=user)
+
+    response = user_client.get(
+        reverse("api:v1:auth:user-search", query={"q": "quokka"})
+    )
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["results"]] == [str(james.pk)]
+
+
+@pytest.mark.django_db
+def test_user_search_requires_query(user_client: OAuthClient) -> None:
+    response = user_client.get(reverse("api:v1:auth:user-search", query={"q": "he"}))
+    assert response.status_code == 400
+    assert response.json()["errors"] == {
+        "q": ["Ensure this field has at least 3 characters."]
+    }
+
+    response = user_client.get(reverse("api:v1:auth:user-search"))
+    assert response.status_code == 400
+    assert response.json()["errors"] == {"q": ["This field is required."]}
+
+
+@pytest.mark.django_db
+def test_user_search_requires_token(client: OAuthClient) -> None:
+    response = client.get(reverse("api:v1:auth:user-search", query={"q": "helen"}))
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_user_autocomplete(
+    user: User,
+    user_client: OAuthClient,
+    mocker: MockerFixture,
+) -> None:
+    helen, bob, james, inactive = (
+        UserFactory.create(username="helen"),
+        UserFactory.create(username="bob"),
+        UserFactory.create(username="james"),
+        UserFactory.create(username="inactive", is_active=False),
+    )
+    UserBlock.objects.create(from_user=bob, to_user=user)
+    get_ids = mocker.patch(
+        "asu.auth.views.get_autocomplete_ids",
+        return_value=[james.pk, inactive.pk, bob.pk, helen.pk],
+    )
+
+    response = user_client.get(
+        reverse("api:v1:auth:user-autocomplete", query={"q": "He"})
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["username"] for item in results] == ["james", "helen"]
+    get_ids.assert_called_once_with("He", limit=40)
+
+
+@pytest.mark.django_db
+def test_user_autocomplete_without_index(
+    user: User,
+    user_client: OAuthClient,
+    mocker: MockerFixture,
+) -> None:
+    UserFactory.create(username="quokka", display_name="Quokka")
+    UserFactory.create(username="bob", display_name="Quoll Bob")
+    UserFactory.create(username="james", display_name="James Quoll")
+    mocker.patch("asu.auth.views.get_autocomplete_ids", return_value=None)
+
+    response = user_client.get(
+        reverse("api:v1:auth:user-autocomplete", query={"q": "QUO"})
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["username"] for item in results] == ["bob", "quokka"]
+
+
+@pytest.mark.django_db
+def test_user_save_updates_autocomplete(
+    autocomplete_index: MagicMock,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
+    with django_capture_on_commit_callbacks(execute=True):
+        user = UserFactory.create(username="helen", display_name="Helen")
+    ((users,), _) = autocomplete_index.call_args
+    assert [(obj.pk, obj.display_name) for obj in users] == [(user.pk, "Helen")]
+
+    autocomplete_index.reset_mock()
+    with django_capture_on_commit_callbacks(execute=True):
+        user.description = "Hello"
+        user.save(update_fields=["description", "updated_at"])
+    autocomplete_index.assert_not_called()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.display_name = "Helen Smith"
+        user.save(update_fields=["display_name", "updated_at"])
+    ((users,), _) = autocomplete_index.call_args
+    assert [(obj.pk, obj.display_name) for obj in users] == [(user.pk, "Helen Smith")]
+
+
+def test_index_users(mocker: MockerFixture) -> None:
+    client = mocker.patch("asu.auth.search.get_client").return_value
+    pipe = client.pipeline.return_value.__enter__.return_value
+    helen = User(pk=uuid.uuid4(), username="Helen_S", display_name="Helen Smith")
+    frozen = User(
+        pk=uuid.uuid4(), username="frozen", display_name="Frozen", is_frozen=True
+    )
+    client.hmget.return_value = [None, json.dumps(["frozen\x00%s" % frozen.pk.hex])]
+
+    index_users([helen, frozen])
+
+    entries = sorted(
+        "%s\x00%s" % (term, helen.pk.hex)
+        for term in ("helen_s", "helen smith", "helen", "smith")
+    )
+    pipe.zadd.assert_called_once_with(AUTOCOMPLETE_KEY, dict.fromkeys(entries, 0))
+    pipe.hset.assert_called_once_with(
+        AUTOCOMPLETE_ENTRIES_KEY, helen.pk.hex, json.dumps(entries)
+    )
+    pipe.zrem.assert_called_once_with(AUTOCOMPLETE_KEY, "frozen\x00%s" % frozen.pk.hex)
+    pipe.hdel.assert_called_once_with(AUTOCOMPLETE_ENTRIES_KEY, frozen.pk.hex)
+    pipe.execute.assert_called_once_with()
+
+
+def test_get_autocomplete_ids(mocker: MockerFixture) -> None:
+    client = mocker.patch("asu.auth.search.get_client").return_value
+    helen, bob = User(pk=uuid.uuid4()), User(pk=uuid.uuid4())
+    client.zrangebylex.return_value = [
+        b"helen\x00" + helen.pk.hex.encode(),
+        b"helen smith\x00" + helen.pk.hex.encode(),
+        b"hello\x00" + bob.pk.hex.encode(),
+    ]
+
+    assert get_autocomplete_ids("HEL", limit=10) == [helen.pk, bob.pk]
+    client.zrangebylex.assert_called_once_with(
+        AUTOCOMPLETE_KEY, b"[hel", b"[hel\xff", start=0, num=10
+    )
+
+    client.zrangebylex.side_effect = redis.ConnectionError
+    assert get_autocomplete_ids("hel", limit=10) is None
@@ -0,0 +1,77 @@
+import io
+import os
+import re
+import subprocess
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+from django.core.management import call_command
+from django.urls import reverse
+
+import pytest
+from pytest_mock import MockerFixture
+
+from asu.core.utils.openapi import get_schema_name
+
+from tests.conftest import OAuthClient
+
+
+@pytest.fixture
+def static_dir(tmp_path: Path, mocker: MockerFixture) -> Iterator[Path]:
+    manifest = tmp_path / "schema-manifest.json"
+    command = "asu.core.management.commands.build_schema"
+    mocker.patch("%s.STATIC_DIR" % command, tmp_path)
+    mocker.patch("%s.SCHEMA_MANIFEST" % command, manifest)
+    mocker.patch("asu.core.utils.openapi.SCHEMA_MANIFEST", manifest)
+    get_schema_name.cache_clear()
+    yield tmp_path
+    get_schema_name.cache_clear()
+
+
+def test_build_schema(static_dir: Path, client: OAuthClient) -> None:
+    stale = static_dir / "schema" / "api-schema.0123456789abcdef.yaml"
+    stale.parent.mkdir()
+    stale.write_bytes(b"openapi: 3.1.0")
+    assert get_schema_name() == "api-schema.yaml"
+
+    call_command("build_schema", stdout=io.StringIO())
+    name = get_schema_name()
+    assert re.fullmatch(r"schema/api-schema\.[0-9a-f]{16}\.yaml", name)
+    assert not stale.exists()
+
+    content = (static_dir / name).read_bytes()
+    assert content.startswith(b"openapi:")
+    assert [path.name for path in (static_dir / "schema").iterdir()] == [
+        name.rpartition("/")[2]
+    ]
+
+    # Schema names only change along with the content.
+    call_command("build_schema", stdout=io.StringIO())
+    assert get_schema_name() == name
+
+    response = client.get(reverse("api:v1:api-root"))
+    assert response.json()["schema"] == "http://testserver/static/%s" % name
+
+
+def test_build_settings() -> None:
+    # Settings used to build the image need neither secrets nor services.
+    code = (
+        "import django; django.setup()\n"
+        "from django.conf import settings\n"
+        "print(settings.STORAGES['staticfiles']['BACKEND'], settings.DEBUG)\n"
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={
+            "PATH": os.environ.get("PATH", ""),
+            "DJANGO_SETTINGS_MODULE": "asu.core.settings.build",
+        },
+    )
+    assert process.stdout.split() == [
+        "django.contrib.staticfiles.storage.StaticFilesStorage",
+        "False",
+    ]
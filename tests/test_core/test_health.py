@@ -0,0 +1,53 @@
+from collections.abc import Iterator
+from unittest.mock import MagicMock
+
+from django.urls import reverse
+
+import pytest
+import redis
+from pytest_mock import MockerFixture
+
+from asu.core.utils.health import health_cache
+
+from tests.conftest import OAuthClient
+
+
+@pytest.fixture
+def checks(mocker: MockerFixture) -> Iterator[dict[str, MagicMock]]:
+    mocks = {"database": MagicMock(), "redis": MagicMock(), "broker": MagicMock()}
+    mocker.patch.dict("asu.core.utils.health.CHECKS", mocks)
+    health_cache.clear()
+    yield mocks
+    health_cache.clear()
+
+
+def test_health(client: OAuthClient, checks: dict[str, MagicMock]) -> None:
+    response = client.get(reverse("api:v1:health"))
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "ok",
+        "checks": {"database": True, "redis": True, "broker": True},
+    }
+
+
+def test_health_unavailable(client: OAuthClient, checks: dict[str, MagicMock]) -> None:
+    checks["redis"].side_effect = redis.ConnectionError
+
+    response = client.get(reverse("api:v1:health"))
+    assert response.status_code == 503
+    assert response.json() == {
+        "status": "unavailable",
+        "checks": {"database": True, "redis": False, "broker": True},
+    }
+
+
+def test_health_is_cached(client: OAuthClient, checks: dict[str, MagicMock]) -> None:
+    for _ in range(3):
+        response = client.get(reverse("api:v1:health"))
+        assert response.status_code == 200
+    for check in checks.values():
+        check.assert_called_once_with()
+
+    health_cache.clear()
+    client.get(reverse("api:v1:health"))
+    assert checks["database"].call_count == 2
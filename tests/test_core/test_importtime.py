@@ -0,0 +1,65 @@
+import io
+import subprocess
+import sys
+
+from django.core.management import call_command
+
+from pytest_mock import MockerFixture
+
+from asu.core.management.commands.importtime import ImportTime, parse_importtime
+
+OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       310 |        430 |   io
+import time:      1500 |       1930 | django
+import time:       250 |        250 |   django.utils
+Some other output
+"""
+
+
+def test_parse_importtime() -> None:
+    assert parse_importtime(OUTPUT) == [
+        ImportTime("_io", 120, 120),
+        ImportTime("io", 310, 430),
+        ImportTime("django", 1500, 1930),
+        ImportTime("django.utils", 250, 250),
+    ]
+
+
+def test_importtime_command(mocker: MockerFixture) -> None:
+    run = mocker.patch(
+        "asu.core.management.commands.importtime.subprocess.run",
+        return_value=subprocess.CompletedProcess([], 0, stderr=OUTPUT),
+    )
+    out = io.StringIO()
+    call_command("importtime", "asu.core.urls", limit=2, stdout=out)
+    assert out.getvalue().splitlines() == [
+        "Total: 2.2 ms",
+        "       1.9 ms  django",
+        "       0.4 ms  io",
+    ]
+    ((command,), _) = run.call_args
+    assert command[:3] == [sys.executable, "-X", "importtime"]
+    assert command[-1] == "import django; django.setup()\nimport asu.core.urls\n"
+
+    out = io.StringIO()
+    call_command("importtime", packages=True, stdout=out)
+    assert out.getvalue().splitlines()[1:] == [
+        "       1.8 ms  django",
+        "       0.3 ms  io",
+        "       0.1 ms  _io",
+    ]
+
+
+def test_heavy_modules_are_not_imported() -> None:
+    code = (
+        "import sys, django; django.setup()\n"
+        "import asu.auth.models.user, asu.core.utils.file, asu.core.views\n"
+        "print(*sorted(set(sys.modules) & {'boto3', 'magic',"
+        " 'drf_spectacular.views'}))"
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert process.stdout.strip() == ""
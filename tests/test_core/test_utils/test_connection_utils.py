@@ -0,0 +1,15 @@
+from pytest_mock import MockerFixture
+
+from asu.auth.events import get_client
+from asu.core.utils.connections import close_connections
+
+
+def test_close_connections(mocker: MockerFixture) -> None:
+    close_db = mocker.patch("asu.core.utils.connections.connections.close_all")
+    close_caches = mocker.patch("asu.core.utils.connections.caches.close_all")
+    client = get_client()
+
+    close_connections()
+    close_db.assert_called_once_with()
+    close_caches.assert_called_once_with()
+    assert get_client() is not client
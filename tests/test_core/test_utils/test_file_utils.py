@@ -1,9 +1,24 @@
+import gzip
+import io
+import uuid
+from typing import Any
+
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from rest_framework import serializers
+
 import pytest
+from PIL import Image
+from pytest_mock import MockerFixture
 
-from asu.core.utils.file import FileSizeValidator, MimeTypeValidator
+from asu.core.utils.file import (
+    FileSizeValidator,
+    ImageUploadHandler,
+    MimeTypeValidator,
+)
+from asu.core.utils.storage import S3MediaStorage, S3StaticStorage
 
 
 @pytest.fixture
@@ -37,3 +52,160 @@ def test_filesize_validator(sample_image: SimpleUploadedFile) -> None:
     validate.max_size = 11200
     with pytest.raises(ValidationError):
         validate(sample_image)
+
+
+@pytest.fixture
+def s3_storage() -> S3MediaStorage:
+    return S3MediaStorage(
+        access_key="access",
+        secret_key="secret",
+        bucket_name="bucket",
+        endpoint_url="http://s3.localhost",
+        region_name="us-east-1",
+    )
+
+
+def test_s3_media_storage_url_cache(
+    s3_storage: S3MediaStorage,
+    mocker: MockerFixture,
+) -> None:
+    first, second = "%s.jpg" % uuid.uuid4(), "%s.jpg" % uuid.uuid4()
+    sign = mocker.spy(s3_storage.connection.meta.client, "generate_presigned_url")
+    now = 1_000_000_000.0
+    mocker.patch("asu.core.utils.storage.time.time", side_effect=lambda: now)
+    info = S3MediaStorage.url_cache_info()
+
+    url = s3_storage.url(first)
+    assert "X-Amz-Signature" in url
+    assert s3_storage.url(first) == url
+    assert sign.call_count == 1
+
+    # Only the missing URLs are signed.
+    urls = s3_storage.get_urls([first, second, first])
+    assert urls.keys() == {first, second}
+    assert urls[first] == url
+    assert sign.call_count == 2
+
+    after = S3MediaStorage.url_cache_info()
+    assert after.hits - info.hits == 2
+    assert after.misses - info.misses == 2
+    assert 0 < after.hit_rate < 1
+
+    # URLs are signed again before they expire.
+    now += s3_storage.querystring_expire - s3_storage.url_cache_margin
+    s3_storage.url(first)
+    assert sign.call_count == 3
+
+
+def test_s3_media_storage_url_cache_bypassed_for_parameters(
+    s3_storage: S3MediaStorage,
+    mocker: MockerFixture,
+) -> None:
+    sign = mocker.spy(s3_storage.connection.meta.client, "generate_presigned_url")
+    name = "%s.jpg" % uuid.uuid4()
+    s3_storage.url(name, expire=60)
+    s3_storage.url(name, expire=60)
+    assert sign.call_count == 2
+
+
+def test_s3_static_storage_schema(mocker: MockerFixture) -> None:
+    storage = S3StaticStorage(
+        access_key="access",
+        secret_key="secret",
+        bucket_name="bucket",
+        endpoint_url="http://s3.localhost",
+        region_name="us-east-1",
+    )
+    uploads: dict[str | None, tuple[bytes, dict[str, Any]]] = {}
+
+    def upload_fileobj(fileobj: io.RawIOBase, **kwargs: Any) -> None:
+        params = kwargs["ExtraArgs"]
+        uploads[params.get("CacheControl")] = (fileobj.read(), params)
+
+    storage._bucket = mocker.Mock()
+    storage._bucket.Object.return_value.upload_fileobj.side_effect = upload_fileobj
+
+    content = b"openapi: 3.1.0\n" * 64
+    storage.save("schema/api-schema.0123456789abcdef.yaml", ContentFile(content))
+    storage.save("css/main.css", ContentFile(b"body {}"))
+    storage._bucket.Object.assert_any_call(
+        "static/schema/api-schema.0123456789abcdef.yaml"
+    )
+
+    # Built schemas are compressed and cached indefinitely.
+    data, params = uploads["public, max-age=31536000, immutable"]
+    assert gzip.decompress(data) == content
+    assert params["ContentType"] == "application/yaml"
+    assert params["ContentEncoding"] == "gzip"
+
+    data, params = uploads[None]
+    assert data == b"body {}"
+    assert "ContentEncoding" not in params
+
+
+def get_image_upload_handler() -> ImageUploadHandler:
+    handler = ImageUploadHandler(
+        field_name="image",
+        max_size=2**20,
+        allowed_types=["image/png"],
+        max_pixels=1000 * 1000,
+    )
+    handler.new_file("image", "image.png", "image/png", None)
+    return handler
+
+
+def get_png(size: tuple[int, int]) -> bytes:
+    buf = io.BytesIO()
+    Image.new("1", size).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_image_upload_handler() -> None:
+    content = get_png((1000, 1000))
+    handler = get_image_upload_handler()
+    for start in range(0, len(content), 64):
+        chunk = content[start : start + 64]
+        assert handler.receive_data_chunk(chunk, start) == chunk
+    handler.file_complete(len(content))
+    assert handler.checked
+
+
+def test_image_upload_handler_rejects_dimensions_from_header() -> None:
+    content = get_png((1001, 1000))
+    handler = get_image_upload_handler()
+    with pytest.raises(serializers.ValidationError):
+        # Header of a PNG image is within its first few bytes.
+        handler.receive_data_chunk(content[:64], 0)
+
+
+def test_image_upload_handler_rejects_size() -> None:
+    handler = get_image_upload_handler()
+    handler.receive_data_chunk(get_png((10, 10)), 0)
+    with pytest.raises(serializers.ValidationError):
+        handler.receive_data_chunk(b"\x00" * 2**20, 2**10)
+
+
+@pytest.mark.parametrize(
+    "file_name, content",
+    (
+        ("image.png", b"not an image"),
+        ("image.gif", b""),
+    ),
+)
+def test_image_upload_handler_rejects_type(file_name: str, content: bytes) -> None:
+    handler = get_image_upload_handler()
+
+    def upload() -> None:
+        handler.new_file("image", file_name, "image/png", None)
+        handler.receive_data_chunk(content, 0)
+        handler.file_complete(len(content))
+
+    with pytest.raises(serializers.ValidationError):
+        upload()
+
+
+def test_image_upload_handler_ignores_other_fields() -> None:
+    handler = get_image_upload_handler()
+    handler.new_file("document", "document.txt", "text/plain", None)
+    assert handler.receive_data_chunk(b"text", 0) == b"text"
+    handler.file_complete(4)
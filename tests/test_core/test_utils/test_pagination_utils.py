@@ -0,0 +1,115 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import pytest
+
+from asu.auth.models import User
+from asu.core.utils.pagination import ApproximatePaginator, get_approximate_count
+from asu.core.utils.rest import get_paginator
+
+from tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+def test_get_approximate_count_filtered() -> None:
+    UserFactory.create_batch(3, display_name="Counted")
+    queryset = User.objects.filter(display_name="Counted")
+
+    assert get_approximate_count(queryset, cap=3) == (3, True)
+    # Counting stops past the cap.
+    assert get_approximate_count(queryset.filter(is_active=True), cap=2) == (
+        3,
+        False,
+    )
+
+
+@pytest.mark.django_db
+def test_get_approximate_count_is_cached() -> None:
+    UserFactory.create_batch(2, display_name="Cached")
+    queryset = User.objects.filter(display_name="Cached", is_private=False)
+    assert get_approximate_count(queryset) == (2, True)
+
+    UserFactory.create(display_name="Cached")
+    with CaptureQueriesContext(connection) as context:
+        assert get_approximate_count(queryset) == (2, True)
+    assert not context.captured_queries
+
+
+@pytest.mark.django_db
+def test_get_approximate_count_estimated() -> None:
+    UserFactory.create_batch(30)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE account_user")
+
+    count, exact = get_approximate_count(User.objects.all(), cap=10)
+    assert not exact
+    assert count == User.objects.count()
+
+    # Small tables are counted exactly, as are filtered querysets.
+    assert get_approximate_count(User.objects.all(), cap=100)[1]
+    assert get_approximate_count(User.objects.filter(is_active=True), cap=100)[1]
+
+
+@pytest.mark.django_db
+def test_approximate_paginator() -> None:
+    UserFactory.create_batch(5, display_name="Paginated")
+    queryset = User.objects.filter(display_name="Paginated").order_by("id")
+    users = list(queryset)
+
+    paginator = ApproximatePaginator(queryset, per_page=2)
+    paginator.count_cap = 2
+    assert paginator.count == 3
+    assert paginator.is_approximate
+
+    # Pages past the counted ones are still reachable.
+    assert list(paginator.page(3)) == users[4:]
+    assert list(paginator.page(4)) == []
+
+    paginator = ApproximatePaginator(queryset, per_page=2)
+    assert paginator.count == 5
+    assert not paginator.is_approximate
+    assert list(paginator.page(3)) == users[4:]
+
+
+@pytest.mark.django_db
+def test_approximate_paginator_has_next() -> None:
+    UserFactory.create_batch(5, display_name="Paginated")
+    queryset = User.objects.filter(display_name="Paginated").order_by("id")
+
+    paginator = ApproximatePaginator(queryset, per_page=2)
+    paginator.count_cap = 1
+    assert paginator.num_pages == 1
+    assert paginator.page(2).has_next()
+    assert not paginator.page(3).has_next()
+
+    paginator = ApproximatePaginator(queryset, per_page=1)
+    paginator.count_cap = 1
+    assert not paginator.page(5).has_next()
+
+
+@pytest.mark.django_db
+def test_approximate_pagination_follows_next_past_cap() -> None:
+    UserFactory.create_batch(5, display_name="Paginated")
+    queryset = User.objects.filter(display_name="Paginated").order_by("id")
+
+    class Paginator(ApproximatePaginator):
+        count_cap = 2
+
+    pagination_class = get_paginator(
+        "page_number", page_size=2, django_paginator_class=Paginator
+    )
+    factory = APIRequestFactory()
+    url, results = "/", []
+    while url:
+        pagination = pagination_class()
+        page = pagination.paginate_queryset(queryset, Request(factory.get(url)))
+        assert page is not None
+        data = pagination.get_paginated_response(page).data
+        assert data["count_is_approximate"]
+        results.extend(page)
+        url = data["next"]
+
+    assert results == list(queryset)
@@ -2,12 +2,19 @@ from django.urls import reverse
 
 from rest_framework import exceptions
 from rest_framework.exceptions import ErrorDetail
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
 import pytest
+from asgiref.sync import async_to_sync
+from pytest_mock import MockerFixture
 
-from asu.core.utils.rest import exception_handler
+from asu.auth.models import User
+from asu.core.utils.rest import exception_handler, get_paginator
+from asu.core.views import APIRootView
 
 from tests.conftest import OAuthClient
+from tests.factories import UserFactory
 
 exception_handler_cases = (
     pytest.param(
@@ -229,6 +236,7 @@ def test_docs(client: OAuthClient) -> None:
     r1 = client.get(browser)
     assert r1.status_code == 200
     assert "text/html" in r1.headers["Content-Type"]
+    assert b'apiDescriptionUrl="/static/api-schema.yaml"' in r1.content
 
 
 def test_api_root(client: OAuthClient) -> None:
@@ -248,3 +256,48 @@ def test_api_root(client: OAuthClient) -> None:
     response = client.get(url, {"routes": "1"})
     content = response.json()
     assert "routes" in content
+
+
+def test_api_root_routes_are_cached(client: OAuthClient, mocker: MockerFixture) -> None:
+    mocker.patch.object(APIRootView, "route_cache", {})
+    build_routes = mocker.spy(APIRootView, "build_routes")
+    url = reverse("api:v1:api-root")
+
+    response = client.get(url, {"routes": "1"})
+    routes = response.json()["routes"]
+    secure_response = client.get(url, {"routes": "1"}, secure=True)
+    secure_routes = secure_response.json()["routes"]
+    assert build_routes.call_count == 1
+
+    (root,) = (r for r in routes["api/"]["v1"]["~"] if r["name"] == "api-root")
+    assert root["url"] == "http://testserver/api/v1/"
+    (root,) = (r for r in secure_routes["api/"]["v1"]["~"] if r["name"] == "api-root")
+    assert root["url"] == "https://testserver/api/v1/"
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_async() -> None:
+    UserFactory.create_batch(5)
+    queryset = User.objects.all()
+    paginator_class = get_paginator("cursor", page_size=2, ordering="-date_joined")
+    factory = APIRequestFactory()
+
+    url, pages = "/", []
+    while url:
+        request = Request(factory.get(url))
+        paginator = paginator_class()
+        apaginate_queryset = paginator.apaginate_queryset  # type: ignore[attr-defined]
+        page = async_to_sync(apaginate_queryset)(queryset, request)
+
+        expected = paginator_class()
+        assert page == expected.paginate_queryset(queryset, request)
+        assert paginator.get_next_link() == expected.get_next_link()
+        assert paginator.get_previous_link() == expected.get_previous_link()
+
+        pages.append(page)
+        url = paginator.get_next_link()
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [user for page in pages for user in page] == list(
+        queryset.order_by("-date_joined")
+    )
@@ -0,0 +1,117 @@
+from django.urls import reverse
+
+import pytest
+from pytest_django import DjangoAssertNumQueries
+
+from asu.auth.models import User
+from asu.messaging.models import ConversationMember, Message
+
+from tests.conftest import OAuthClient
+from tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+def test_messaging_inbox(
+    user: User,
+    user_client: OAuthClient,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    peers = UserFactory.create_batch(3)
+    for peer in peers:
+        Message.objects.send(sender=peer, recipient_id=user.pk, body="Hi")
+    # Most recent activity brings the conversation to the top.
+    last = Message.objects.send(sender=peers[0], recipient_id=user.pk, body="Hey")
+
+    # Token lookup, inbox page.
+    with django_assert_num_queries(2):
+        response = user_client.get(reverse("api:v1:messaging:conversation-list"))
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["peer"]["id"] for item in results] == [
+        str(peers[0].pk),
+        str(peers[2].pk),
+        str(peers[1].pk),
+    ]
+    assert results[0]["id"] == str(last.conversation_id)
+    assert results[0]["last_message"]["id"] == str(last.pk)
+    assert results[0]["last_message"]["body"] == "Hey"
+    assert results[0]["unread_count"] == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "user_allows, peer_allows, visible",
+    (
+        (True, True, True),
+        (True, False, False),
+        (False, True, False),
+        (False, False, False),
+    ),
+)
+def test_messaging_inbox_receipts(
+    *,
+    user_allows: bool,
+    peer_allows: bool,
+    visible: bool,
+    client: OAuthClient,
+) -> None:
+    user = UserFactory.create(allows_receipts=user_allows)
+    peer = UserFactory.create(allows_receipts=peer_allows)
+    message = Message.objects.send(sender=user, recipient_id=peer.pk, body="Hi")
+    ConversationMember.objects.get(user=peer).mark_read()
+
+    client.set_user(user, scope="user.messaging:read")
+    response = client.get(reverse("api:v1:messaging:conversation-list"))
+    (result,) = response.json()["results"]
+    expected = str(message.pk) if visible else None
+    assert result["peer_last_read_message"] == expected
+
+
+@pytest.mark.django_db
+def test_messaging_messages(user: User, user_client: OAuthClient) -> None:
+    peer = UserFactory.create()
+    sent = [
+        Message.objects.send(sender=user, recipient_id=peer.pk, body=str(index))
+        for index in range(3)
+    ]
+    response = user_client.get(
+        reverse(
+            "api:v1:messaging:conversation-messages",
+            kwargs={"pk": sent[0].conversation_id},
+        )
+    )
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["results"]] == [
+        str(message.pk) for message in reversed(sent)
+    ]
+
+
+@pytest.mark.django_db
+def test_messaging_messages_not_member(user_client: OAuthClient) -> None:
+    sender, recipient = UserFactory.create_batch(2)
+    message = Message.objects.send(sender=sender, recipient_id=recipient.pk, body="")
+    response = user_client.get(
+        reverse(
+            "api:v1:messaging:conversation-messages",
+            kwargs={"pk": message.conversation_id},
+        )
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_messaging_read(user: User, user_client: OAuthClient) -> None:
+    peer = UserFactory.create()
+    Message.objects.send(sender=peer, recipient_id=user.pk, body="1")
+    message = Message.objects.send(sender=peer, recipient_id=user.pk, body="2")
+    response = user_client.post(
+        reverse(
+            "api:v1:messaging:conversation-read",
+            kwargs={"pk": message.conversation_id},
+        )
+    )
+    assert response.status_code == 204
+
+    member = ConversationMember.objects.get(user=user)
+    assert member.unread_count == 0
+    assert member.last_read_message_id == message.pk
@@ -0,0 +1,125 @@
+from django.urls import reverse
+
+import pytest
+from pytest_django import DjangoAssertNumQueries
+
+from asu.auth.models import User, UserBlock, UserFollow
+from asu.messaging.models import ConversationMember, Message
+
+from tests.conftest import OAuthClient
+from tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+def test_messaging_send(user: User, client: OAuthClient) -> None:
+    client.set_user(user, scope="user.messaging:write")
+    recipient = UserFactory.create()
+    response = client.post(
+        reverse("api:v1:messaging:conversation-send"),
+        data={"recipients": [str(recipient.pk)], "body": "Hello"},
+        format="json",
+    )
+    assert response.status_code == 201
+    (result,) = response.json()["results"]
+    assert result["sender"] == str(user.pk)
+    assert result["body"] == "Hello"
+
+    message = Message.objects.get(pk=result["id"])
+    sender_member = ConversationMember.objects.get(user=user, peer=recipient)
+    recipient_member = ConversationMember.objects.get(user=recipient, peer=user)
+    assert sender_member.conversation_id == message.conversation_id
+    assert recipient_member.conversation_id == message.conversation_id
+    assert sender_member.last_message_id == message.pk
+    assert sender_member.last_read_message_id == message.pk
+    assert sender_member.unread_count == 0
+    assert recipient_member.last_message_id == message.pk
+    assert recipient_member.last_read_message_id is None
+    assert recipient_member.unread_count == 1
+
+
+@pytest.mark.django_db
+def test_messaging_send_reuses_conversation(user: User) -> None:
+    recipient = UserFactory.create()
+    m1 = Message.objects.send(sender=user, recipient_id=recipient.pk, body="1")
+    m2 = Message.objects.send(sender=recipient, recipient_id=user.pk, body="2")
+    m3 = Message.objects.send(sender=user, recipient_id=recipient.pk, body="3")
+    assert m1.conversation_id == m2.conversation_id == m3.conversation_id
+
+    recipient_member = ConversationMember.objects.get(user=recipient)
+    assert recipient_member.last_message_id == m3.pk
+    assert recipient_member.last_read_message_id == m2.pk
+    assert recipient_member.unread_count == 1
+
+
+@pytest.mark.django_db
+def test_messaging_send_multiple_recipients(
+    user_client: OAuthClient,
+    django_assert_max_num_queries: DjangoAssertNumQueries,
+) -> None:
+    recipients = UserFactory.create_batch(3)
+    with django_assert_max_num_queries(30):
+        response = user_client.post(
+            reverse("api:v1:messaging:conversation-send"),
+            data={"recipients": [str(r.pk) for r in recipients], "body": "Hi"},
+            format="json",
+        )
+    assert response.status_code == 201
+    assert Message.objects.count() == 3
+    assert ConversationMember.objects.count() == 6
+
+
+@pytest.mark.django_db
+def test_messaging_get_allowed_recipients(
+    user: User,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    allowed = UserFactory.create()
+    blocked = UserFactory.create()
+    blocked_by = UserFactory.create()
+    inactive = UserFactory.create(is_active=False)
+    restricted = UserFactory.create(allows_all_messages=False)
+    restricted_follower = UserFactory.create(allows_all_messages=False)
+    UserBlock.objects.create(from_user=user, to_user=blocked)
+    UserBlock.objects.create(from_user=blocked_by, to_user=user)
+    UserFollow.objects.create(from_user=restricted_follower, to_user=user)
+    # Following a restricted user does not allow messaging them.
+    UserFollow.objects.create(from_user=user, to_user=restricted)
+
+    candidates = [
+        allowed.pk,
+        blocked.pk,
+        blocked_by.pk,
+        inactive.pk,
+        restricted.pk,
+        restricted_follower.pk,
+        user.pk,
+    ]
+    with django_assert_num_queries(1):
+        result = Message.objects.get_allowed_recipients(user, candidates)
+    assert result == {allowed.pk, restricted_follower.pk}
+
+
+@pytest.mark.django_db
+def test_messaging_send_not_allowed(user_client: OAuthClient, user: User) -> None:
+    allowed = UserFactory.create()
+    blocked = UserFactory.create()
+    UserBlock.objects.create(from_user=blocked, to_user=user)
+    response = user_client.post(
+        reverse("api:v1:messaging:conversation-send"),
+        data={"recipients": [str(allowed.pk), str(blocked.pk)], "body": "Hi"},
+        format="json",
+    )
+    assert response.status_code == 400
+    assert not Message.objects.exists()
+
+
+@pytest.mark.django_db
+def test_messaging_send_requires_scope(user: User, client: OAuthClient) -> None:
+    client.set_user(user, scope="user.messaging:read")
+    recipient = UserFactory.create()
+    response = client.post(
+        reverse("api:v1:messaging:conversation-send"),
+        data={"recipients": [str(recipient.pk)], "body": "Hello"},
+        format="json",
+    )
+    assert response.status_code == 403